@@ -2,11 +2,18 @@ import streamlit as st
 from src.rag_engine import RAGEngine
 from src.question_generator import QuestionGenerator
 from src.evaluator import ResponseEvaluator
+from src.analytics import SessionAnalytics
+from src.prefetch import QuestionPrefetcher
 from utils.file_handler import FileHandler
-import json
+from utils.embeddings import get_embedding_provider
+from utils.history_store import HistoryStore
+from utils.catalog import load_job_catalog
+from utils.metrics import metrics, summarize_spans
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 import os
+import uuid
 print("Current working directory:", os.getcwd())
 
 
@@ -19,12 +26,38 @@ st.set_page_config(
 # Initialize components
 @st.cache_resource
 def load_components():
-    rag_engine = RAGEngine()
+    # Coalesce encode calls from concurrent sessions into shared forward passes
+    # EMBEDDING_BACKEND=hashing runs offline without downloading a model
+    backend = os.environ.get('EMBEDDING_BACKEND', 'sentence-transformers')
+    get_embedding_provider(backend=backend, batch_window_ms=5)
+    # INDEX_MMAP=1 shares one page-cached index between app processes on a host
+    rag_engine = RAGEngine(backend=backend, index_type=os.environ.get('INDEX_TYPE', 'flat'),
+                           mmap_index=os.environ.get('INDEX_MMAP') == '1')
     question_gen = QuestionGenerator(rag_engine)
     evaluator = ResponseEvaluator()
     return rag_engine, question_gen, evaluator
 
+@st.cache_resource
+def load_history_store():
+    return HistoryStore('data/user_history.db')
+
+@st.cache_resource
+def load_executor():
+    # Question prefetch and evaluation for all sessions run here, off the script thread
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix='interview')
+
 rag_engine, question_gen, evaluator = load_components()
+history_store = load_history_store()
+executor = load_executor()
+
+def extract_upload(uploaded_file, state_key):
+    """Extract an upload's text once and reuse it on later reruns."""
+    file_id = getattr(uploaded_file, 'file_id', None) or (uploaded_file.name, uploaded_file.size)
+    cached = st.session_state.get(state_key)
+    if cached is None or cached[0] != file_id:
+        cached = (file_id, FileHandler.extract_text(uploaded_file))
+        st.session_state[state_key] = cached
+    return cached[1]
 
 # Initialize session state
 if 'job_context' not in st.session_state:
@@ -33,8 +66,58 @@ if 'current_question' not in st.session_state:
     st.session_state.current_question = None
 if 'interview_history' not in st.session_state:
     st.session_state.interview_history = []
+if 'analytics' not in st.session_state:
+    st.session_state.analytics = SessionAnalytics()
 if 'question_count' not in st.session_state:
     st.session_state.question_count = 0
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+if 'prefetcher' not in st.session_state:
+    st.session_state.prefetcher = QuestionPrefetcher(question_gen, executor)
+if 'pending_evaluation' not in st.session_state:
+    st.session_state.pending_evaluation = None
+if 'last_evaluation' not in st.session_state:
+    st.session_state.last_evaluation = None
+if 'evaluation_error' not in st.session_state:
+    st.session_state.evaluation_error = None
+if 'question_timings' not in st.session_state:
+    st.session_state.question_timings = []
+
+# Record a finished background evaluation before anything is rendered
+pending = st.session_state.pending_evaluation
+evaluation = None
+if pending is not None and pending['future'].done():
+    st.session_state.pending_evaluation = None
+    try:
+        evaluation, evaluation_timings = pending['future'].result()
+    except Exception as e:
+        # Shown under the answer box; the answer can be submitted again
+        st.session_state.evaluation_error = f"Evaluation failed: {e}"
+
+if evaluation is not None:
+    # Store in history
+    st.session_state.interview_history.append({
+        'timestamp': datetime.now().isoformat(),
+        'question': pending['question_data']['question'],
+        'category': pending['question_data'].get('category', 'General'),
+        'response': pending['response'],
+        'score': evaluation['score'],
+        'feedback': evaluation
+    })
+    
+    st.session_state.analytics.add(st.session_state.interview_history[-1])
+    
+    # Save to the history database
+    with metrics.trace() as write_timings:
+        with metrics.span('history_write'):
+            history_store.add(st.session_state.interview_history[-1], st.session_state.session_id)
+    metrics.export()
+    
+    st.session_state.last_evaluation = {
+        'question': pending['question_data']['question'],
+        'evaluation': evaluation,
+        'timings': pending['question_timings'] + evaluation_timings + write_timings
+    }
 
 # Header
 st.title("Mock Interview Agent")
@@ -45,9 +128,8 @@ with st.sidebar:
     st.header("Statistics")
     st.metric("Questions Completed", st.session_state.question_count)
     
-    if st.session_state.interview_history:
-        avg_score = sum(h['score'] for h in st.session_state.interview_history) / len(st.session_state.interview_history)
-        st.metric("Average Score", f"{avg_score:.1f}%")
+    if st.session_state.analytics.count:
+        st.metric("Average Score", f"{st.session_state.analytics.average:.1f}%")
     
     st.divider()
     st.header("Tips")
@@ -72,15 +154,13 @@ with tab1:
         jd_option = st.radio("Choose option:", ["Select from library", "Upload custom JD", "Paste JD text"])
         
         if jd_option == "Select from library":
-            # Load from JSON
-            with open('data/job_descriptions.json', 'r') as f:
-                jd_library = json.load(f)
+            # Parsed once per file change and shared across reruns and sessions
+            jd_library = load_job_catalog()
             
-            job_titles = [jd['title'] for jd in jd_library]
-            selected_title = st.selectbox("Select position:", job_titles)
+            selected_title = st.selectbox("Select position:", jd_library.titles)
             
             if selected_title:
-                selected_jd = next(jd for jd in jd_library if jd['title'] == selected_title)
+                selected_jd = jd_library.by_title[selected_title]
                 st.session_state.job_context = selected_jd
                 
                 st.subheader(f"{selected_jd['title']} at {selected_jd['company']}")
@@ -89,7 +169,7 @@ with tab1:
         elif jd_option == "Upload custom JD":
             uploaded_file = st.file_uploader("Upload job description (PDF/TXT)", type=['pdf', 'txt'])
             if uploaded_file:
-                jd_text = FileHandler.extract_text(uploaded_file)
+                jd_text = extract_upload(uploaded_file, 'jd_upload')
                 st.session_state.job_context = {
                     'title': 'Custom Position',
                     'company': 'Company',
@@ -115,7 +195,7 @@ with tab1:
         st.subheader("Optional")
         resume_file = st.file_uploader("Upload your resume", type=['pdf', 'txt', 'docx'])
         if resume_file:
-            resume_text = FileHandler.extract_text(resume_file)
+            resume_text = extract_upload(resume_file, 'resume_upload')
             st.session_state.resume = resume_text
             st.success("Resume uploaded!")
 
@@ -130,21 +210,34 @@ with tab2:
         
         col1, col2, col3 = st.columns([2, 1, 1])
         
+        # Filters are read before the button so they apply to the generated question
+        with col2:
+            category = st.selectbox("Category:", ["All", "Technical", "Behavioral", "Situational"])
+        
+        with col3:
+            difficulty = st.selectbox("Difficulty:", ["All", "Easy", "Medium", "Hard"])
+        
         with col1:
             if st.button("Generate New Question", use_container_width=True):
-                # Generate question using RAG
-                question = question_gen.generate_question(
+                # Usually already generated in the background
+                question = st.session_state.prefetcher.next_question(
                     st.session_state.job_context,
-                    st.session_state.interview_history
+                    st.session_state.interview_history,
+                    category,
+                    difficulty
                 )
                 st.session_state.current_question = question
+                st.session_state.question_timings = st.session_state.prefetcher.last_timings
                 st.session_state.question_count += 1
+                st.session_state.last_evaluation = None
         
-        with col2:
-            category = st.selectbox("Category:", ["All", "Technical", "Behavioral", "Situational"])
-        
-        with col3:
-            difficulty = st.selectbox("Difficulty:", ["All", "Easy", "Medium", "Hard"])
+        # Prepare the next questions while the user reads and answers this one
+        st.session_state.prefetcher.prefetch(
+            st.session_state.job_context,
+            st.session_state.interview_history,
+            category,
+            difficulty
+        )
         
         # Display current question
         if st.session_state.current_question:
@@ -167,68 +260,72 @@ with tab2:
                     placeholder="Type your response here... Aim for 50+ words with specific examples."
                 )
                 
-                if st.button("📤 Submit for Evaluation", type="primary"):
+                if st.button("📤 Submit for Evaluation", type="primary", disabled=st.session_state.pending_evaluation is not None):
                     if user_response.strip():
-                        with st.spinner("Evaluating your response..."):
-                            # Chain-of-Thought evaluation
-                            evaluation = evaluator.evaluate_response(
+                        st.session_state.evaluation_error = None
+                        # Chain-of-Thought evaluation, in the background
+                        st.session_state.pending_evaluation = {
+                            'future': executor.submit(
+                                metrics.call_traced,
+                                evaluator.evaluate_response,
                                 question=question_data['question'],
                                 response=user_response,
                                 job_context=st.session_state.job_context
-                            )
-                            
-                            # Store in history
-                            st.session_state.interview_history.append({
-                                'timestamp': datetime.now().isoformat(),
-                                'question': question_data['question'],
-                                'category': question_data.get('category', 'General'),
-                                'response': user_response,
-                                'score': evaluation['score'],
-                                'feedback': evaluation
-                            })
-                            
-                            # Save to CSV
-                            pd.DataFrame([st.session_state.interview_history[-1]]).to_csv(
-                                'data/user_history.csv', 
-                                mode='a', 
-                                header=not os.path.exists('data/user_history.csv'),
-                                index=False
-                            )
-                            
-                            # Display evaluation
-                            st.markdown("---")
-                            st.markdown("##Evaluation Results")
-                            
-                            col1, col2 = st.columns([1, 3])
-                            
-                            with col1:
-                                score = evaluation['score']
-                                color = "green" if score >= 70 else "orange" if score >= 50 else "red"
-                                st.markdown(f"### <span style='color:{color}'>{score}%</span>", unsafe_allow_html=True)
-                                st.progress(score / 100)
-                            
-                            with col2:
-                                st.markdown(f"**Overall:** {evaluation['overall_assessment']}")
-                                st.markdown(f"**Chain-of-Thought Analysis:**")
-                                st.caption(evaluation['reasoning'])
-                            
-                            # Strengths
-                            if evaluation['strengths']:
-                                st.success("**Strengths:**")
-                                for strength in evaluation['strengths']:
-                                    st.write(f"- {strength}")
-                            
-                            # Improvements
-                            if evaluation['improvements']:
-                                st.warning("**Areas for Improvement:**")
-                                for improvement in evaluation['improvements']:
-                                    st.write(f"- {improvement}")
-                            
-                            # Suggested follow-up
-                            if 'follow_up' in evaluation:
-                                st.info(f"**Follow-up Question:** {evaluation['follow_up']}")
+                            ),
+                            'question_data': question_data,
+                            'question_timings': st.session_state.question_timings,
+                            'response': user_response
+                        }
                     else:
                         st.error("Please provide a response before submitting.")
+                
+                if st.session_state.pending_evaluation is not None:
+                    st.info("Evaluating your response...")
+                elif st.session_state.evaluation_error:
+                    st.error(st.session_state.evaluation_error)
+                
+                last = st.session_state.last_evaluation
+                if last is not None and last['question'] == question_data['question']:
+                    evaluation = last['evaluation']
+                    
+                    # Display evaluation
+                    st.markdown("---")
+                    st.markdown("##Evaluation Results")
+                    
+                    col1, col2 = st.columns([1, 3])
+                    
+                    with col1:
+                        score = evaluation['score']
+                        color = "green" if score >= 70 else "orange" if score >= 50 else "red"
+                        st.markdown(f"### <span style='color:{color}'>{score}%</span>", unsafe_allow_html=True)
+                        st.progress(score / 100)
+                    
+                    with col2:
+                        st.markdown(f"**Overall:** {evaluation['overall_assessment']}")
+                        st.markdown(f"**Chain-of-Thought Analysis:**")
+                        st.caption(evaluation['reasoning'])
+                    
+                    # Strengths
+                    if evaluation['strengths']:
+                        st.success("**Strengths:**")
+                        for strength in evaluation['strengths']:
+                            st.write(f"- {strength}")
+                    
+                    # Improvements
+                    if evaluation['improvements']:
+                        st.warning("**Areas for Improvement:**")
+                        for improvement in evaluation['improvements']:
+                            st.write(f"- {improvement}")
+                    
+                    # Suggested follow-up
+                    if 'follow_up' in evaluation:
+                        st.info(f"**Follow-up Question:** {evaluation['follow_up']}")
+                    
+                    # Where this turn's time went (INTERVIEW_METRICS=1)
+                    if metrics.enabled and last['timings']:
+                        with st.expander("Latency breakdown"):
+                            st.caption("Nested stages are included in their parents, e.g. index_search in generate_question.")
+                            st.dataframe(pd.DataFrame(summarize_spans(last['timings'])), use_container_width=True)
 
 with tab3:
     st.header("Interview History")
@@ -239,22 +336,16 @@ with tab3:
         # Filters
         col1, col2 = st.columns(2)
         with col1:
-            filter_category = st.selectbox("Filter by category:", ["All"] + list(set(h['category'] for h in st.session_state.interview_history)))
+            filter_category = st.selectbox("Filter by category:", ["All"] + history_store.categories(st.session_state.session_id))
         with col2:
             sort_by = st.selectbox("Sort by:", ["Most Recent", "Highest Score", "Lowest Score"])
         
-        # Sort history
-        history = st.session_state.interview_history.copy()
-        if sort_by == "Highest Score":
-            history.sort(key=lambda x: x['score'], reverse=True)
-        elif sort_by == "Lowest Score":
-            history.sort(key=lambda x: x['score'])
-        else:
-            history.reverse()
-        
-        # Filter by category
-        if filter_category != "All":
-            history = [h for h in history if h['category'] == filter_category]
+        # Filtered and sorted by an indexed query
+        history = history_store.history(
+            st.session_state.session_id,
+            category=None if filter_category == "All" else filter_category,
+            order=sort_by
+        )
         
         # Display history
         for idx, entry in enumerate(history):
@@ -275,59 +366,48 @@ with tab3:
 with tab4:
     st.header("Performance Analytics")
     
-    if not st.session_state.interview_history:
+    # Running aggregates: constant cost per rerun regardless of session length
+    analytics = st.session_state.analytics
+    
+    if not analytics.count:
         st.info("Complete some interviews to see your analytics!")
     else:
         # Summary metrics
         col1, col2, col3, col4 = st.columns(4)
         
-        scores = [h['score'] for h in st.session_state.interview_history]
-        
         with col1:
-            st.metric("Total Questions", len(st.session_state.interview_history))
+            st.metric("Total Questions", analytics.count)
         with col2:
-            st.metric("Average Score", f"{sum(scores)/len(scores):.1f}%")
+            st.metric("Average Score", f"{analytics.average:.1f}%")
         with col3:
-            st.metric("Highest Score", f"{max(scores)}%")
+            st.metric("Highest Score", f"{analytics.highest}%")
         with col4:
-            st.metric("Lowest Score", f"{min(scores)}%")
+            st.metric("Lowest Score", f"{analytics.lowest}%")
         
         # Score distribution by category
         st.subheader("Performance by Category")
-        category_data = {}
-        for h in st.session_state.interview_history:
-            cat = h['category']
-            if cat not in category_data:
-                category_data[cat] = []
-            category_data[cat].append(h['score'])
-        
-        category_df = pd.DataFrame([
-            {'Category': cat, 'Average Score': sum(scores)/len(scores), 'Questions': len(scores)}
-            for cat, scores in category_data.items()
-        ])
+        category_df = pd.DataFrame(analytics.category_rows())
         st.dataframe(category_df, use_container_width=True)
         
         # Progress over time
         st.subheader("Score Progression")
-        progress_df = pd.DataFrame([
-            {'Question #': idx+1, 'Score': h['score']}
-            for idx, h in enumerate(st.session_state.interview_history)
-        ])
+        progress_df = pd.DataFrame({'Question #': range(1, analytics.count + 1), 'Score': analytics.scores})
         st.line_chart(progress_df.set_index('Question #'))
         
         # Common improvement areas
         st.subheader("Common Areas for Improvement")
-        all_improvements = []
-        for h in st.session_state.interview_history:
-            if 'feedback' in h and 'improvements' in h['feedback']:
-                all_improvements.extend(h['feedback']['improvements'])
-        
-        if all_improvements:
-            from collections import Counter
-            improvement_counts = Counter(all_improvements)
-            for improvement, count in improvement_counts.most_common(5):
-                st.write(f"- {improvement} (mentioned {count} times)")
+        for improvement, count in analytics.top_improvements():
+            st.write(f"- {improvement} (mentioned {count} times)")
 
 # Footer
 st.markdown("---")
-st.caption("Mock Interview Agent | Powered by RAG + Chain-of-Thought Evaluation")
\ No newline at end of file
+st.caption("Mock Interview Agent | Powered by RAG + Chain-of-Thought Evaluation")
+
+# Wait for a running evaluation, rerunning as soon as it finishes. The wait is capped
+# with backoff (0.25s doubling to 2s), so a slow evaluation reruns the page at most every 2s
+pending = st.session_state.pending_evaluation
+if pending is not None:
+    polls = pending.get('polls', 0)
+    pending['polls'] = polls + 1
+    wait([pending['future']], timeout=min(0.25 * 2 ** polls, 2.0))
+    st.rerun()
\ No newline at end of file
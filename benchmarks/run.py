@@ -0,0 +1,196 @@
+"""Latency, throughput and memory benchmarks for the retrieval, generation and evaluation hot paths.
+
+Runs offline on a synthetic corpus with a deterministic stub embedder and
+compares the results against a stored baseline; the exit status is 1 when a
+stage regressed by more than the tolerance.
+
+Usage:
+    python -m benchmarks.run --size 10000
+    python -m benchmarks.run --size 1000000 --index-type ivf_flat --queries 200
+    python -m benchmarks.run --update-baseline
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.synthetic import (CATEGORIES, DIFFICULTIES, SKILLS, register_stub_backend, synthetic_answers,
+                                  synthetic_job_contexts, synthetic_queries, synthetic_questions)
+from src.evaluator import ResponseEvaluator
+from src.question_generator import QuestionGenerator
+from src.rag_engine import RAGEngine
+from utils.skill_matcher import SkillMatcher
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+# Untimed iterations run first so imports, allocations and caches settle
+WARMUP_ITERATIONS = 20
+# Iterations re-run under tracemalloc to measure each stage's peak memory
+MEMORY_ITERATIONS = 20
+# Latency changes smaller than this are noise, whatever the ratio
+MIN_REGRESSION_MS = 0.05
+
+def _measure(operations: List[Callable[[], object]], reset: Callable[[], None] = None,
+             units_per_operation: int = 1) -> Dict:
+    """Time each operation, then re-run a prefix under tracemalloc for peak memory."""
+    for operation in operations[:WARMUP_ITERATIONS]:
+        operation()
+    if reset:
+        reset()
+    latencies = np.empty(len(operations))
+    start = time.perf_counter()
+    for i, operation in enumerate(operations):
+        op_start = time.perf_counter()
+        operation()
+        latencies[i] = time.perf_counter() - op_start
+    total = time.perf_counter() - start
+
+    # Tracing slows Python code down, so memory is measured in a separate pass
+    if reset:
+        reset()
+    tracemalloc.start()
+    for operation in operations[:MEMORY_ITERATIONS]:
+        operation()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'iterations': len(operations),
+        'p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'p95_ms': float(np.percentile(latencies, 95) * 1000),
+        'p99_ms': float(np.percentile(latencies, 99) * 1000),
+        'throughput': len(operations) * units_per_operation / max(total, 1e-9),
+        'peak_mb': peak / 2 ** 20,
+    }
+
+def _measure_build(rag_engine: RAGEngine, documents: List[Dict]) -> Dict:
+    """Embed and index the corpus once; timing includes tracemalloc overhead."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    rag_engine.load_documents(documents)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    ms = elapsed * 1000
+    return {'iterations': 1, 'p50_ms': ms, 'p95_ms': ms, 'p99_ms': ms,
+            'throughput': len(documents) / max(elapsed, 1e-9), 'peak_mb': peak / 2 ** 20}
+
+def run_benchmarks(size: int = 10000, queries: int = 500, dimension: int = 384, index_type: str = 'flat',
+                   k: int = 5, batch_size: int = 32) -> Dict[str, Dict]:
+    """Run every stage and return its metrics by stage name."""
+    register_stub_backend()
+    rag_engine = RAGEngine(backend='stub', embedder_options={'dimension': dimension}, cache_dir=None,
+                           index_type=index_type, knowledge_base=False)
+    results = {'build': _measure_build(rag_engine, synthetic_questions(size))}
+
+    query_texts = synthetic_queries(queries, size)
+    reset_queries = rag_engine.query_cache.clear
+    filters = [{'category': CATEGORIES[i % len(CATEGORIES)], 'difficulty': DIFFICULTIES[i % len(DIFFICULTIES)]}
+               for i in range(queries)]
+
+    results['retrieve_dense'] = _measure(
+        [lambda q=q: rag_engine.retrieve(q, k) for q in query_texts], reset_queries)
+    results['retrieve_filtered'] = _measure(
+        [lambda q=q, f=f: rag_engine.retrieve(q, k, doc_type='question', filters=f)
+         for q, f in zip(query_texts, filters)], reset_queries)
+    results['retrieve_lexical'] = _measure(
+        [lambda q=q: rag_engine.retrieve(q, k, mode='lexical') for q in query_texts])
+    results['retrieve_hybrid'] = _measure(
+        [lambda q=q: rag_engine.retrieve(q, k, mode='hybrid') for q in query_texts], reset_queries)
+    batches = [query_texts[i:i + batch_size] for i in range(0, len(query_texts), batch_size)]
+    results['retrieve_batch'] = _measure(
+        [lambda b=b: rag_engine.retrieve_batch(b, k) for b in batches], reset_queries, units_per_operation=batch_size)
+
+    # Generation: a new job context per call (pool build) vs. one context (pool hit)
+    question_gen = QuestionGenerator(rag_engine, skill_matcher=SkillMatcher({skill: [] for skill in SKILLS}))
+    contexts = synthetic_job_contexts(min(queries, 200))
+
+    def reset_generation():
+        question_gen._pools.clear()
+        rag_engine.query_cache.clear()
+
+    results['generate_cold'] = _measure(
+        [lambda c=c: question_gen.generate_question(c) for c in contexts], reset_generation)
+    history = []
+
+    def generate_warm():
+        # Sessions of 20 questions, so the history stays realistic
+        if len(history) == 20:
+            history.clear()
+        question = question_gen.generate_question(contexts[0], history)
+        history.append({'question': question['question']})
+
+    results['generate_warm'] = _measure([generate_warm] * queries, history.clear)
+
+    evaluator = ResponseEvaluator()
+    pairs = synthetic_answers(queries)
+    results['evaluate'] = _measure([lambda p=p: evaluator.evaluate_response(*p) for p in pairs])
+    return results
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Stages whose p95 latency grew, or whose throughput fell, by more than tolerance."""
+    regressions = []
+    for stage, row in results.items():
+        base = baseline.get(stage)
+        if base is None:
+            continue
+        if row['p95_ms'] > base['p95_ms'] * (1 + tolerance) and row['p95_ms'] - base['p95_ms'] > MIN_REGRESSION_MS:
+            regressions.append(f"{stage}: p95 {base['p95_ms']:.3f} -> {row['p95_ms']:.3f} ms")
+        if row['throughput'] < base['throughput'] / (1 + tolerance):
+            regressions.append(f"{stage}: throughput {base['throughput']:.0f} -> {row['throughput']:.0f}/s")
+    return regressions
+
+def format_report(results: Dict[str, Dict], baseline: Optional[Dict[str, Dict]] = None) -> str:
+    lines = [f"{'stage':<18} {'iters':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+             f"{'ops/s':>10} {'peak MB':>8} {'p95 vs base':>12}"]
+    for stage, row in results.items():
+        change = ''
+        if baseline and stage in baseline and baseline[stage]['p95_ms']:
+            change = f"{(row['p95_ms'] / baseline[stage]['p95_ms'] - 1) * 100:+.0f}%"
+        lines.append(f"{stage:<18} {row['iterations']:>6} {row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f} "
+                     f"{row['p99_ms']:>9.3f} {row['throughput']:>10.0f} {row['peak_mb']:>8.1f} {change:>12}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark retrieval, generation and evaluation")
+    parser.add_argument('--size', type=int, default=10000, help="Synthetic questions in the corpus")
+    parser.add_argument('--queries', type=int, default=500, help="Operations timed per stage")
+    parser.add_argument('--dimension', type=int, default=384, help="Stub embedding dimension")
+    parser.add_argument('--index-type', default='flat', help="RAGEngine index type")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline JSON to compare against")
+    parser.add_argument('--update-baseline', action='store_true', help="Store these results as the baseline")
+    parser.add_argument('--tolerance', type=float, default=0.5, help="Allowed relative slowdown")
+    args = parser.parse_args()
+
+    config = {'size': args.size, 'queries': args.queries, 'dimension': args.dimension, 'index_type': args.index_type}
+    results = run_benchmarks(args.size, args.queries, args.dimension, args.index_type)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            stored = json.load(f)
+        if stored.get('config') == config:
+            baseline = stored['results']
+        elif not args.update_baseline:
+            print(f"Baseline was recorded with {stored.get('config')}, not comparing")
+
+    print(format_report(results, baseline))
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({'config': config, 'results': results}, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+    elif baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""Deterministic synthetic corpora and a stub embedder for offline benchmarks."""
+
+import threading
+import zlib
+from typing import Dict, List
+
+import numpy as np
+
+from utils.chunking import tokenize
+from utils.embeddings import EMBEDDER_BACKENDS, BaseEmbedder
+
+SKILLS = [
+    'python', 'java', 'javascript', 'typescript', 'react', 'node.js', 'sql', 'postgresql', 'aws', 'gcp',
+    'azure', 'docker', 'kubernetes', 'terraform', 'kafka', 'spark', 'airflow', 'machine learning', 'nlp',
+    'pytorch', 'tensorflow', 'statistics', 'system design', 'microservices', 'graphql', 'security',
+    'testing', 'agile', 'leadership', 'communication', 'teamwork', 'problem solving', 'stakeholder management',
+    'time management', 'data analysis', 'product management', 'mentoring', 'c++', 'golang', 'linux',
+]
+CATEGORIES = ['technical', 'behavioral', 'situational']
+DIFFICULTIES = ['Easy', 'Medium', 'Hard']
+QUESTION_TEMPLATES = [
+    "How would you use {skill} to {verb} a {noun} for {topic}?",
+    "Tell me about a time you had to {verb} a {noun} with {skill} under {constraint}.",
+    "Describe how you would {verb} the {noun} of a {topic} service using {skill}.",
+    "What would you do if the {noun} for {topic} failed and you had to {verb} it with {skill}?",
+    "Walk me through how you {verb} a {noun} when {constraint} and {skill} is involved.",
+]
+VERBS = ['design', 'debug', 'scale', 'migrate', 'secure', 'test', 'optimize', 'document', 'deliver', 'review']
+NOUNS = ['pipeline', 'api', 'dashboard', 'deployment', 'schema', 'release', 'roadmap', 'model', 'team', 'incident']
+CONSTRAINTS = ['a tight deadline', 'limited budget', 'unclear requirements', 'a production outage',
+               'conflicting priorities', 'a new team']
+FILLER = ['we', 'build', 'products', 'for', 'customers', 'and', 'work', 'closely', 'with', 'partners', 'across',
+          'the', 'company', 'to', 'ship', 'reliable', 'features', 'quickly', 'while', 'keeping', 'quality', 'high']
+
+class StubEmbedder(BaseEmbedder):
+    """Deterministic bag-of-words embeddings with no model or network access.
+
+    Each token maps to a fixed random vector seeded by its CRC32, and a text's
+    embedding is the sum of its token vectors. Texts sharing words therefore
+    have similar embeddings, which is enough to exercise search realistically.
+    """
+
+    def __init__(self, dimension: int = 384, batch_size: int = 4096):
+        self.dimension = dimension
+        self.batch_size = batch_size
+        self.name = f"stub-{dimension}"
+        self._token_ids: Dict[str, int] = {}
+        self._vectors = np.empty((1024, dimension), dtype='float32')
+        self._lock = threading.Lock()
+
+    def _token_id(self, token: str) -> int:
+        token_id = self._token_ids.get(token)
+        if token_id is None:
+            token_id = self._token_ids[token] = len(self._token_ids)
+            if token_id == len(self._vectors):
+                self._vectors = np.concatenate([self._vectors, np.empty_like(self._vectors)])
+            rng = np.random.default_rng(zlib.crc32(token.encode('utf-8')))
+            self._vectors[token_id] = rng.standard_normal(self.dimension, dtype='float32')
+        return token_id
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        embeddings = np.zeros((len(texts), self.dimension), dtype='float32')
+        with self._lock:
+            # Batched so memory stays bounded for million-document corpora
+            for start in range(0, len(texts), self.batch_size):
+                token_ids, offsets, rows = [], [], []
+                for row, text in enumerate(texts[start:start + self.batch_size], start):
+                    ids = [self._token_id(token) for token in tokenize(text)]
+                    if ids:
+                        offsets.append(len(token_ids))
+                        rows.append(row)
+                        token_ids.extend(ids)
+                if token_ids:
+                    embeddings[rows] = np.add.reduceat(self._vectors[token_ids], offsets, axis=0)
+        return embeddings
+
+def register_stub_backend():
+    """Make the stub available to RAGEngine as backend='stub'."""
+    EMBEDDER_BACKENDS['stub'] = lambda model_name, **options: StubEmbedder(**options)
+
+def _question(rng: np.random.Generator, topic_count: int) -> str:
+    template = QUESTION_TEMPLATES[rng.integers(len(QUESTION_TEMPLATES))]
+    return template.format(
+        skill=SKILLS[rng.integers(len(SKILLS))],
+        verb=VERBS[rng.integers(len(VERBS))],
+        noun=NOUNS[rng.integers(len(NOUNS))],
+        constraint=CONSTRAINTS[rng.integers(len(CONSTRAINTS))],
+        # Rare terms, so lexical search has selective postings
+        topic=f"topic{rng.integers(topic_count)}",
+    )
+
+def synthetic_questions(n: int, seed: int = 0) -> List[Dict]:
+    """n question documents in the knowledge base shape."""
+    rng = np.random.default_rng(seed)
+    topic_count = max(n // 10, 1)
+    documents = []
+    for _ in range(n):
+        skills = [SKILLS[i] for i in rng.choice(len(SKILLS), size=rng.integers(1, 4), replace=False)]
+        documents.append({
+            'type': 'question',
+            'content': _question(rng, topic_count),
+            'metadata': {
+                'category': CATEGORIES[rng.integers(len(CATEGORIES))],
+                'difficulty': DIFFICULTIES[rng.integers(len(DIFFICULTIES))],
+                'skills': skills,
+            }
+        })
+    return documents
+
+def synthetic_queries(n: int, corpus_size: int, seed: int = 1) -> List[str]:
+    """n distinct search queries over the synthetic vocabulary."""
+    rng = np.random.default_rng(seed)
+    topic_count = max(corpus_size // 10, 1)
+    return [f"{SKILLS[rng.integers(len(SKILLS))]} {VERBS[rng.integers(len(VERBS))]} "
+            f"{NOUNS[rng.integers(len(NOUNS))]} topic{rng.integers(topic_count)} q{i}" for i in range(n)]
+
+def synthetic_job_contexts(n: int, words: int = 300, seed: int = 2) -> List[Dict]:
+    """n job contexts with long descriptions mentioning a handful of skills."""
+    rng = np.random.default_rng(seed)
+    contexts = []
+    for i in range(n):
+        vocabulary = FILLER + [SKILLS[j] for j in rng.choice(len(SKILLS), size=6, replace=False)]
+        description = ' '.join(vocabulary[j] for j in rng.integers(len(vocabulary), size=words))
+        contexts.append({'title': f"Engineer {i}", 'company': 'Synthetic Co', 'description': description})
+    return contexts
+
+def synthetic_answers(n: int, seed: int = 3) -> List[tuple]:
+    """n (question, response) pairs of 20 to 250 words, some with STAR structure and metrics."""
+    rng = np.random.default_rng(seed)
+    star = ['In my previous role the situation was', 'my task was to', 'I decided to', 'as a result we saw']
+    pairs = []
+    for _ in range(n):
+        question = _question(rng, 1000)
+        words = [FILLER[j] for j in rng.integers(len(FILLER), size=rng.integers(20, 250))]
+        if rng.random() < 0.5:
+            words = star[:2] + words + star[2:] + [f"{rng.integers(5, 60)}% improvement"]
+        pairs.append((question, ' '.join(words)))
+    return pairs
\ No newline at end of file
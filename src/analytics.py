@@ -0,0 +1,91 @@
+from collections import Counter
+from typing import Dict, List, Tuple
+
+class SessionAnalytics:
+    """Running score aggregates for an interview session.
+
+    Updated in O(1) per answer (O(top_k) for the improvement ranking), so the
+    sidebar and Analytics tab never rescan the session history.
+    """
+
+    def __init__(self, top_k: int = 5):
+        self.top_k = top_k
+        self.count = 0
+        self.total = 0
+        self.highest = None
+        self.lowest = None
+        # category -> {'count', 'total', 'highest', 'lowest'}
+        self.categories: Dict[str, Dict] = {}
+        # Scores in answer order, for the progression chart
+        self.scores: List[int] = []
+        self.improvement_counts = Counter()
+        # improvement -> order of first mention, which breaks ties as Counter.most_common does
+        self._first_seen: Dict[str, int] = {}
+        self._top_improvements: List[str] = []
+
+    def add(self, entry: Dict):
+        """Fold one history entry into the aggregates."""
+        score = entry['score']
+        self.count += 1
+        self.total += score
+        self.highest = score if self.highest is None else max(self.highest, score)
+        self.lowest = score if self.lowest is None else min(self.lowest, score)
+        self.scores.append(score)
+
+        stats = self.categories.get(entry['category'])
+        if stats is None:
+            self.categories[entry['category']] = {'count': 1, 'total': score, 'highest': score, 'lowest': score}
+        else:
+            stats['count'] += 1
+            stats['total'] += score
+            stats['highest'] = max(stats['highest'], score)
+            stats['lowest'] = min(stats['lowest'], score)
+
+        for improvement in entry.get('feedback', {}).get('improvements', []):
+            self._count_improvement(improvement)
+
+    def _count_improvement(self, improvement: str):
+        """Increment a count and keep the top-k ranking sorted.
+
+        Ranked by count, then by first mention, like Counter.most_common. Counts
+        only grow by one, so an improvement outside the top k can only enter by
+        overtaking the current last place.
+        """
+        counts = self.improvement_counts
+        if improvement not in self._first_seen:
+            self._first_seen[improvement] = len(self._first_seen)
+        counts[improvement] += 1
+        top = self._top_improvements
+        rank = self._rank
+
+        if improvement in top:
+            pos = top.index(improvement)
+        elif len(top) < self.top_k:
+            top.append(improvement)
+            pos = len(top) - 1
+        elif rank(improvement) < rank(top[-1]):
+            top[-1] = improvement
+            pos = len(top) - 1
+        else:
+            return
+
+        while pos > 0 and rank(top[pos - 1]) > rank(improvement):
+            top[pos - 1], top[pos] = top[pos], top[pos - 1]
+            pos -= 1
+
+    def _rank(self, improvement: str) -> Tuple[int, int]:
+        return -self.improvement_counts[improvement], self._first_seen[improvement]
+
+    @property
+    def average(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def category_rows(self) -> List[Dict]:
+        """Per-category averages, in the shape of the Analytics table."""
+        return [
+            {'Category': category, 'Average Score': stats['total'] / stats['count'], 'Questions': stats['count']}
+            for category, stats in self.categories.items()
+        ]
+
+    def top_improvements(self) -> List[Tuple[str, int]]:
+        return [(improvement, self.improvement_counts[improvement]) for improvement in self._top_improvements]
\ No newline at end of file
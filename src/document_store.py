@@ -0,0 +1,308 @@
+import mmap
+import sys
+import tempfile
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Short strings (types, categories, skills, sources, hashes) are interned so repeats share one object
+INTERN_MAX_LENGTH = 64
+# The text blob is rewritten once the text of removed or replaced documents passes this size
+# and outweighs the live text
+COMPACT_MIN_BYTES = 1 << 20
+# Code value for "not stored in the column"
+_NO_CODE = -1
+# Largest code the signed 16-bit category/difficulty columns hold
+_MAX_CODE = 32767
+# Stands for a metadata value equal to the content, e.g. a job description's 'description'
+_CONTENT = object()
+_FIELDS = frozenset({'type', 'content', 'metadata'})
+
+class _CodeTable:
+    """Maps values to small integer codes and back."""
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __contains__(self, value) -> bool:
+        return value in self._codes
+
+    def code(self, value) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+def _freeze(value):
+    """Hashable, shareable form of a JSON metadata value (lists become tuples)."""
+    if isinstance(value, str):
+        return sys.intern(value) if len(value) <= INTERN_MAX_LENGTH else value
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def _thaw(value):
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+class DocumentStore:
+    """RAGEngine documents by id, stored in columns instead of one dict per document.
+
+    Type, category and difficulty are small integer codes in typed arrays.
+    The text lives in one UTF-8 blob with offsets, optionally in a
+    memory-mapped temporary file so it sits in the page cache instead of the
+    process heap. Other metadata is kept as tuples of interned, shared
+    values, and a metadata value equal to the content (a job description's
+    'description') is not stored twice.
+
+    Text of removed or replaced documents is reclaimed by compact(), which
+    runs automatically once it outweighs the live text (see COMPACT_MIN_BYTES).
+
+    Indexing rebuilds the {'type', 'content', 'metadata'} dict the document
+    was added with; metadata lists come back as new lists, so callers may
+    modify results freely. Documents of another shape are kept as given.
+    Not thread-safe: RAGEngine only calls it with its lock held.
+    """
+
+    def __init__(self, documents: Iterable[Dict] = (), mmap_text: bool = False, text_dir: str = None):
+        self._types = _CodeTable()
+        self._categories = _CodeTable()
+        self._difficulties = _CodeTable()
+        # Metadata key order, shared by all documents with the same keys
+        self._layouts = _CodeTable()
+        self._type_codes = array('H')
+        self._category_codes = array('h')
+        self._difficulty_codes = array('h')
+        self._layout_codes = array('I')
+        self._offsets = array('Q')
+        self._lengths = array('I')
+        self._live = bytearray()
+        # Remaining metadata values in layout order, or None when there are none
+        self._extras: List[Optional[tuple]] = []
+        self._irregular: Dict[int, Dict] = {}
+        # One shared copy of each frozen metadata value, e.g. a skill list
+        self._values: Dict[tuple, tuple] = {}
+        # hash(content) -> id, or a tuple of ids for duplicate contents
+        self._by_hash: Dict[int, object] = {}
+        self._count = 0
+        self._text_dir = text_dir
+        self._file = tempfile.TemporaryFile(dir=text_dir) if mmap_text else None
+        self._text = bytearray() if self._file is None else None
+        self._text_size = 0
+        # Bytes of the blob no stored document refers to
+        self._dead_bytes = 0
+        self._map = None
+        self.update(enumerate(documents))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, doc_id) -> bool:
+        return isinstance(doc_id, int) and 0 <= doc_id < len(self._live) and self._live[doc_id] == 1
+
+    def __iter__(self) -> Iterator[int]:
+        """Ids of stored documents, ascending."""
+        live = self._live
+        doc_id = live.find(1)
+        while doc_id != -1:
+            yield doc_id
+            doc_id = live.find(1, doc_id + 1)
+
+    def items(self) -> Iterator[Tuple[int, Dict]]:
+        for doc_id in self:
+            yield doc_id, self[doc_id]
+
+    def __getitem__(self, doc_id: int) -> Dict:
+        if doc_id not in self:
+            raise KeyError(doc_id)
+        document = self._irregular.get(doc_id)
+        if document is not None:
+            return document
+
+        content = self.content(doc_id)
+        extras = iter(self._extras[doc_id] or ())
+        category = self._category_codes[doc_id]
+        difficulty = self._difficulty_codes[doc_id]
+        metadata = {}
+        for key in self._layouts.values[self._layout_codes[doc_id]]:
+            if key == 'category' and category != _NO_CODE:
+                metadata[key] = self._categories.values[category]
+            elif key == 'difficulty' and difficulty != _NO_CODE:
+                metadata[key] = self._difficulties.values[difficulty]
+            else:
+                value = next(extras)
+                metadata[key] = content if value is _CONTENT else _thaw(value)
+        return {'type': self._types.values[self._type_codes[doc_id]], 'content': content, 'metadata': metadata}
+
+    def __setitem__(self, doc_id: int, document: Dict):
+        if doc_id in self:
+            self._discard(doc_id)
+        self._grow(doc_id + 1)
+
+        content = document['content']
+        data = content.encode('utf-8')
+        self._offsets[doc_id] = self._append_text(data)
+        self._lengths[doc_id] = len(data)
+
+        metadata = document.get('metadata')
+        regular = (document.keys() == _FIELDS and isinstance(metadata, dict) and isinstance(document['type'], str)
+                   and (document['type'] in self._types or len(self._types) < 65536))
+        if regular:
+            self._type_codes[doc_id] = self._types.code(sys.intern(document['type']))
+            category = difficulty = _NO_CODE
+            keys, extras = [], []
+            for key, value in metadata.items():
+                keys.append(sys.intern(key) if isinstance(key, str) else key)
+                if key == 'category' and self._codable(self._categories, value):
+                    category = self._categories.code(sys.intern(value))
+                elif key == 'difficulty' and self._codable(self._difficulties, value):
+                    difficulty = self._difficulties.code(sys.intern(value))
+                elif isinstance(value, str) and value == content:
+                    extras.append(_CONTENT)
+                else:
+                    extras.append(self._shared(_freeze(value)))
+            self._category_codes[doc_id] = category
+            self._difficulty_codes[doc_id] = difficulty
+            self._layout_codes[doc_id] = self._layouts.code(tuple(keys))
+            self._extras[doc_id] = tuple(extras) if extras else None
+        else:
+            self._irregular[doc_id] = document
+
+        self._live[doc_id] = 1
+        self._count += 1
+        self._link(hash(content), doc_id)
+
+    def update(self, items: Iterable[Tuple[int, Dict]]):
+        for doc_id, document in items:
+            self[doc_id] = document
+
+    def pop(self, doc_id: int) -> Dict:
+        document = self[doc_id]
+        self._discard(doc_id)
+        return document
+
+    def content(self, doc_id: int) -> str:
+        """A document's text, without rebuilding the whole document."""
+        if doc_id not in self:
+            raise KeyError(doc_id)
+        return self._read_text(doc_id).decode('utf-8')
+
+    def ids_with_content(self, content: str) -> List[int]:
+        """Ids of the documents whose text is exactly content."""
+        ids = self._by_hash.get(hash(content))
+        if ids is None:
+            return []
+        if isinstance(ids, int):
+            ids = (ids,)
+        return [doc_id for doc_id in ids if self.content(doc_id) == content]
+
+    def compact(self):
+        """Rewrite the text blob with only the text of stored documents."""
+        text = bytearray() if self._file is None else None
+        text_file = None if self._file is None else tempfile.TemporaryFile(dir=self._text_dir)
+        size = 0
+        for doc_id in self:
+            data = self._read_text(doc_id)
+            if text is None:
+                text_file.write(data)
+            else:
+                text += data
+            self._offsets[doc_id] = size
+            size += len(data)
+        self.close()
+        self._text, self._file = text, text_file
+        self._text_size = size
+        self._dead_bytes = 0
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+
+    @staticmethod
+    def _codable(table: _CodeTable, value) -> bool:
+        return isinstance(value, str) and (value in table or len(table) <= _MAX_CODE)
+
+    def _shared(self, value):
+        if not isinstance(value, tuple):
+            return value
+        try:
+            return self._values.setdefault(value, value)
+        except TypeError:
+            # Holds an unhashable value (e.g. a dict); kept unshared
+            return value
+
+    def _grow(self, size: int):
+        missing = size - len(self._live)
+        if missing <= 0:
+            return
+        self._type_codes.extend([0] * missing)
+        self._category_codes.extend([_NO_CODE] * missing)
+        self._difficulty_codes.extend([_NO_CODE] * missing)
+        self._layout_codes.extend([0] * missing)
+        self._offsets.extend([0] * missing)
+        self._lengths.extend([0] * missing)
+        self._live.extend(bytes(missing))
+        self._extras.extend([None] * missing)
+
+    def _discard(self, doc_id: int):
+        self._unlink(hash(self.content(doc_id)), doc_id)
+        self._live[doc_id] = 0
+        self._extras[doc_id] = None
+        self._irregular.pop(doc_id, None)
+        self._count -= 1
+        self._dead_bytes += self._lengths[doc_id]
+        if self._dead_bytes >= COMPACT_MIN_BYTES and self._dead_bytes > self._text_size - self._dead_bytes:
+            self.compact()
+
+    def _link(self, key: int, doc_id: int):
+        ids = self._by_hash.get(key)
+        if ids is None:
+            self._by_hash[key] = doc_id
+        elif isinstance(ids, int):
+            self._by_hash[key] = (ids, doc_id)
+        else:
+            self._by_hash[key] = ids + (doc_id,)
+
+    def _unlink(self, key: int, doc_id: int):
+        ids = self._by_hash[key]
+        if isinstance(ids, int):
+            del self._by_hash[key]
+            return
+        remaining = tuple(i for i in ids if i != doc_id)
+        self._by_hash[key] = remaining[0] if len(remaining) == 1 else remaining
+
+    def _append_text(self, data: bytes) -> int:
+        offset = self._text_size
+        if self._file is None:
+            self._text += data
+        else:
+            self._file.write(data)
+        self._text_size += len(data)
+        return offset
+
+    def _read_text(self, doc_id: int) -> bytes:
+        start = self._offsets[doc_id]
+        end = start + self._lengths[doc_id]
+        if start == end:
+            return b''
+        if self._file is None:
+            return self._text[start:end]
+        if self._map is None or len(self._map) < end:
+            self._remap()
+        return self._map[start:end]
+
+    def _remap(self):
+        """Map the text file again after it grew."""
+        self._file.flush()
+        previous = self._map
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if previous is not None:
+            previous.close()
\ No newline at end of file
@@ -1,5 +1,35 @@
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
 import re
+from utils.metrics import metrics
+
+# Rubric tables are built once at import instead of on every evaluation.
+# Substring checks are kept for STAR keywords: in CPython they measure faster
+# than a combined alternation regex over typical answer lengths.
+STRUCTURE_INDICATORS = (
+    ('situation', ('situation', 'context', 'background', 'when', 'where')),
+    ('task', ('task', 'challenge', 'problem', 'objective', 'goal')),
+    ('action', ('action', 'did', 'implemented', 'developed', 'created', 'led')),
+    ('result', ('result', 'outcome', 'achieved', 'improved', 'increased', 'decreased'))
+)
+
+SPECIFICITY_INDICATORS = tuple(
+    (re.compile(pattern, re.IGNORECASE), description) for pattern, description in (
+        (r'\d+%', 'percentages/metrics'),
+        (r'\d+\s*(months?|years?|weeks?|days?)', 'timeframes'),
+        (r'(\$\d+|revenue|cost|budget)', 'financial metrics'),
+        (r'(increased|decreased|improved|reduced)\s+\w+\s+by', 'quantifiable improvements'),
+        (r'(React|Python|Java|SQL|AWS|Docker|Kubernetes|[A-Z][a-z]+\s+[A-Z][a-z]+)', 'specific technologies/methods')
+    )
+)
+
+WORD_PATTERN = re.compile(r'\b\w+\b')
+STOP_WORDS = frozenset({'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for'})
+
+@lru_cache(maxsize=4096)
+def _question_keywords(question: str) -> frozenset:
+    """Keywords of a question; cached because the same questions are scored many times."""
+    return frozenset(WORD_PATTERN.findall(question.lower())) - STOP_WORDS
 
 class ResponseEvaluator:
     """Evaluate interview responses using Chain-of-Thought reasoning."""
@@ -12,6 +42,7 @@ class ResponseEvaluator:
             'relevance': {'weight': 0.3, 'threshold': 0.6}
         }
     
+    @metrics.timed('evaluate_response')
     def evaluate_response(self, question: str, response: str, 
                          job_context: Dict = None) -> Dict:
         """
@@ -53,27 +84,23 @@ class ResponseEvaluator:
         # Step 2: Structure Analysis (STAR method)
         reasoning_steps.append("\nStep 2 - Structure Analysis: Checking for clear organization...")
         
-        structure_indicators = {
-            'situation': ['situation', 'context', 'background', 'when', 'where'],
-            'task': ['task', 'challenge', 'problem', 'objective', 'goal'],
-            'action': ['action', 'did', 'implemented', 'developed', 'created', 'led'],
-            'result': ['result', 'outcome', 'achieved', 'improved', 'increased', 'decreased']
-        }
-        
         response_lower = response.lower()
         structure_score = 0
         found_components = []
         
-        for component, keywords in structure_indicators.items():
-            if any(keyword in response_lower for keyword in keywords):
-                structure_score += 25
-                found_components.append(component.upper())
+        with metrics.span('evaluate_structure'):
+            for component, keywords in STRUCTURE_INDICATORS:
+                for keyword in keywords:
+                    if keyword in response_lower:
+                        structure_score += 25
+                        found_components.append(component.upper())
+                        break
         
         if structure_score >= 75:
             evaluation['strengths'].append(f"Well-structured answer using {', '.join(found_components)} components")
             reasoning_steps.append(f"→ Found {len(found_components)}/4 STAR components: {', '.join(found_components)}")
         elif structure_score >= 50:
-            missing = [c.upper() for c in structure_indicators.keys() if c.upper() not in found_components]
+            missing = [c.upper() for c, _ in STRUCTURE_INDICATORS if c.upper() not in found_components]
             evaluation['improvements'].append(f"Consider adding {', '.join(missing)} to strengthen structure")
             reasoning_steps.append(f"→ Partial structure detected, missing: {', '.join(missing)}")
         else:
@@ -83,18 +110,11 @@ class ResponseEvaluator:
         # Step 3: Specificity Analysis
         reasoning_steps.append("\nStep 3 - Specificity Analysis: Checking for concrete examples...")
         
-        specificity_indicators = [
-            (r'\d+%', 'percentages/metrics'),
-            (r'\d+\s*(months?|years?|weeks?|days?)', 'timeframes'),
-            (r'(\$\d+|revenue|cost|budget)', 'financial metrics'),
-            (r'(increased|decreased|improved|reduced)\s+\w+\s+by', 'quantifiable improvements'),
-            (r'(React|Python|Java|SQL|AWS|Docker|Kubernetes|[A-Z][a-z]+\s+[A-Z][a-z]+)', 'specific technologies/methods')
-        ]
-        
         specifics_found = []
-        for pattern, description in specificity_indicators:
-            if re.search(pattern, response, re.IGNORECASE):
-                specifics_found.append(description)
+        with metrics.span('evaluate_specificity'):
+            for pattern, description in SPECIFICITY_INDICATORS:
+                if pattern.search(response):
+                    specifics_found.append(description)
         
         specificity_score = min(len(specifics_found) * 25, 100)
         
@@ -110,8 +130,9 @@ class ResponseEvaluator:
         # Step 4: Relevance Analysis
         reasoning_steps.append("\nStep 4 - Relevance Analysis: Assessing alignment with question...")
         
-        question_keywords = set(re.findall(r'\b\w+\b', question.lower())) - {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for'}
-        response_keywords = set(re.findall(r'\b\w+\b', response.lower()))
+        with metrics.span('evaluate_relevance'):
+            question_keywords = _question_keywords(question)
+            response_keywords = set(WORD_PATTERN.findall(response_lower))
         
         keyword_overlap = len(question_keywords & response_keywords) / max(len(question_keywords), 1)
         relevance_score = min(keyword_overlap * 150, 100)  # Scale up
@@ -154,6 +175,14 @@ class ResponseEvaluator:
         
         return evaluation
     
+    def evaluate_batch(self, pairs: Iterable[Tuple]) -> List[Dict]:
+        """Evaluate many (question, response) or (question, response, job_context) tuples.
+        
+        Used for bulk re-scoring; question keyword sets are shared across pairs.
+        """
+        evaluate = self.evaluate_response
+        return [evaluate(*pair) for pair in pairs]
+    
     def _generate_followup(self, original_question: str, improvements: List[str]) -> str:
         """Generate a follow-up question based on identified gaps."""
         if any('example' in imp.lower() or 'specific' in imp.lower() for imp in improvements):
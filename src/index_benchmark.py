@@ -0,0 +1,131 @@
+"""Recall vs. latency report for the supported FAISS index types.
+
+Compares each configuration against an exact flat search over the same
+embeddings, so an nprobe/efSearch setting can be picked with evidence.
+
+Usage:
+    python -m src.index_benchmark --size 100000 --queries 500
+    # the cached matrix is the embeddings-*.npy file named in the cache's embeddings.json
+    python -m src.index_benchmark --embeddings data/.cache/all-MiniLM-L6-v2/embeddings-<version>.npy
+"""
+
+import argparse
+import time
+from typing import Dict, List
+
+import faiss
+import numpy as np
+
+from src.vector_index import build_index, describe_index, search_parameters
+
+DEFAULT_CONFIGS = [
+    {'index_type': 'flat_fp16'},
+    {'index_type': 'flat_int8'},
+    {'index_type': 'ivf_flat', 'nlist': 1024, 'nprobe': 4},
+    {'index_type': 'ivf_flat', 'nlist': 1024, 'nprobe': 16},
+    {'index_type': 'ivf_flat', 'nlist': 1024, 'nprobe': 64},
+    {'index_type': 'ivf_pq', 'nlist': 1024, 'pq_m': 48, 'nprobe': 16},
+    {'index_type': 'ivf_pq', 'nlist': 1024, 'pq_m': 48, 'nprobe': 64},
+    {'index_type': 'hnsw', 'hnsw_m': 32, 'ef_search': 32},
+    {'index_type': 'hnsw', 'hnsw_m': 32, 'ef_search': 128},
+]
+
+BUILD_OPTIONS = ('nlist', 'pq_m', 'hnsw_m')
+SEARCH_OPTIONS = ('nprobe', 'ef_search')
+
+def synthetic_embeddings(n: int, dimension: int = 384, clusters: int = 256, seed: int = 0) -> np.ndarray:
+    """Clustered random unit vectors, roughly shaped like sentence embeddings."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dimension)).astype('float32')
+    embeddings = centers[rng.integers(0, clusters, n)]
+    embeddings += 0.5 * rng.standard_normal((n, dimension)).astype('float32')
+    faiss.normalize_L2(embeddings)
+    return embeddings
+
+def _search_latencies(index, queries: np.ndarray, k: int, params) -> tuple:
+    """Search one query at a time, the way RAGEngine.retrieve does."""
+    labels = np.empty((len(queries), k), dtype='int64')
+    latencies = np.empty(len(queries))
+    for i in range(len(queries)):
+        start = time.perf_counter()
+        _, labels[i:i + 1] = index.search(queries[i:i + 1], k, params=params)
+        latencies[i] = time.perf_counter() - start
+    return labels, latencies
+
+def recall_latency_report(embeddings: np.ndarray, queries: np.ndarray,
+                          configs: List[Dict] = None, k: int = 10) -> List[Dict]:
+    """Measure recall@k and per-query latency of each config against flat search."""
+    ids = np.arange(len(embeddings), dtype='int64')
+    flat = build_index(embeddings, 'flat')
+    flat.add_with_ids(embeddings, ids)
+    truth, flat_latencies = _search_latencies(flat, queries, k, None)
+
+    rows = [{
+        'config': 'flat',
+        'recall': 1.0,
+        'p50_ms': float(np.percentile(flat_latencies, 50) * 1000),
+        'p95_ms': float(np.percentile(flat_latencies, 95) * 1000),
+        'build_s': 0.0,
+    }]
+
+    for config in configs or DEFAULT_CONFIGS:
+        build_options = {key: config[key] for key in BUILD_OPTIONS if key in config}
+        search_options = {key: config[key] for key in SEARCH_OPTIONS if key in config}
+
+        start = time.perf_counter()
+        index = build_index(embeddings, config['index_type'], **build_options)
+        index.add_with_ids(embeddings, ids)
+        build_seconds = time.perf_counter() - start
+
+        labels, latencies = _search_latencies(index, queries, k, search_parameters(index, **search_options))
+        hits = sum(len(set(found) & set(expected)) for found, expected in zip(labels, truth))
+
+        # Label with the index actually built: build_index may lower nlist or fall back to flat
+        built = describe_index(index)
+        if 'nlist' in built and 'nprobe' in search_options:
+            built['nprobe'] = min(search_options['nprobe'], built['nlist'])
+        if built['index_type'] == 'hnsw' and 'ef_search' in search_options:
+            built['ef_search'] = search_options['ef_search']
+        rows.append({
+            'config': ' '.join([built['index_type']] + [f"{key}={value}" for key, value in built.items()
+                                                         if key != 'index_type']),
+            'requested': config,
+            'recall': hits / truth.size,
+            'p50_ms': float(np.percentile(latencies, 50) * 1000),
+            'p95_ms': float(np.percentile(latencies, 95) * 1000),
+            'build_s': build_seconds,
+        })
+
+    return rows
+
+def format_report(rows: List[Dict], k: int = 10) -> str:
+    lines = [f"{'config':<42} {'recall@' + str(k):>9} {'p50 ms':>8} {'p95 ms':>8} {'build s':>8}"]
+    for row in rows:
+        lines.append(f"{row['config']:<42} {row['recall']:>9.3f} {row['p50_ms']:>8.3f} "
+                     f"{row['p95_ms']:>8.3f} {row['build_s']:>8.1f}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall vs. latency report for FAISS index types")
+    parser.add_argument('--embeddings', help="Normalized float32 .npy matrix (defaults to synthetic data)")
+    parser.add_argument('--size', type=int, default=100000, help="Synthetic corpus size")
+    parser.add_argument('--dimension', type=int, default=384, help="Synthetic embedding dimension")
+    parser.add_argument('--queries', type=int, default=500, help="Number of queries to time")
+    parser.add_argument('-k', type=int, default=10, help="Neighbours per query")
+    args = parser.parse_args()
+
+    if args.embeddings:
+        embeddings = np.ascontiguousarray(np.load(args.embeddings), dtype='float32')
+    else:
+        embeddings = synthetic_embeddings(args.size, args.dimension)
+
+    # Queries are perturbed corpus vectors so they have realistic neighbourhoods
+    rng = np.random.default_rng(1)
+    queries = embeddings[rng.integers(0, len(embeddings), args.queries)].copy()
+    queries += 0.1 * rng.standard_normal(queries.shape).astype('float32')
+    faiss.normalize_L2(queries)
+
+    print(format_report(recall_latency_report(embeddings, queries, k=args.k), k=args.k))
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,186 @@
+"""Ingest a directory of job descriptions or resumes into the knowledge base.
+
+Files are extracted with FileHandler and chunked in a process pool, and chunks
+are embedded in large batches through RAGEngine.add_documents. Each batch is
+appended to data/ingested/documents.jsonl, which RAGEngine.load_knowledge_base
+loads on startup. A manifest of file hashes makes reruns skip unchanged files
+and replace the chunks of files that changed.
+
+Usage:
+    python -m src.ingest path/to/job_descriptions
+    python -m src.ingest path/to/resumes --type resume --workers 4
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.rag_engine import RAGEngine
+from utils.catalog import (INGEST_MANIFEST_PATH, INGESTED_DOCUMENTS_PATH, iter_ingested_documents,
+                           load_ingest_manifest)
+from utils.chunking import CHUNK_OVERLAP, CHUNK_WORDS, chunk_text
+from utils.file_handler import FileHandler
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.txt')
+
+def _iter_files(directory: str) -> Iterator[str]:
+    """Yield supported files under directory in a stable order."""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                yield os.path.join(root, name)
+
+def _extract_chunks(path: str, known_sha256: Optional[str], max_words: int,
+                    overlap: int) -> Tuple[str, Optional[List[str]]]:
+    """Hash and chunk one file in a worker process.
+
+    Returns (sha256, chunks); chunks is None when the content matches known_sha256.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if digest == known_sha256:
+        return digest, None
+
+    buffer = io.BytesIO(data)
+    buffer.name = path
+    # Already one file per process, so pages are not split across another pool
+    text = "\n".join(FileHandler.iter_text(buffer, parallel=False))
+    return digest, chunk_text(text, max_words, overlap)
+
+def _write_manifest(manifest: Dict[str, Dict], path: str):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+def _compact(documents_path: str, manifest: Dict[str, Dict]):
+    """Rewrite the documents file without chunks of replaced file versions."""
+    tmp_path = f"{documents_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as out:
+        for doc in iter_ingested_documents(documents_path, manifest):
+            out.write(json.dumps(doc) + "\n")
+    os.replace(tmp_path, documents_path)
+
+def ingest_directory(directory: str, rag_engine: RAGEngine, doc_type: str = 'job_description',
+                     workers: int = None, batch_size: int = 256, max_words: int = CHUNK_WORDS,
+                     overlap: int = CHUNK_OVERLAP, documents_path: str = INGESTED_DOCUMENTS_PATH,
+                     manifest_path: str = INGEST_MANIFEST_PATH) -> Dict[str, int]:
+    """Add every new or changed file under directory to rag_engine and persist its chunks.
+
+    Returns counts of ingested, replaced, unchanged and failed files and of chunks added.
+    """
+    os.makedirs(os.path.dirname(documents_path) or '.', exist_ok=True)
+    manifest = load_ingest_manifest(manifest_path)
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 2  # bounds memory regardless of directory size
+    stats = {'ingested': 0, 'replaced': 0, 'unchanged': 0, 'failed': 0, 'chunks': 0}
+    start = time.perf_counter()
+
+    batch: List[Dict] = []
+    batch_entries: Dict[str, Dict] = {}
+
+    def flush():
+        # Chunks are written before the manifest, so a crash never records a file
+        # whose chunks are missing; duplicates from a rerun are dropped on load
+        if batch:
+            rag_engine.add_documents(batch)
+            with open(documents_path, 'a', encoding='utf-8') as f:
+                f.writelines(json.dumps(doc) + "\n" for doc in batch)
+            stats['chunks'] += len(batch)
+        if batch_entries:
+            manifest.update(batch_entries)
+            _write_manifest(manifest, manifest_path)
+        batch.clear()
+        batch_entries.clear()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+
+        def collect(return_when):
+            done, _ = wait(pending, return_when=return_when)
+            for future in done:
+                source, stat = pending.pop(future)
+                try:
+                    digest, chunks = future.result()
+                except Exception as e:
+                    print(f"Warning: Could not ingest {source} - {e}")
+                    stats['failed'] += 1
+                    continue
+
+                entry = {'sha256': digest, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+                if chunks is None:
+                    # Touched but not modified: only refresh the stat shortcut
+                    batch_entries[source] = dict(manifest[source], **entry)
+                    stats['unchanged'] += 1
+                    continue
+
+                if source in manifest:
+                    for doc_id in rag_engine.document_ids(filters={'source': source}):
+                        rag_engine.remove_document(doc_id)
+                    stats['replaced'] += 1
+                else:
+                    stats['ingested'] += 1
+
+                title = os.path.splitext(os.path.basename(source))[0]
+                batch.extend({
+                    'type': doc_type,
+                    'content': chunk,
+                    'metadata': {'source': source, 'source_hash': digest, 'title': title,
+                                 'chunk': i, 'chunks': len(chunks)}
+                } for i, chunk in enumerate(chunks))
+                batch_entries[source] = dict(entry, chunks=len(chunks))
+                if len(batch) >= batch_size:
+                    flush()
+                    rate = stats['chunks'] / max(time.perf_counter() - start, 1e-9)
+                    print(f"Embedded {stats['chunks']} chunks ({rate:.0f} chunks/s)")
+
+        for path in _iter_files(directory):
+            source = os.path.abspath(path)
+            stat = os.stat(path)
+            entry = manifest.get(source)
+            if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                stats['unchanged'] += 1
+                continue
+            known = entry['sha256'] if entry else None
+            pending[pool.submit(_extract_chunks, path, known, max_words, overlap)] = (source, stat)
+            if len(pending) >= max_pending:
+                collect(FIRST_COMPLETED)
+
+        if pending:
+            collect(ALL_COMPLETED)
+    flush()
+
+    if stats['replaced']:
+        _compact(documents_path, manifest)
+    if rag_engine.cache is not None:
+        # The next startup then only rebuilds the index, without re-encoding
+        rag_engine.cache.save()
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest PDF/DOCX/TXT files into the knowledge base")
+    parser.add_argument('directory', help="Directory to ingest, searched recursively")
+    parser.add_argument('--type', default='job_description', help="Document type of the ingested chunks")
+    parser.add_argument('--workers', type=int, default=None, help="Extraction processes (default: CPU count)")
+    parser.add_argument('--batch-size', type=int, default=256, help="Chunks per embedding batch")
+    parser.add_argument('--chunk-words', type=int, default=CHUNK_WORDS, help="Maximum words per chunk")
+    parser.add_argument('--chunk-overlap', type=int, default=CHUNK_OVERLAP, help="Words shared by consecutive chunks")
+    parser.add_argument('--backend', default=os.environ.get('EMBEDDING_BACKEND', 'sentence-transformers'),
+                        help="Embedding backend, as used by the app")
+    args = parser.parse_args()
+
+    rag_engine = RAGEngine(backend=args.backend)
+    stats = ingest_directory(args.directory, rag_engine, args.type, args.workers, args.batch_size,
+                             args.chunk_words, args.chunk_overlap)
+    print(f"Done: {stats['ingested']} new and {stats['replaced']} changed files "
+          f"({stats['chunks']} chunks), {stats['unchanged']} unchanged, {stats['failed']} failed")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,86 @@
+import heapq
+import math
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from utils.chunking import tokenize
+
+class BM25Index:
+    """In-memory inverted index with Okapi BM25 ranking.
+
+    Postings map each term to {doc_id: term frequency}, so a query only touches
+    the documents containing its terms. Documents can be added and removed
+    individually, which keeps the index in sync with the FAISS index ids.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._doc_terms: Dict[int, Counter] = {}
+        self._lengths: Dict[int, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __contains__(self, doc_id: int) -> bool:
+        return doc_id in self._lengths
+
+    def add(self, doc_id: int, text: str):
+        """Index a document's text under doc_id, replacing any previous text."""
+        if doc_id in self._lengths:
+            self.remove(doc_id)
+
+        terms = Counter(tokenize(text))
+        for term, count in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = count
+        self._doc_terms[doc_id] = terms
+        length = sum(terms.values())
+        self._lengths[doc_id] = length
+        self._total_length += length
+
+    def remove(self, doc_id: int):
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(doc_id)
+
+    def search(self, query: str, k: int = 5, allowed: Optional[Set[int]] = None,
+               excluded: Iterable[int] = ()) -> List[Tuple[int, float]]:
+        """Return up to k (doc_id, score) pairs, best first.
+
+        allowed restricts results to a set of ids; excluded ids are skipped.
+        """
+        if not self._lengths or k <= 0:
+            return []
+
+        excluded = set(excluded)
+        doc_count = len(self._lengths)
+        avg_length = self._total_length / doc_count
+        scores: Dict[int, float] = {}
+
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+
+            # Walk whichever of the posting list and the allowed set is smaller
+            if allowed is not None and len(allowed) < len(postings):
+                matches = ((doc_id, postings[doc_id]) for doc_id in allowed if doc_id in postings)
+            else:
+                matches = postings.items()
+
+            for doc_id, tf in matches:
+                if (allowed is not None and doc_id not in allowed) or doc_id in excluded:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
\ No newline at end of file
@@ -0,0 +1,95 @@
+from collections import deque
+from concurrent.futures import Executor, Future, wait
+from typing import Dict, List, Optional
+
+from utils.embedding_cache import document_hash
+from utils.metrics import metrics
+
+class QuestionPrefetcher:
+    """Generate a session's upcoming questions in the background.
+
+    While the candidate answers, up to depth questions for the active job
+    context and filters are generated on a shared executor, so the next
+    question is usually ready when it is requested. One prefetcher belongs to
+    one session and is only called from that session's script thread; the
+    background task only returns results and never touches this object.
+    """
+
+    def __init__(self, question_gen, executor: Executor, depth: int = 3):
+        self.question_gen = question_gen
+        self.executor = executor
+        self.depth = depth
+        self._key = None
+        # (question, spans recorded while generating it)
+        self._queue: deque = deque()
+        self._future: Optional[Future] = None
+        # Spans behind the last question returned, including the wait for it
+        self.last_timings: List[tuple] = []
+
+    @staticmethod
+    def _context_key(job_context: Dict, category: str, difficulty: str) -> tuple:
+        jd_hash = document_hash(f"{job_context['title']}\n{job_context['description']}")
+        return jd_hash, category, difficulty
+
+    def _switch(self, key: tuple):
+        """Drop questions prefetched for another job context or filters."""
+        if key != self._key:
+            self._key = key
+            self._queue.clear()
+            # A running task finishes on its own; its result is ignored
+            self._future = None
+
+    def _collect(self):
+        if self._future is not None and self._future.done():
+            future, self._future = self._future, None
+            try:
+                self._queue.extend(future.result())
+            except Exception as e:
+                print(f"Warning: Question prefetch failed - {e}")
+
+    def _generate(self, job_context: Dict, asked: List[str], category: str,
+                  difficulty: str, count: int) -> List[tuple]:
+        history = [{'question': question} for question in asked]
+        questions = []
+        for _ in range(count):
+            question, spans = metrics.call_traced(self.question_gen.generate_question, job_context, history,
+                                                  category, difficulty)
+            questions.append((question, spans))
+            history.append({'question': question['question']})
+        return questions
+
+    def prefetch(self, job_context: Dict, history: List[Dict], category: str = None, difficulty: str = None):
+        """Top up the queue in the background; a no-op while a task is running or the queue is full."""
+        self._switch(self._context_key(job_context, category, difficulty))
+        self._collect()
+        if self._future is not None or len(self._queue) >= self.depth:
+            return
+
+        # Snapshot plain strings so the task never reads session state
+        asked = [h.get('question', '') for h in history] + [q['question'] for q, _ in self._queue]
+        self._future = self.executor.submit(self._generate, job_context, asked, category, difficulty,
+                                            self.depth - len(self._queue))
+
+    def next_question(self, job_context: Dict, history: List[Dict], category: str = None,
+                      difficulty: str = None) -> Dict:
+        """Return the next question, from the prefetched queue when possible, then refill it."""
+        self._switch(self._context_key(job_context, category, difficulty))
+        with metrics.trace() as spans:
+            with metrics.span('question_wait'):
+                if not self._queue and self._future is not None:
+                    # Already running: waiting is never slower than starting over
+                    wait([self._future])
+                self._collect()
+
+                asked = {h.get('question', '') for h in history}
+                while self._queue and self._queue[0][0]['question'] in asked:
+                    self._queue.popleft()
+                if self._queue:
+                    question, generated = self._queue.popleft()
+                    spans.extend(generated)
+                else:
+                    question = self.question_gen.generate_question(job_context, history, category, difficulty)
+        self.last_timings = spans
+
+        self.prefetch(job_context, history + [{'question': question['question']}], category, difficulty)
+        return question
\ No newline at end of file
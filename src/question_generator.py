@@ -1,19 +1,43 @@
+from collections import OrderedDict
 from typing import Dict, List
 import random
-import json
+import threading
+from utils.catalog import load_question_bank, load_skill_matcher
+from utils.embedding_cache import document_hash
+from utils.metrics import metrics
+from utils.skill_matcher import SkillMatcher
+
+# Ranked candidates precomputed per job context and filter combination
+POOL_SIZE = 50
+# A question is drawn at random from this many of the best unasked candidates
+POOL_CHOICES = 5
+# Job contexts whose pools are kept (least recently used are dropped)
+MAX_POOLS = 128
 
 class QuestionGenerator:
     """Generate role-specific interview questions using RAG."""
     
-    def __init__(self, rag_engine):
+    # Used when data/skills_taxonomy.json is missing
+    DEFAULT_SKILLS = [
+        'python', 'java', 'javascript', 'react', 'node', 'sql', 'aws', 'docker',
+        'kubernetes', 'machine learning', 'data analysis', 'leadership', 'agile',
+        'communication', 'problem solving', 'teamwork'
+    ]
+    
+    def __init__(self, rag_engine, skill_matcher: SkillMatcher = None):
         self.rag_engine = rag_engine
+        # Pass a matcher to plug in another taxonomy
+        self._skill_matcher = skill_matcher
+        # (JD hash, knowledge base version, filters) -> ranked candidates; shared by
+        # all sessions, so pools are never mutated once built
+        self._pools = OrderedDict()
+        self._pools_lock = threading.Lock()
         self.load_question_templates()
     
     def load_question_templates(self):
         """Load question templates from JSON."""
         try:
-            with open('data/questions_bank.json', 'r') as f:
-                self.questions_bank = json.load(f)
+            self.questions_bank = load_question_bank()
         except FileNotFoundError:
             self.questions_bank = {
                 'technical': [],
@@ -21,54 +45,94 @@ class QuestionGenerator:
                 'situational': []
             }
     
+    @property
+    def skill_matcher(self) -> SkillMatcher:
+        if self._skill_matcher is not None:
+            return self._skill_matcher
+        try:
+            # Shared and recompiled only when the taxonomy file changes
+            return load_skill_matcher()
+        except FileNotFoundError:
+            self._skill_matcher = SkillMatcher({skill: [] for skill in self.DEFAULT_SKILLS})
+            return self._skill_matcher
+    
     def extract_key_skills(self, job_description: str) -> List[str]:
-        """Extract key skills from job description."""
-        # Simple keyword extraction (can be enhanced with NLP)
-        common_skills = [
-            'python', 'java', 'javascript', 'react', 'node', 'sql', 'aws', 'docker',
-            'kubernetes', 'machine learning', 'data analysis', 'leadership', 'agile',
-            'communication', 'problem solving', 'teamwork'
-        ]
+        """Extract key skills from job description.
+        
+        Returns canonical taxonomy names in order of first mention, matched on
+        word boundaries with aliases normalized (e.g. "k8s" -> "kubernetes").
+        """
+        return self.skill_matcher.extract(job_description)
+    
+    def _search_query(self, job_context: Dict) -> str:
+        skills = self.extract_key_skills(job_context['description'])
+        return f"{job_context['title']} {' '.join(skills)}"
+    
+    def _candidate_pool(self, job_context: Dict, filters: Dict) -> List[Dict]:
+        """Ranked questions for a job context and filters, retrieved once.
         
-        skills_found = []
-        jd_lower = job_description.lower()
-        for skill in common_skills:
-            if skill in jd_lower:
-                skills_found.append(skill)
+        The pool is rebuilt only when the job description or the knowledge base
+        (RAGEngine.version) changes.
+        """
+        jd_hash = document_hash(f"{job_context['title']}\n{job_context['description']}")
+        key = (jd_hash, self.rag_engine.version, tuple(sorted(filters.items())))
+        with self._pools_lock:
+            pool = self._pools.get(key)
+            if pool is not None:
+                self._pools.move_to_end(key)
+                metrics.increment('question_pool_hits')
+                return pool
         
-        return skills_found
+        # Hybrid so exact skill names in the query count even when the
+        # embedding underweights them
+        metrics.increment('question_pool_misses')
+        with metrics.span('question_pool_build'):
+            pool = self.rag_engine.retrieve(self._search_query(job_context), k=POOL_SIZE, doc_type='question',
+                                            filters=filters, mode='hybrid')
+        with self._pools_lock:
+            self._pools[key] = pool
+            while len(self._pools) > MAX_POOLS:
+                self._pools.popitem(last=False)
+        return pool
     
+    @metrics.timed('generate_question')
     def generate_question(self, job_context: Dict, history: List = None, 
                          category: str = None, difficulty: str = None) -> Dict:
         """Generate a relevant interview question based on job context.
         
-        Uses RAG to retrieve relevant questions from knowledge base.
+        Uses RAG to retrieve relevant questions from knowledge base. Retrieval
+        runs once per job context and filters; later calls pick from the
+        precomputed pool, skipping asked questions with set lookups.
         """
         if history is None:
             history = []
         
-        # Extract key skills from job description
-        skills = self.extract_key_skills(job_context['description'])
-        
-        # Use RAG to find relevant questions
-        search_query = f"{job_context['title']} {' '.join(skills)}"
-        relevant_docs = self.rag_engine.retrieve(search_query, k=10, doc_type='question')
-        
-        # Filter by category if specified
+        # Category and difficulty select the pool; asked questions are skipped in it
+        filters = {}
         if category and category != "All":
-            relevant_docs = [d for d in relevant_docs if d['document']['metadata'].get('category') == category.lower()]
-        
-        # Filter by difficulty if specified
+            filters['category'] = category.lower()
         if difficulty and difficulty != "All":
-            relevant_docs = [d for d in relevant_docs if d['document']['metadata'].get('difficulty') == difficulty]
-        
-        # Exclude already asked questions
+            filters['difficulty'] = difficulty
         asked_questions = {h.get('question', '') for h in history}
-        relevant_docs = [d for d in relevant_docs if d['document']['content'] not in asked_questions]
+        
+        pool = self._candidate_pool(job_context, filters)
+        relevant_docs = []
+        with metrics.span('question_filter'):
+            for candidate in pool:
+                if candidate['document']['content'] not in asked_questions:
+                    relevant_docs.append(candidate)
+                    if len(relevant_docs) == POOL_CHOICES:
+                        break
+        
+        if not relevant_docs and len(pool) == POOL_SIZE:
+            # Everything in the pool was asked already: search past it
+            relevant_docs = self.rag_engine.retrieve(self._search_query(job_context), k=POOL_CHOICES,
+                                                     doc_type='question', filters=filters,
+                                                     exclude=asked_questions, mode='hybrid')
         
         # Select question
         if relevant_docs:
-            selected = random.choice(relevant_docs[:5])  # Top 5 most relevant
+            selected = random.choice(relevant_docs)
             return {
                 'question': selected['document']['content'],
                 'category': selected['document']['metadata'].get('category', 'General'),
@@ -1,33 +1,102 @@
-from sentence_transformers import SentenceTransformer
 import numpy as np
-import json
-from typing import List, Dict
+import threading
+from typing import Dict, Iterable, List, Optional
 import faiss
+from src.document_store import DocumentStore
+from src.vector_index import build_index, search_parameters, supports_removal, writable_copy
+from src.lexical_index import BM25Index
+from utils.embedding_cache import EmbeddingCache, QueryEmbeddingCache, document_hash, supports_mmap
+from utils.catalog import load_ingested_documents, load_job_catalog, load_question_bank
+from utils.embeddings import get_embedding_provider
+from utils.chunking import CHUNK_OVERLAP, CHUNK_WORDS, chunk_text
+from utils.metrics import metrics
+
+# Metadata fields that get posting lists for filtered retrieval
+FILTER_FIELDS = ('category', 'difficulty', 'source')
+RETRIEVAL_MODES = ('dense', 'lexical', 'hybrid')
+
+def fuse_rankings(result_lists: List[List[Dict]], rrf_k: int = 60) -> List[Dict]:
+    """Merge ranked result lists with reciprocal rank fusion, best first.
+    
+    A document scores sum(1 / (rrf_k + rank)) over the lists it appears in.
+    Documents with identical content are merged into one result.
+    """
+    fused = {}
+    for results in result_lists:
+        for rank, result in enumerate(results, start=1):
+            content = result['document']['content']
+            if content not in fused:
+                fused[content] = {'document': result['document'], 'score': 0.0}
+            fused[content]['score'] += 1.0 / (rrf_k + rank)
+    return sorted(fused.values(), key=lambda result: result['score'], reverse=True)
+
+def _truncate_words(text: str, max_words: int) -> str:
+    words = text.split()
+    if len(words) <= max_words:
+        return text
+    if max_words <= 1:
+        return ""
+    # The ellipsis counts as one word of the budget
+    return ' '.join(words[:max_words - 1]) + " ..."
 
 class RAGEngine:
     """Retrieval-Augmented Generation engine for job descriptions and questions."""
     
-    def __init__(self, model_name='all-MiniLM-L6-v2'):
-        self.model = SentenceTransformer(model_name)
+    def __init__(self, model_name='all-MiniLM-L6-v2', cache_dir='data/.cache',
+                 backend='sentence-transformers', embedder_options=None,
+                 index_type='flat', nlist=100, pq_m=16, hnsw_m=32, nprobe=8, ef_search=64,
+                 query_cache_size=1024, hybrid_alpha=0.5, knowledge_base=True, mmap_text=False,
+                 mmap_index=False):
+        # Shared with every other component using this backend/model; loaded on first encode
+        self.embedder = get_embedding_provider(model_name, backend, **(embedder_options or {}))
+        # Backend-qualified name, so caches never mix embeddings from different backends
+        self.model_name = self.embedder.name
+        # Index backend (flat, flat_fp16, flat_int8, ivf_flat, ivf_pq, hnsw); nprobe/ef_search can be tuned at runtime
+        self.index_type = index_type
+        self.index_options = {'nlist': nlist, 'pq_m': pq_m, 'hnsw_m': hnsw_m}
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        # Persistent embedding/index cache; pass cache_dir=None to disable
+        self.cache = EmbeddingCache(self.model_name, cache_dir) if cache_dir else None
+        # Repeated queries in a session skip the transformer forward pass
+        self.query_cache = QueryEmbeddingCache(query_cache_size)
         self.index = None
-        self.documents = []
-        self.load_knowledge_base()
+        # Search the cached index file through mmap, so processes on one host share its vectors
+        self.mmap_index = mmap_index
+        self._index_mapped = False
+        # Document text in a memory-mapped temporary file instead of the heap
+        self.mmap_text = mmap_text
+        # FAISS id -> document in compact columns; ids are stable across add/update/remove
+        self.documents = DocumentStore(mmap_text=mmap_text)
+        self._next_id = 0
+        # (field, value) -> ids, used to build search selectors
+        self._postings = {}
+        # Deleted ids still present in indexes that cannot remove vectors (HNSW)
+        self._tombstones = set()
+        # BM25 over question text and skills, kept in sync with the FAISS ids
+        self.lexical_index = BM25Index()
+        # Weight of the dense score in hybrid retrieval (1 - alpha for BM25)
+        self.hybrid_alpha = hybrid_alpha
+        # Guards index/documents so readers never see a half-applied mutation
+        self._lock = threading.RLock()
+        # Incremented on every change to the document set, so callers can
+        # invalidate anything derived from search results
+        self.version = 0
+        # knowledge_base=False starts empty, e.g. to load_documents() a custom corpus
+        if knowledge_base:
+            self.load_knowledge_base()
     
     def load_knowledge_base(self):
         """Load job descriptions and questions into the vector database."""
         try:
-            # Load job descriptions
-            with open('data/job_descriptions.json', 'r') as f:
-                jd_data = json.load(f)
-            
-            # Load questions bank
-            with open('data/questions_bank.json', 'r') as f:
-                questions_data = json.load(f)
+            # Load job descriptions and questions bank (shared, parsed once per file change)
+            jd_data = load_job_catalog().jobs
+            questions_data = load_question_bank()
             
             # Combine all documents
-            self.documents = []
+            documents = []
             for jd in jd_data:
-                self.documents.append({
+                documents.append({
                     'type': 'job_description',
                     'content': jd['description'],
                     'metadata': jd
@@ -35,7 +104,7 @@ class RAGEngine:
             
             for category, questions in questions_data.items():
                 for q in questions:
-                    self.documents.append({
+                    documents.append({
                         'type': 'question',
                         'content': q['question'],
                         'metadata': {
@@ -45,58 +114,382 @@ class RAGEngine:
                         }
                     })
             
-            # Create embeddings
-            texts = [doc['content'] for doc in self.documents]
-            embeddings = self.model.encode(texts)
-            
-            # Build FAISS index
-            dimension = embeddings.shape[1]
-            self.index = faiss.IndexFlatIP(dimension)  # Inner product for cosine similarity
+            # Chunks added with src.ingest
+            documents.extend(load_ingested_documents())
             
-            # Normalize embeddings for cosine similarity
-            faiss.normalize_L2(embeddings)
-            self.index.add(embeddings.astype('float32'))
-            
-            print(f"Loaded {len(self.documents)} documents into knowledge base")
+            self.load_documents(documents)
+            print(f"Loaded {len(documents)} documents into knowledge base")
             
         except FileNotFoundError as e:
             print(f"Warning: Could not load knowledge base - {e}")
     
-    def retrieve(self, query: str, k: int = 5, doc_type: str = None) -> List[Dict]:
-        """Retrieve most relevant documents for a query."""
-        if self.index is None:
+    def load_documents(self, documents: List[Dict]):
+        """Replace the whole document set with documents and rebuild the indexes.
+        
+        Documents have the knowledge base shape: {'type', 'content', 'metadata'}.
+        """
+        texts = [doc['content'] for doc in documents]
+        hashes = [document_hash(text) for text in texts]
+        
+        mmap = self.mmap_index and self.cache is not None
+        if self.mmap_index and self.cache is None:
+            print("Warning: mmap_index needs an index cache (cache_dir), keeping the index in memory")
+        
+        # Warm start: reuse the serialized index if the corpus is unchanged
+        index = None
+        if self.cache is not None:
+            index = self.cache.load_index(hashes, signature=self._index_signature(), mmap=mmap)
+        mapped = mmap and index is not None and self._mappable(index)
+        
+        if index is None:
+            # Create embeddings, encoding only documents missing from the cache
+            embeddings = self._embed_documents(texts, hashes)
+            index = self._new_index(embeddings)
+            index.add_with_ids(embeddings, np.arange(len(documents), dtype='int64'))
+            
+            if self.cache is not None:
+                self.cache.save(keep=hashes)
+                self.cache.save_index(index, hashes, signature=self._index_signature())
+                if mmap and self._mappable(index):
+                    # Swap the private copy for the shared file just written
+                    shared = self.cache.load_index(hashes, signature=self._index_signature(), mmap=True)
+                    if shared is not None:
+                        index, mapped = shared, True
+        
+        store = DocumentStore(documents, mmap_text=self.mmap_text)
+        with self._lock:
+            previous = self.documents
+            self.index = index
+            self._index_mapped = mapped
+            self.documents = store
+            # Releases the old text blob (and its temporary file); no reader holds it without the lock
+            previous.close()
+            self._next_id = len(documents)
+            self._postings = {}
+            self._tombstones = set()
+            self.lexical_index = BM25Index()
+            for doc_id, doc in enumerate(documents):
+                self._index_metadata(doc_id, doc)
+            self.version += 1
+    
+    @staticmethod
+    def _mappable(index) -> bool:
+        """Whether index can be shared through mmap, warning when it cannot."""
+        if supports_mmap(index):
+            return True
+        print(f"Warning: FAISS {faiss.__version__} cannot memory-map this index type (needs 1.10+), "
+              "keeping the index in memory")
+        return False
+    
+    def _writable_index(self):
+        """The index, first copied into memory if it is mapped. Must be called with the lock held."""
+        if self._index_mapped:
+            # From here on this process holds a private copy, until the next load
+            self.index = writable_copy(self.index)
+            self._index_mapped = False
+        return self.index
+    
+    def _index_signature(self) -> str:
+        """Identifies the index configuration in the on-disk cache."""
+        options = '-'.join(f"{key}{value}" for key, value in sorted(self.index_options.items()))
+        # Not "idmap-": files cached when IVF indexes were wrapped in IndexIDMap must not load
+        return f"ids-{self.index_type}-{options}"
+    
+    def _new_index(self, embeddings: np.ndarray):
+        """Create an empty index of the configured type, trained on embeddings if needed."""
+        return build_index(embeddings, self.index_type, **self.index_options)
+    
+    @staticmethod
+    def _metadata_keys(doc: Dict) -> List[tuple]:
+        """Posting list keys for a document's filterable fields."""
+        keys = [('type', doc['type'])]
+        metadata = doc.get('metadata', {})
+        for field in FILTER_FIELDS:
+            if field in metadata:
+                keys.append((field, metadata[field]))
+        return keys
+    
+    @staticmethod
+    def _lexical_text(doc: Dict) -> str:
+        """Text indexed for lexical search: the content plus any tagged skills."""
+        skills = doc.get('metadata', {}).get('skills', [])
+        return ' '.join([doc['content']] + list(skills))
+    
+    def _index_metadata(self, doc_id: int, doc: Dict):
+        for key in self._metadata_keys(doc):
+            self._postings.setdefault(key, set()).add(doc_id)
+        self.lexical_index.add(doc_id, self._lexical_text(doc))
+    
+    def _unindex_metadata(self, doc_id: int, doc: Dict):
+        for key in self._metadata_keys(doc):
+            self._postings[key].discard(doc_id)
+        self.lexical_index.remove(doc_id)
+    
+    def _embed_documents(self, texts: List[str], hashes: List[str]) -> np.ndarray:
+        """Return normalized float32 embeddings for documents."""
+        if self.cache is not None:
+            return self.cache.embed(texts, hashes, self.embedder.encode)
+        
+        embeddings = np.asarray(self.embedder.encode(texts), dtype='float32')
+        faiss.normalize_L2(embeddings)
+        return embeddings
+    
+    def _encode_queries(self, queries: List[str]) -> np.ndarray:
+        """Return normalized embeddings for queries, encoding cache misses in one batch."""
+        cached = [self.query_cache.get(self.model_name, query) for query in queries]
+        missing = list(dict.fromkeys(q for q, emb in zip(queries, cached) if emb is None))
+        
+        if missing:
+            new_embeddings = np.asarray(self.embedder.encode(missing), dtype='float32')
+            faiss.normalize_L2(new_embeddings)
+            encoded = dict(zip(missing, new_embeddings))
+            for query, embedding in encoded.items():
+                self.query_cache.put(self.model_name, query, embedding)
+            cached = [emb if emb is not None else encoded[q] for q, emb in zip(queries, cached)]
+        
+        return np.vstack(cached).astype('float32')
+    
+    def add_documents(self, documents: List[Dict]) -> List[int]:
+        """Embed and index new documents, returning their ids.
+        
+        Each document has the same shape as knowledge base entries:
+        {'type': ..., 'content': ..., 'metadata': {...}}.
+        """
+        if not documents:
             return []
         
-        # Encode query
-        query_embedding = self.model.encode([query])
-        faiss.normalize_L2(query_embedding)
-        
-        # Search
-        distances, indices = self.index.search(query_embedding.astype('float32'), k * 2)
-        
-        # Filter and return results
-        results = []
-        for idx, score in zip(indices[0], distances[0]):
-            if idx < len(self.documents):
-                doc = self.documents[idx]
-                if doc_type is None or doc['type'] == doc_type:
-                    results.append({
-                        'document': doc,
-                        'score': float(score)
-                    })
-                    if len(results) >= k:
-                        break
+        texts = [doc['content'] for doc in documents]
+        embeddings = self._embed_documents(texts, [document_hash(text) for text in texts])
+        
+        with self._lock:
+            if self.index is None:
+                self.index = self._new_index(embeddings)
+            ids = list(range(self._next_id, self._next_id + len(documents)))
+            self._next_id += len(documents)
+            self._writable_index().add_with_ids(embeddings, np.asarray(ids, dtype='int64'))
+            self.documents.update(zip(ids, documents))
+            for doc_id, doc in zip(ids, documents):
+                self._index_metadata(doc_id, doc)
+            self.version += 1
         
-        return results
+        return ids
     
-    def get_relevant_context(self, job_description: str, query: str = "") -> str:
-        """Get relevant context from job description for question generation."""
-        # Extract key information from job description
-        results = self.retrieve(job_description, k=3, doc_type='question')
+    def update_document(self, doc_id: int, document: Dict) -> int:
+        """Replace a document, re-embedding it only if its content changed.
+        
+        Returns the document id. It only changes when the content changed and
+        the index cannot delete vectors in place (HNSW).
+        """
+        with self._lock:
+            if doc_id not in self.documents:
+                raise KeyError(f"Unknown document id: {doc_id}")
+            content_changed = self.documents.content(doc_id) != document['content']
+        
+        embeddings = None
+        if content_changed:
+            embeddings = self._embed_documents([document['content']], [document_hash(document['content'])])
+        
+        with self._lock:
+            if doc_id not in self.documents:
+                raise KeyError(f"Unknown document id: {doc_id}")
+            if embeddings is not None and not supports_removal(self.index):
+                self.remove_document(doc_id)
+                doc_id = self._next_id
+                self._next_id += 1
+                self._writable_index().add_with_ids(embeddings, np.asarray([doc_id], dtype='int64'))
+                self.documents[doc_id] = document
+                self._index_metadata(doc_id, document)
+                self.version += 1
+                return doc_id
+            if embeddings is not None:
+                ids = np.asarray([doc_id], dtype='int64')
+                index = self._writable_index()
+                index.remove_ids(ids)
+                index.add_with_ids(embeddings, ids)
+            self._unindex_metadata(doc_id, self.documents[doc_id])
+            self.documents[doc_id] = document
+            self._index_metadata(doc_id, document)
+            self.version += 1
+        
+        return doc_id
+    
+    def remove_document(self, doc_id: int):
+        """Remove a document from the index and the document store."""
+        with self._lock:
+            if doc_id not in self.documents:
+                raise KeyError(f"Unknown document id: {doc_id}")
+            if supports_removal(self.index):
+                self._writable_index().remove_ids(np.asarray([doc_id], dtype='int64'))
+            else:
+                # Masked out of every search until the next full rebuild
+                self._tombstones.add(doc_id)
+            self._unindex_metadata(doc_id, self.documents.pop(doc_id))
+            self.version += 1
+    
+    def document_ids(self, doc_type: str = None, filters: Dict = None) -> List[int]:
+        """Ids of documents matching a type and metadata filters, from the posting lists."""
+        with self._lock:
+            allowed, _ = self._candidates(doc_type, filters, None)
+            return sorted(self.documents if allowed is None else allowed)
+    
+    def _candidates(self, doc_type: Optional[str], filters: Optional[Dict],
+                    exclude: Optional[Iterable[str]]):
+        """Resolve a type, filters and excluded contents into id sets.
+        
+        Returns (allowed, excluded): allowed is the set of matching ids, or None
+        when every document matches. Must be called with the lock held.
+        """
+        conditions = dict(filters or {})
+        if doc_type is not None:
+            conditions['type'] = doc_type
+        
+        excluded = set()
+        for content in exclude or ():
+            excluded.update(self.documents.ids_with_content(content))
+        
+        if not conditions:
+            return None, excluded
+        
+        # Intersect posting lists, smallest first
+        postings = sorted((self._postings.get(item, set()) for item in conditions.items()), key=len)
+        return set(postings[0]).intersection(*postings[1:]) - excluded, excluded
+    
+    def _search_params(self, allowed: Optional[set], excluded: set):
+        """Build FAISS search parameters restricting results to matching ids.
+        
+        Returns (params, limit) where limit is the number of matching documents.
+        Must be called with the lock held.
+        """
+        if allowed is None:
+            if not excluded and not self._tombstones:
+                return self._index_params(), len(self.documents)
+            masked = excluded | self._tombstones
+            selector = faiss.IDSelectorNot(
+                faiss.IDSelectorBatch(np.fromiter(masked, dtype='int64', count=len(masked))))
+            return self._index_params(selector), len(self.documents) - len(excluded)
+        
+        selector = faiss.IDSelectorBatch(np.fromiter(allowed, dtype='int64', count=len(allowed)))
+        return self._index_params(selector), len(allowed)
+    
+    def _index_params(self, selector=None):
+        return search_parameters(self.index, selector, nprobe=self.nprobe, ef_search=self.ef_search)
+    
+    def retrieve(self, query: str, k: int = 5, doc_type: str = None,
+                 filters: Dict = None, exclude: Iterable[str] = None, mode: str = 'dense') -> List[Dict]:
+        """Retrieve most relevant documents for a query.
+        
+        filters maps metadata fields (category, difficulty) to required values and
+        exclude lists document contents to skip. Filtering happens inside the FAISS
+        search, so up to k matching documents are returned from a single search.
+        
+        mode is 'dense' (embeddings), 'lexical' (BM25, no encode) or 'hybrid',
+        which blends both scores so rare exact terms such as a skill name are
+        not lost to the embedding.
+        """
+        return self.retrieve_batch([query], k, doc_type, filters, exclude, mode)[0]
+    
+    def retrieve_batch(self, queries: List[str], k: int = 5, doc_type: str = None,
+                       filters: Dict = None, exclude: Iterable[str] = None,
+                       mode: str = 'dense') -> List[List[Dict]]:
+        """Retrieve documents for many queries with one encode call and one FAISS search.
+        
+        Returns one result list per query, each shaped like retrieve() output.
+        """
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {mode}")
+        if self.index is None or not queries:
+            return [[] for _ in queries]
+        
+        # Hybrid fuses a deeper candidate list from each side
+        depth = k if mode != 'hybrid' else 2 * k
+        query_embeddings = self._encode_queries(list(queries)) if mode != 'lexical' else None
+        
+        with self._lock:
+            allowed, excluded = self._candidates(doc_type, filters, exclude)
+            
+            dense = [[] for _ in queries]
+            if query_embeddings is not None:
+                params, limit = self._search_params(allowed, excluded)
+                dense_k = min(depth, limit)
+                if dense_k > 0:
+                    # Search
+                    with metrics.span('index_search'):
+                        distances, indices = self.index.search(query_embeddings, dense_k, params=params)
+                    dense = [
+                        [(int(idx), float(score)) for idx, score in zip(row_indices, row_distances) if idx >= 0]
+                        for row_indices, row_distances in zip(indices, distances)
+                    ]
+            
+            lexical = [[] for _ in queries]
+            if mode != 'dense':
+                with metrics.span('lexical_search'):
+                    lexical = [self.lexical_index.search(query, depth, allowed, excluded) for query in queries]
+            
+            all_results = []
+            for dense_hits, lexical_hits in zip(dense, lexical):
+                if mode == 'dense':
+                    hits = dense_hits
+                elif mode == 'lexical':
+                    hits = lexical_hits
+                else:
+                    hits = self._blend(dense_hits, lexical_hits)[:k]
+                all_results.append([
+                    {'document': self.documents[doc_id], 'score': score} for doc_id, score in hits
+                ])
+        
+        return all_results
+    
+    def _blend(self, dense_hits: List[tuple], lexical_hits: List[tuple]) -> List[tuple]:
+        """Combine min-max normalized dense and BM25 scores, best first.
+        
+        A document missing from one list gets 0 for that side.
+        """
+        def normalized(hits):
+            if not hits:
+                return {}
+            scores = [score for _, score in hits]
+            low, high = min(scores), max(scores)
+            span = high - low
+            return {doc_id: (score - low) / span if span else 1.0 for doc_id, score in hits}
+        
+        dense_scores = normalized(dense_hits)
+        lexical_scores = normalized(lexical_hits)
+        alpha = self.hybrid_alpha
+        blended = {
+            doc_id: alpha * dense_scores.get(doc_id, 0.0) + (1 - alpha) * lexical_scores.get(doc_id, 0.0)
+            for doc_id in dict.fromkeys(list(dense_scores) + list(lexical_scores))
+        }
+        return sorted(blended.items(), key=lambda item: item[1], reverse=True)
+    
+    def get_relevant_context(self, job_description: str, query: str = "", k: int = 3,
+                             max_tokens: int = 512, chunk_words: int = CHUNK_WORDS,
+                             chunk_overlap: int = CHUNK_OVERLAP) -> str:
+        """Get relevant context from job description for question generation.
+        
+        The job description is split into overlapping chunks that are retrieved
+        for in one batch, so every part of a long description counts instead of
+        only what fits in the model's input. Per-chunk results (and the optional
+        query's) are merged with reciprocal rank fusion. The returned context fits
+        in max_tokens, counted in words like the chunks.
+        """
+        queries = chunk_text(job_description, chunk_words, chunk_overlap)
+        if query:
+            queries.append(query)
+        results = fuse_rankings(self.retrieve_batch(queries, k=k, doc_type='question'))[:k]
+        
+        question_lines = [f"- {result['document']['content']}\n" for result in results]
+        header = "Job Description:\n"
+        questions_header = "Similar Interview Questions:\n"
+        
+        # Questions are kept whole; the description gets whatever budget is left
+        budget = max_tokens - len(header.split()) - len(questions_header.split())
+        budget -= sum(len(line.split()) for line in question_lines)
+        while question_lines and budget < 0:
+            budget += len(question_lines.pop().split())
         
-        context = f"Job Description:\n{job_description}\n\n"
-        context += "Similar Interview Questions:\n"
-        for result in results:
-            context += f"- {result['document']['content']}\n"
+        context = f"{header}{_truncate_words(job_description, max(budget, 0))}\n\n"
+        context += questions_header
+        for line in question_lines:
+            context += line
         
         return context
\ No newline at end of file
@@ -0,0 +1,147 @@
+"""Re-score interview history with the current ResponseEvaluator.
+
+Streams the history database (or a legacy history CSV) in chunks, scores chunks in a process pool and writes
+one columnar part file per chunk. Parts that already exist are skipped, so an
+interrupted run resumes where it stopped when rerun with the same chunk size.
+
+Usage:
+    python -m src.rescore_history data/user_history.db data/rescored --workers 8
+    python -m src.rescore_history data/user_history.csv data/rescored --format csv
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from src.evaluator import ResponseEvaluator
+from utils.history_store import HistoryStore
+
+_evaluator = None
+
+def _init_worker():
+    global _evaluator
+    _evaluator = ResponseEvaluator()
+
+def _rescore_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Score one chunk of history rows in a worker process."""
+    questions = chunk['question'].fillna('').astype(str)
+    responses = chunk['response'].fillna('').astype(str)
+    evaluations = _evaluator.evaluate_batch(zip(questions, responses))
+
+    return pd.DataFrame({
+        'timestamp': chunk['timestamp'].values,
+        'question': questions.values,
+        'category': chunk['category'].values,
+        'previous_score': chunk['score'].values,
+        'score': [e['score'] for e in evaluations],
+        'overall_assessment': [e['overall_assessment'] for e in evaluations],
+        'strengths': [e['strengths'] for e in evaluations],
+        'improvements': [e['improvements'] for e in evaluations],
+    })
+
+def _read_chunks(input_path: str, chunk_size: int):
+    """Yield the history as DataFrames of at most chunk_size rows."""
+    if input_path.endswith(('.db', '.sqlite')):
+        store = HistoryStore(input_path)
+        try:
+            for rows in store.iter_answers(chunk_size):
+                yield pd.DataFrame(rows)
+        finally:
+            store.close()
+    else:
+        yield from pd.read_csv(input_path, chunksize=chunk_size)
+
+def _part_path(output_dir: str, chunk_no: int, output_format: str) -> str:
+    return os.path.join(output_dir, f"part-{chunk_no:05d}.{output_format}")
+
+def _write_part(frame: pd.DataFrame, path: str, output_format: str):
+    """Write a part file atomically so a crash never leaves a partial part behind.
+
+    The data goes to a uniquely named temporary file, is synced to disk and only
+    then renamed, so an existing part is always complete and safe to skip.
+    """
+    directory, name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            if output_format == 'parquet':
+                frame.to_parquet(f, index=False)
+            else:
+                frame = frame.assign(strengths=frame['strengths'].str.join('; '),
+                                     improvements=frame['improvements'].str.join('; '))
+                frame.to_csv(f, index=False, encoding='utf-8')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def rescore_history(input_path: str, output_dir: str, chunk_size: int = 5000,
+                    workers: int = None, output_format: str = 'parquet') -> int:
+    """Re-score a history database or CSV into part files and return the number of rows scored."""
+    if output_format == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise RuntimeError("Parquet output requires pyarrow; install it or use --format csv")
+
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 2  # bounds memory regardless of file size
+    scored_rows = 0
+    skipped_chunks = 0
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = {}
+
+        def collect(return_when):
+            nonlocal scored_rows
+            done, _ = wait(pending, return_when=return_when)
+            for future in done:
+                path = pending.pop(future)
+                frame = future.result()
+                _write_part(frame, path, output_format)
+                scored_rows += len(frame)
+                rate = scored_rows / max(time.perf_counter() - start, 1e-9)
+                print(f"Scored {scored_rows} rows ({rate:.0f} rows/s), wrote {os.path.basename(path)}")
+
+        for chunk_no, chunk in enumerate(_read_chunks(input_path, chunk_size)):
+            path = _part_path(output_dir, chunk_no, output_format)
+            if os.path.exists(path):
+                skipped_chunks += 1
+                continue
+            pending[pool.submit(_rescore_chunk, chunk)] = path
+            if len(pending) >= max_pending:
+                collect(FIRST_COMPLETED)
+
+        if pending:
+            collect(ALL_COMPLETED)
+
+    if skipped_chunks:
+        print(f"Skipped {skipped_chunks} chunks already written by a previous run")
+    return scored_rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score interview history with the current evaluator")
+    parser.add_argument('input', nargs='?', default='data/user_history.db',
+                        help="History database (.db) or legacy CSV to re-score")
+    parser.add_argument('output', nargs='?', default='data/rescored', help="Directory for part files")
+    parser.add_argument('--chunk-size', type=int, default=5000, help="Rows per chunk / part file")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--format', choices=['parquet', 'csv'], default='parquet', help="Output format")
+    args = parser.parse_args()
+
+    rows = rescore_history(args.input, args.output, args.chunk_size, args.workers, args.format)
+    print(f"Done: {rows} rows re-scored into {args.output}")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
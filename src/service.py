@@ -0,0 +1,281 @@
+"""Headless HTTP/JSON service for question generation, evaluation and retrieval.
+
+A plain ASGI application with no web framework. One RAGEngine is loaded per
+process and shared by all requests. Retrieval and generation run in a thread
+pool, and CPU-bound evaluation runs in a process pool. Requests beyond
+max_concurrency are rejected with 503 instead of queueing without bound.
+
+Endpoints (JSON bodies and responses):
+    POST /generate-question  {"job_context": {...}, "history": [...], "category": ..., "difficulty": ...}
+    POST /evaluate           {"question": ..., "response": ..., "job_context": {...}}
+    POST /retrieve           {"query": ..., "k": 5, "doc_type": ..., "filters": {...}, "exclude": [...],
+                              "mode": "dense"}
+    GET  /health
+    GET  /metrics            Prometheus text (enable with INTERVIEW_METRICS=1)
+
+Usage:
+    python -m src.service --port 8000        (requires uvicorn)
+    uvicorn src.service:app --workers 2      (or any other ASGI server)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Optional
+
+from src.evaluator import ResponseEvaluator
+from src.question_generator import QuestionGenerator
+from src.rag_engine import RAGEngine
+from utils.metrics import metrics
+
+_evaluator = None
+# How type errors in request fields are described
+_TYPE_NAMES = {str: 'a string', int: 'an integer', list: 'a list', dict: 'an object'}
+
+def _init_worker():
+    global _evaluator
+    _evaluator = ResponseEvaluator()
+
+def _evaluate(question: str, response: str, job_context: Optional[Dict]) -> Dict:
+    return _evaluator.evaluate_response(question, response, job_context)
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+class InterviewService:
+    """ASGI application serving the interview components."""
+
+    def __init__(self, rag_engine: RAGEngine = None, backend: str = None, max_concurrency: int = 64,
+                 retrieval_threads: int = 8, evaluation_workers: int = None, max_body_bytes: int = 1 << 20):
+        # Loaded on startup when not given, so importing this module stays cheap
+        self.rag_engine = rag_engine
+        self.question_gen = QuestionGenerator(rag_engine) if rag_engine is not None else None
+        self.backend = backend or os.environ.get('EMBEDDING_BACKEND', 'sentence-transformers')
+        self.max_concurrency = max_concurrency
+        self.retrieval_threads = retrieval_threads
+        self.evaluation_workers = evaluation_workers or os.cpu_count() or 1
+        self.max_body_bytes = max_body_bytes
+        self.in_flight = 0
+        self._threads = None
+        self._processes = None
+        self._startup_lock = None
+        self._routes = {
+            ('POST', '/generate-question'): self.generate_question,
+            ('POST', '/evaluate'): self.evaluate,
+            ('POST', '/retrieve'): self.retrieve,
+            ('GET', '/health'): self.health,
+            ('GET', '/metrics'): self.export_metrics,
+        }
+
+    async def startup(self):
+        """Create the worker pools and load the knowledge base, once."""
+        if self._startup_lock is None:
+            self._startup_lock = asyncio.Lock()
+        async with self._startup_lock:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(self.retrieval_threads, thread_name_prefix='service')
+                self._processes = ProcessPoolExecutor(self.evaluation_workers, initializer=_init_worker)
+            if self.rag_engine is None:
+                loop = asyncio.get_running_loop()
+                # INDEX_MMAP=1: server workers on one host share the index's vectors
+                options = {'index_type': os.environ.get('INDEX_TYPE', 'flat'),
+                           'mmap_index': os.environ.get('INDEX_MMAP') == '1'}
+                self.rag_engine = await loop.run_in_executor(
+                    self._threads, lambda: RAGEngine('all-MiniLM-L6-v2', 'data/.cache', self.backend, **options))
+                self.question_gen = QuestionGenerator(self.rag_engine)
+
+    def shutdown(self):
+        if self._threads is not None:
+            self._threads.shutdown(wait=False)
+            self._processes.shutdown(wait=False)
+            self._threads = self._processes = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await self.startup()
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        handler = self._routes.get((scope['method'], scope['path']))
+        headers = []
+        try:
+            if handler is None:
+                if any(path == scope['path'] for _, path in self._routes):
+                    raise HTTPError(405, "Method not allowed")
+                raise HTTPError(404, "Not found")
+
+            # Backpressure: shed load instead of queueing requests without bound
+            if self.in_flight >= self.max_concurrency:
+                headers.append((b'retry-after', b'1'))
+                raise HTTPError(503, "Server busy, retry later")
+
+            self.in_flight += 1
+            try:
+                body = await self._read_json(receive) if scope['method'] == 'POST' else {}
+                if self.rag_engine is None or self._threads is None:
+                    # No lifespan support in the server: load on first request
+                    await self.startup()
+                # Evaluation spans are recorded in the worker processes and not exported;
+                # this span covers the whole request
+                with metrics.span('http_request', route=scope['path']):
+                    status, payload = 200, await handler(body)
+            finally:
+                self.in_flight -= 1
+        except HTTPError as e:
+            status, payload = e.status, {'error': str(e)}
+        except Exception as e:
+            print(f"Warning: {scope['method']} {scope['path']} failed - {e}")
+            status, payload = 500, {'error': "Internal server error"}
+        # Unknown paths share one label so clients cannot grow the metric set
+        route = scope['path'] if handler is not None else 'other'
+        metrics.increment('http_responses', route=route, status=status)
+
+        # Handlers return JSON objects, or str for plain text
+        if isinstance(payload, str):
+            data, content_type = payload.encode('utf-8'), b'text/plain; version=0.0.4; charset=utf-8'
+        else:
+            data, content_type = json.dumps(payload).encode('utf-8'), b'application/json'
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', content_type),
+                        (b'content-length', str(len(data)).encode('ascii'))] + headers,
+        })
+        await send({'type': 'http.response.body', 'body': data})
+
+    async def _read_json(self, receive) -> Dict:
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                raise HTTPError(400, "Client disconnected")
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > self.max_body_bytes:
+                raise HTTPError(413, "Request body too large")
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                break
+        try:
+            body = json.loads(b''.join(chunks) or b'{}')
+        except ValueError:
+            raise HTTPError(400, "Request body is not valid JSON")
+        if not isinstance(body, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        return body
+
+    @staticmethod
+    def _require(body: Dict, *fields: str):
+        missing = [field for field in fields if field not in body]
+        if missing:
+            raise HTTPError(400, f"Missing field(s): {', '.join(missing)}")
+
+    @staticmethod
+    def _field(body: Dict, field: str, kind: type, default=None):
+        """body[field] checked to be a kind, or default when it is missing or null."""
+        value = body.get(field)
+        if value is None:
+            return default
+        # bool is an int subclass, but true is not a valid count
+        if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+            raise HTTPError(400, f"{field} must be {_TYPE_NAMES[kind]}")
+        return value
+
+    async def _in_threads(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._threads, function, *args)
+
+    async def generate_question(self, body: Dict) -> Dict:
+        self._require(body, 'job_context')
+        job_context = self._field(body, 'job_context', dict)
+        if not (job_context and isinstance(job_context.get('title'), str)
+                and isinstance(job_context.get('description'), str)):
+            raise HTTPError(400, "job_context needs a title and a description")
+        history = self._field(body, 'history', list, [])
+        if not all(isinstance(entry, dict) for entry in history):
+            raise HTTPError(400, "history must be a list of objects")
+        return await self._in_threads(self.question_gen.generate_question, job_context, history,
+                                      self._field(body, 'category', str), self._field(body, 'difficulty', str))
+
+    async def evaluate(self, body: Dict) -> Dict:
+        self._require(body, 'question', 'response')
+        job_context = self._field(body, 'job_context', dict)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._processes, _evaluate, str(body['question']),
+                                          str(body['response']), job_context)
+
+    async def retrieve(self, body: Dict) -> Dict:
+        self._require(body, 'query')
+        k = self._field(body, 'k', int, 5)
+        if k < 1:
+            raise HTTPError(400, "k must be at least 1")
+        doc_type = self._field(body, 'doc_type', str)
+        filters = self._field(body, 'filters', dict)
+        # Filter values are looked up in posting lists, so they must be hashable scalars
+        if filters and not all(isinstance(value, (str, int, float)) for value in filters.values()):
+            raise HTTPError(400, "filters values must be strings or numbers")
+        exclude = self._field(body, 'exclude', list)
+        if exclude and not all(isinstance(content, str) for content in exclude):
+            raise HTTPError(400, "exclude must be a list of strings")
+        mode = self._field(body, 'mode', str, 'dense')
+        try:
+            results = await self._in_threads(
+                lambda: self.rag_engine.retrieve(str(body['query']), k, doc_type, filters, exclude, mode))
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        return {'results': results}
+
+    async def health(self, body: Dict) -> Dict:
+        return {
+            'status': 'ok',
+            'documents': len(self.rag_engine.documents),
+            'in_flight': self.in_flight,
+            'max_concurrency': self.max_concurrency,
+        }
+
+    async def export_metrics(self, body: Dict) -> str:
+        if not metrics.enabled:
+            raise HTTPError(404, "Metrics are disabled, set INTERVIEW_METRICS=1")
+        return metrics.prometheus_text()
+
+app = InterviewService()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve question generation, evaluation and retrieval over HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--backend', default=None, help="Embedding backend (default: $EMBEDDING_BACKEND)")
+    parser.add_argument('--max-concurrency', type=int, default=64, help="Requests served at once before 503s")
+    parser.add_argument('--workers', type=int, default=None, help="Evaluation processes (default: CPU count)")
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("Serving needs an ASGI server: pip install uvicorn")
+
+    service = InterviewService(backend=args.backend, max_concurrency=args.max_concurrency,
+                               evaluation_workers=args.workers)
+    uvicorn.run(service, host=args.host, port=args.port)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
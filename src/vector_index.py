@@ -0,0 +1,106 @@
+"""FAISS index construction for the knowledge base vector store."""
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ('flat', 'flat_fp16', 'flat_int8', 'ivf_flat', 'ivf_pq', 'hnsw')
+
+# Exact search over scalar-quantized vectors: half and a quarter of the float32 size
+QUANTIZED_FLAT_TYPES = {
+    'flat_fp16': faiss.ScalarQuantizer.QT_fp16,
+    'flat_int8': faiss.ScalarQuantizer.QT_8bit,
+}
+
+# k-means needs roughly this many training points per IVF list
+MIN_POINTS_PER_LIST = 39
+# 8-bit product quantizer codebooks need at least 2^8 training points
+PQ_MIN_TRAINING_POINTS = 256
+
+def build_index(embeddings: np.ndarray, index_type: str = 'flat', nlist: int = 100,
+                pq_m: int = 16, hnsw_m: int = 32):
+    """Create an empty index for normalized embeddings, added to with add_with_ids.
+
+    IVF indexes are trained on the given embeddings. When there are too few
+    vectors to train them, a flat index is returned instead.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unsupported index type: {index_type} (expected one of {', '.join(INDEX_TYPES)})")
+
+    n, dimension = embeddings.shape
+    metric = faiss.METRIC_INNER_PRODUCT  # cosine similarity on normalized vectors
+
+    if index_type in ('ivf_flat', 'ivf_pq'):
+        nlist = min(nlist, n // MIN_POINTS_PER_LIST)
+        if nlist < 1 or (index_type == 'ivf_pq' and n < PQ_MIN_TRAINING_POINTS):
+            print(f"Warning: {n} documents are too few to train {index_type}, using flat index")
+            index_type = 'flat'
+
+    if index_type == 'flat':
+        base = faiss.IndexFlatIP(dimension)
+    elif index_type in QUANTIZED_FLAT_TYPES:
+        base = faiss.IndexScalarQuantizer(dimension, QUANTIZED_FLAT_TYPES[index_type], metric)
+        # int8 learns per-dimension ranges; fp16 needs no training
+        base.train(embeddings)
+    elif index_type == 'hnsw':
+        base = faiss.IndexHNSWFlat(dimension, hnsw_m, metric)
+    else:
+        quantizer = faiss.IndexFlatIP(dimension)
+        if index_type == 'ivf_flat':
+            base = faiss.IndexIVFFlat(quantizer, dimension, nlist, metric)
+        else:
+            # The number of sub-quantizers must divide the dimension
+            m = max(d for d in range(1, min(pq_m, dimension) + 1) if dimension % d == 0)
+            base = faiss.IndexIVFPQ(quantizer, dimension, nlist, m, 8, metric)
+        base.train(embeddings)
+        # IVF lists store ids themselves. IndexIDMap must not wrap them: its remove_ids
+        # compacts id_map as if the inner index renumbered its rows, which IVF does not
+        return base
+
+    return faiss.IndexIDMap(base)
+
+def writable_copy(index):
+    """An in-memory copy of an index that owns its vectors.
+
+    Needed before mutating a memory-mapped index (EmbeddingCache.load_index):
+    FAISS aborts the process when vectors are added to mapped storage, and
+    clone_index keeps the mapping.
+    """
+    return faiss.deserialize_index(faiss.serialize_index(index))
+
+def _base_index(index):
+    return faiss.downcast_index(index.index if isinstance(index, faiss.IndexIDMap) else index)
+
+def supports_removal(index) -> bool:
+    """Whether vectors can be deleted in place (HNSW graphs cannot)."""
+    return not isinstance(_base_index(index), faiss.IndexHNSW)
+
+def describe_index(index) -> dict:
+    """Type and build parameters of an index as it was built.
+
+    These can differ from what was asked of build_index, which lowers nlist
+    to fit the number of vectors, rounds pq_m to a divisor of the dimension
+    and falls back to flat when there are too few vectors to train.
+    """
+    base = _base_index(index)
+    if isinstance(base, faiss.IndexIVFPQ):
+        return {'index_type': 'ivf_pq', 'nlist': base.nlist, 'pq_m': base.pq.M}
+    if isinstance(base, faiss.IndexIVF):
+        return {'index_type': 'ivf_flat', 'nlist': base.nlist}
+    if isinstance(base, faiss.IndexHNSW):
+        # Upper levels hold M links per node (level 0 holds 2M)
+        return {'index_type': 'hnsw', 'hnsw_m': base.hnsw.nb_neighbors(1)}
+    if isinstance(base, faiss.IndexScalarQuantizer):
+        for index_type, qtype in QUANTIZED_FLAT_TYPES.items():
+            if base.sq.qtype == qtype:
+                return {'index_type': index_type}
+    return {'index_type': 'flat'}
+
+def search_parameters(index, selector=None, nprobe: int = 8, ef_search: int = 64):
+    """Search parameters matching the index type, or None if there is nothing to set."""
+    kwargs = {} if selector is None else {'sel': selector}
+    base = _base_index(index)
+    if isinstance(base, faiss.IndexIVF):
+        return faiss.SearchParametersIVF(nprobe=nprobe, **kwargs)
+    if isinstance(base, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(efSearch=ef_search, **kwargs)
+    return faiss.SearchParameters(**kwargs) if kwargs else None
\ No newline at end of file
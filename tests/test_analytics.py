@@ -0,0 +1,50 @@
+import random
+from collections import Counter
+
+import pytest
+
+from src.analytics import SessionAnalytics
+
+def entry(score, category='technical', improvements=()):
+    return {'score': score, 'category': category, 'feedback': {'improvements': list(improvements)}}
+
+def test_score_aggregates():
+    analytics = SessionAnalytics()
+    assert analytics.average == 0.0 and analytics.highest is None
+    for score, category in [(70, 'technical'), (40, 'behavioral'), (90, 'technical')]:
+        analytics.add(entry(score, category))
+    assert (analytics.count, analytics.highest, analytics.lowest) == (3, 90, 40)
+    assert analytics.average == pytest.approx(200 / 3)
+    assert analytics.scores == [70, 40, 90]
+    assert analytics.category_rows() == [
+        {'Category': 'technical', 'Average Score': 80.0, 'Questions': 2},
+        {'Category': 'behavioral', 'Average Score': 40.0, 'Questions': 1},
+    ]
+
+def test_entries_without_feedback():
+    analytics = SessionAnalytics()
+    analytics.add({'score': 50, 'category': 'General'})
+    assert analytics.top_improvements() == []
+
+def test_top_improvements_are_ranked_incrementally():
+    analytics = SessionAnalytics(top_k=2)
+    analytics.add(entry(50, improvements=['a', 'b', 'c']))
+    assert analytics.top_improvements() == [('a', 1), ('b', 1)]
+    # c overtakes the last place, then the first
+    analytics.add(entry(50, improvements=['c']))
+    assert analytics.top_improvements() == [('c', 2), ('a', 1)]
+    # Ties keep the improvement mentioned first in front, as Counter.most_common does
+    analytics.add(entry(50, improvements=['b']))
+    assert analytics.top_improvements() == [('b', 2), ('c', 2)]
+
+@pytest.mark.parametrize('seed', range(20))
+def test_top_improvements_match_most_common(seed):
+    rng = random.Random(seed)
+    vocabulary = [f"improvement {i}" for i in range(12)]
+    analytics = SessionAnalytics(top_k=5)
+    counts = Counter()
+    for _ in range(60):
+        improvements = rng.sample(vocabulary, rng.randint(0, 3))
+        analytics.add(entry(rng.randint(0, 100), improvements=improvements))
+        counts.update(improvements)
+        assert analytics.top_improvements() == counts.most_common(5)
\ No newline at end of file
@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+from benchmarks.synthetic import register_stub_backend
+from src.rag_engine import RAGEngine
+from utils.catalog import load_job_catalog, load_question_bank
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    # The catalog paths are relative to the repository root, as when running the app
+    monkeypatch.chdir(REPO_ROOT)
+
+def test_default_question_bank_loads():
+    bank = load_question_bank()
+    assert set(bank) >= {'technical', 'behavioral', 'situational'}
+    assert all(q['question'] for questions in bank.values() for q in questions)
+
+def test_default_job_catalog_loads():
+    catalog = load_job_catalog()
+    assert catalog.jobs
+    assert catalog.titles[0] in catalog.by_title
+
+def test_knowledge_base_indexes_real_catalog():
+    register_stub_backend()
+    engine = RAGEngine(backend='stub', cache_dir=None)
+    question_count = sum(len(questions) for questions in load_question_bank().values())
+    job_count = len(load_job_catalog().jobs)
+    assert len(engine.documents) >= question_count + job_count
+    results = engine.retrieve('Tell me about a time you led a team', k=3, doc_type='question')
+    assert len(results) == 3
\ No newline at end of file
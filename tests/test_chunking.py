@@ -0,0 +1,23 @@
+import pytest
+
+from utils.chunking import chunk_text, tokenize
+
+def test_tokenize_keeps_skill_symbols():
+    assert tokenize('Node.js, C++ and C# (k8s)') == ['node.js', 'c++', 'and', 'c#', 'k8s']
+
+def test_chunks_overlap_and_cover_the_text():
+    words = [f"w{i}" for i in range(25)]
+    chunks = chunk_text(' '.join(words), max_words=10, overlap=3)
+    assert [chunk.split() for chunk in chunks] == [words[0:10], words[7:17], words[14:24], words[21:25]]
+
+def test_last_window_ends_the_text():
+    words = [f"w{i}" for i in range(17)]
+    assert chunk_text(' '.join(words), max_words=10, overlap=3)[-1].split() == words[7:17]
+
+def test_short_and_empty_text():
+    assert chunk_text('  a   short\ntext ') == ['a short text']
+    assert chunk_text('') == []
+
+def test_overlap_must_be_smaller_than_the_window():
+    with pytest.raises(ValueError):
+        chunk_text('some text', max_words=5, overlap=5)
\ No newline at end of file
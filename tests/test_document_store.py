@@ -0,0 +1,113 @@
+import pytest
+
+from benchmarks.synthetic import register_stub_backend
+from src import document_store
+from src.document_store import DocumentStore
+from src.rag_engine import RAGEngine
+
+def question(text, category='technical', difficulty='Medium', skills=('python',)):
+    return {'type': 'question', 'content': text,
+            'metadata': {'category': category, 'difficulty': difficulty, 'skills': list(skills)}}
+
+DOCUMENTS = [
+    question('Explain Python decorators.'),
+    question('Tell me about a conflict.', 'behavioral', 'Easy', ()),
+    {'type': 'job_description', 'content': 'Build data pipelines.',
+     'metadata': {'id': 'de-1', 'title': 'Data Engineer', 'description': 'Build data pipelines.',
+                  'skills': ['sql', 'spark'], 'level': 3}},
+    # Irregular shapes are kept as given
+    {'type': 'question', 'content': 'No metadata here.'},
+    {'type': 'note', 'content': 'Extra field.', 'metadata': {}, 'source': 'upload'},
+    {'type': 'question', 'content': 'Unicode café ✓.', 'metadata': {'category': None, 'difficulty': 3}},
+    question(''),
+]
+
+@pytest.fixture(params=[False, True], ids=['heap', 'mmap'])
+def store(request):
+    store = DocumentStore(DOCUMENTS, mmap_text=request.param)
+    yield store
+    store.close()
+
+def test_round_trip(store):
+    assert len(store) == len(DOCUMENTS)
+    assert list(store) == list(range(len(DOCUMENTS)))
+    assert [document for _, document in store.items()] == DOCUMENTS
+    for doc_id, document in enumerate(DOCUMENTS):
+        assert store.content(doc_id) == document['content']
+
+def test_coded_columns(store):
+    # Category and difficulty strings are stored as codes, one table entry per distinct value
+    assert store._categories.values == ['technical', 'behavioral']
+    assert store._difficulties.values == ['Medium', 'Easy']
+    assert store._category_codes[1] == 1
+    # Non-string values are not coded and come back from the extras
+    assert store._category_codes[5] == document_store._NO_CODE
+    assert store[5]['metadata'] == {'category': None, 'difficulty': 3}
+    # A description equal to the content is stored once
+    assert store._extras[2][2] is document_store._CONTENT
+    assert store[2]['metadata']['description'] == 'Build data pipelines.'
+
+def test_irregular_documents_are_kept_as_given(store):
+    assert set(store._irregular) == {3, 4}
+    assert store[3] is DOCUMENTS[3]
+    assert store[4]['source'] == 'upload'
+
+def test_results_are_independent_copies(store):
+    document = store[0]
+    document['metadata']['skills'].append('rust')
+    assert store[0]['metadata']['skills'] == ['python']
+
+def test_setitem_replaces_existing_document(store):
+    store[0] = question('Explain Python generators.', 'technical', 'Hard')
+    assert len(store) == len(DOCUMENTS)
+    assert store[0]['content'] == 'Explain Python generators.'
+    assert store[0]['metadata']['difficulty'] == 'Hard'
+    assert store.ids_with_content('Explain Python decorators.') == []
+    assert store.ids_with_content('Explain Python generators.') == [0]
+    # A regular document can replace an irregular one and back
+    store[3] = question('Now regular.')
+    assert 3 not in store._irregular
+    assert store[3] == question('Now regular.')
+    store[1] = DOCUMENTS[4]
+    assert store[1] is DOCUMENTS[4]
+
+def test_pop_and_ids_with_content(store):
+    store[10] = question('Explain Python decorators.')
+    assert store.ids_with_content('Explain Python decorators.') == [0, 10]
+    assert store.pop(0) == DOCUMENTS[0]
+    assert 0 not in store and 10 in store
+    assert store.ids_with_content('Explain Python decorators.') == [10]
+    with pytest.raises(KeyError):
+        store[0]
+    with pytest.raises(KeyError):
+        store.content(8)
+
+def test_compact_reclaims_replaced_text(store):
+    for i in range(20):
+        store[0] = question(f"Revision {i} of the first question.")
+    store.pop(1)
+    before = store._text_size
+    store.compact()
+    assert store._text_size < before
+    assert store._dead_bytes == 0
+    assert store[0]['content'] == 'Revision 19 of the first question.'
+    assert [document for doc_id, document in store.items() if doc_id > 1] == DOCUMENTS[2:]
+
+def test_compacts_automatically(monkeypatch):
+    monkeypatch.setattr(document_store, 'COMPACT_MIN_BYTES', 1000)
+    store = DocumentStore(mmap_text=True)
+    for i in range(200):
+        store[i % 5] = question(f"Question {i} " + 'x' * 40)
+    # Never more dead text than live text once past the threshold
+    assert store._text_size <= 2 * 5 * 60 + 1000
+    assert store[4]['content'].startswith('Question 199 ')
+    store.close()
+
+def test_engine_closes_replaced_store():
+    register_stub_backend()
+    engine = RAGEngine(backend='stub', cache_dir=None, knowledge_base=False, mmap_text=True)
+    engine.load_documents(DOCUMENTS[:2])
+    previous = engine.documents
+    engine.load_documents(DOCUMENTS[1:3])
+    assert previous._file.closed
+    assert engine.retrieve('Build data pipelines.', k=1)[0]['document'] == DOCUMENTS[2]
\ No newline at end of file
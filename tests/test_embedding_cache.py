@@ -0,0 +1,94 @@
+import multiprocessing
+import os
+
+import faiss
+import numpy as np
+import pytest
+
+from utils import embedding_cache
+from utils.embedding_cache import EmbeddingCache
+
+def encode(texts):
+    rng = np.random.default_rng(len(texts))
+    return rng.random((len(texts), 8), dtype='float32')
+
+def flat_index(embeddings):
+    index = faiss.IndexFlatIP(embeddings.shape[1])
+    index.add(embeddings)
+    return index
+
+def test_round_trip(tmp_path):
+    cache = EmbeddingCache('model', str(tmp_path))
+    embeddings = cache.embed(['a', 'b'], ['h1', 'h2'], encode)
+    cache.save()
+    cache.save_index(flat_index(embeddings), ['h1', 'h2'])
+
+    reloaded = EmbeddingCache('model', str(tmp_path))
+    assert len(reloaded) == 2
+    np.testing.assert_array_equal(reloaded.embed(['a', 'b'], ['h1', 'h2'], encode), embeddings)
+    assert reloaded.load_index(['h1', 'h2']).ntotal == 2
+    assert reloaded.load_index(['h1', 'h3']) is None
+
+def test_failed_save_keeps_previous_version(tmp_path, monkeypatch):
+    cache = EmbeddingCache('model', str(tmp_path))
+    embeddings = cache.embed(['a'], ['h1'], encode)
+    cache.save()
+    cache.save_index(flat_index(embeddings), ['h1'])
+
+    def crash(path, write):
+        raise OSError('disk full')
+
+    # The data files are written, but the manifests naming them never are
+    monkeypatch.setattr(embedding_cache, '_atomic_write', crash)
+    cache.embed(['b'], ['h2'], encode)
+    with pytest.raises(OSError):
+        cache.save()
+    cache.save_index(flat_index(embeddings), ['h1', 'h2'])
+    monkeypatch.undo()
+
+    reloaded = EmbeddingCache('model', str(tmp_path))
+    assert len(reloaded) == 1
+    assert reloaded.load_index(['h1']).ntotal == 1
+
+def test_superseded_versions_are_removed(tmp_path):
+    cache = EmbeddingCache('model', str(tmp_path))
+    for i in range(4):
+        hashes = [f"h{j}" for j in range(i + 1)]
+        embeddings = cache.embed(hashes, hashes, encode)
+        cache.save()
+        cache.save_index(flat_index(embeddings), hashes)
+
+    names = os.listdir(cache.directory)
+    # The current version and the one before it
+    assert len([name for name in names if name.startswith('embeddings-')]) == 2
+    assert len([name for name in names if name.startswith('hashes-')]) == 2
+    assert len([name for name in names if name.startswith('index-')]) == 2
+    assert not [name for name in names if name.endswith('.tmp')]
+
+def save_in_process(directory, hashes):
+    cache = EmbeddingCache('model', directory)
+    embeddings = cache.embed(hashes, hashes, encode)
+    cache.save()
+    # Another process may hold the current index mapped meanwhile
+    mapped = cache.load_index(hashes, mmap=True)
+    cache.save_index(flat_index(embeddings), hashes)
+    if mapped is not None:
+        assert mapped.search(embeddings[:1], 1)[1][0, 0] == 0
+
+def test_concurrent_saves(tmp_path):
+    context = multiprocessing.get_context('spawn')
+    corpora = [['h1', 'h2'], ['h1', 'h2'], ['h1', 'h2', 'h3'], ['h1', 'h2'], ['h1', 'h2', 'h3', 'h4']]
+    processes = [context.Process(target=save_in_process, args=(str(tmp_path), hashes)) for hashes in corpora]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+
+    cache = EmbeddingCache('model', str(tmp_path))
+    assert len(cache) in (2, 3, 4)
+    index = None
+    for hashes in corpora:
+        index = index or cache.load_index(hashes)
+    assert index is not None
+    assert not [name for name in os.listdir(cache.directory) if name.endswith('.tmp')]
\ No newline at end of file
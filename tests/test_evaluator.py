@@ -0,0 +1,26 @@
+import pytest
+
+from benchmarks.synthetic import synthetic_answers
+from src.evaluator import ResponseEvaluator
+
+JOB_CONTEXT = {'title': 'Backend Engineer', 'description': 'Python AWS Docker'}
+STAR_ANSWER = ("At my last company our checkout API slowed to 3 seconds during peak traffic. The challenge was to "
+               "bring it under 500ms within 2 months. I profiled the service, implemented Redis caching and added "
+               "database indexes in PostgreSQL. As a result latency decreased by 80% and revenue increased by 5%.")
+
+@pytest.mark.parametrize('question, response, job_context, score', [
+    # Scores of the evaluator before the rubric was precompiled
+    ("Tell me about a time you improved performance.", STAR_ANSWER, None, 58),
+    ("Why do you want this job?", "Because I like it.", None, 10),
+    ("How would you scale a Python service on AWS?", STAR_ANSWER, JOB_CONTEXT, 64),
+])
+def test_scores_are_unchanged(question, response, job_context, score):
+    assert ResponseEvaluator().evaluate_response(question, response, job_context)['score'] == score
+
+def test_batch_matches_single_evaluations():
+    evaluator = ResponseEvaluator()
+    pairs = [pair if i % 2 else pair + (JOB_CONTEXT,) for i, pair in enumerate(synthetic_answers(60))]
+    pairs.append(("Why do you want this job?", "Because I like it."))
+    pairs.append(("How would you scale a Python service on AWS?", STAR_ANSWER, JOB_CONTEXT))
+    assert evaluator.evaluate_batch(pairs) == [evaluator.evaluate_response(*pair) for pair in pairs]
+    assert evaluator.evaluate_batch([]) == []
\ No newline at end of file
@@ -0,0 +1,74 @@
+import io
+import os
+import tempfile
+
+import docx
+
+from utils import file_handler
+from utils.file_handler import FileHandler
+
+def make_pdf(texts):
+    """A minimal PDF with one line of Helvetica text per page."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in texts:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode('latin-1')
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % kid for kid in kids), len(kids))
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+def upload(name, data):
+    file = io.BytesIO(data)
+    file.name = name
+    return file
+
+def test_extracts_txt_and_docx():
+    assert FileHandler.extract_text(upload('jd.txt', 'Senior engineer ✓'.encode('utf-8'))) == 'Senior engineer ✓'
+    document = docx.Document()
+    document.add_paragraph('First paragraph')
+    document.add_paragraph('Second paragraph')
+    buffer = io.BytesIO()
+    document.save(buffer)
+    assert FileHandler.extract_text(upload('resume.docx', buffer.getvalue())) == 'First paragraph\nSecond paragraph'
+
+def test_small_pdf_is_extracted_in_process():
+    pages = [f"Page {i}" for i in range(3)]
+    assert list(FileHandler.iter_text(upload('jd.pdf', make_pdf(pages)))) == pages
+
+def test_large_pdf_is_extracted_in_one_shared_pool():
+    count = file_handler.PARALLEL_PAGE_THRESHOLD + 5
+    pages = [f"Page {i}" for i in range(count)]
+    other = [f"Other {i}" for i in range(count)]
+    temporary_pdfs = lambda: {name for name in os.listdir(tempfile.gettempdir()) if name.endswith('.pdf')}
+    before = temporary_pdfs()
+
+    assert list(FileHandler.iter_text(upload('a.pdf', make_pdf(pages)))) == pages
+    pool = file_handler._pdf_pool
+    assert pool is not None
+    assert list(FileHandler.iter_text(upload('b.pdf', make_pdf(other)))) == other
+    assert file_handler._pdf_pool is pool
+    assert list(FileHandler.iter_text(upload('a.pdf', make_pdf(pages)), parallel=False)) == pages
+    assert temporary_pdfs() == before
+
+def test_extracted_text_is_cached_by_content(monkeypatch):
+    file = upload('cached.txt', b'Cached text')
+    assert FileHandler.extract_text(file) == 'Cached text'
+
+    def fail(*args, **kwargs):
+        raise AssertionError('extracted again')
+
+    monkeypatch.setattr(FileHandler, '_iter_bytes', staticmethod(fail))
+    assert FileHandler.extract_text(upload('renamed.txt', b'Cached text')) == 'Cached text'
\ No newline at end of file
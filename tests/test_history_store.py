@@ -0,0 +1,89 @@
+import csv
+
+import pytest
+
+from utils.history_store import HistoryStore
+
+def entry(i, category='technical', score=5, improvements=()):
+    return {
+        'timestamp': f"2024-01-01 10:{i:02d}:00",
+        'question': f"Question {i}",
+        'category': category,
+        'response': f"Answer {i}",
+        'score': score,
+        'feedback': {
+            'score': score,
+            'strengths': [f"Strength {i}"],
+            'improvements': list(improvements),
+            'reasoning': 'Reasoning',
+            'overall_assessment': 'Good',
+        },
+    }
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.db'))
+    yield store
+    store.close()
+
+def test_uses_write_ahead_log(store):
+    assert store._query("PRAGMA journal_mode")[0][0] == 'wal'
+    assert store._query("PRAGMA foreign_keys")[0][0] == 1
+
+def test_round_trip(store):
+    store.add(entry(1, improvements=['Be concise', 'Add metrics']), 's1')
+    [saved] = store.history('s1')
+    assert saved == {
+        'timestamp': '2024-01-01 10:01:00', 'question': 'Question 1', 'category': 'technical',
+        'response': 'Answer 1', 'score': 5,
+        'feedback': {'score': 5, 'strengths': ['Strength 1'], 'improvements': ['Be concise', 'Add metrics'],
+                     'reasoning': 'Reasoning', 'overall_assessment': 'Good'},
+    }
+
+def test_add_many_buffers_until_batch_is_full(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.db'), batch_size=3)
+    store.add_many([entry(1), entry(2)], 's1')
+    assert store.history() == []
+    store.add(entry(3), 's1')
+    assert len(store.history()) == 3
+    store.add(entry(4), 's1')
+    store.flush()
+    assert len(store.history()) == 4
+    store.add(entry(5), 's1')
+    # close() writes what is still buffered
+    store.close()
+    reopened = HistoryStore(str(tmp_path / 'history.db'))
+    assert len(reopened.history()) == 5
+    reopened.close()
+
+def test_history_filters_and_orders(store):
+    store.add_many([entry(1, score=7), entry(2, 'behavioral', 3), entry(3, score=9)], 's1')
+    store.add(entry(4, score=1), 's2')
+    assert [e['question'] for e in store.history('s1')] == ['Question 3', 'Question 2', 'Question 1']
+    assert [e['score'] for e in store.history('s1', order='Highest Score')] == [9, 7, 3]
+    assert [e['question'] for e in store.history('s1', category='behavioral')] == ['Question 2']
+    assert len(store.history(limit=2)) == 2
+    assert len(store.history()) == 4
+    assert store.categories('s1') == ['behavioral', 'technical']
+
+def test_iter_answers_pages_by_id(store):
+    store.add_many([entry(i) for i in range(7)], 's1')
+    chunks = list(store.iter_answers(chunk_size=3))
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    assert [row['question'] for chunk in chunks for row in chunk] == [f"Question {i}" for i in range(7)]
+
+def test_import_csv(store, tmp_path):
+    path = tmp_path / 'user_history.csv'
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['timestamp', 'question', 'category', 'response', 'score', 'feedback'])
+        writer.writeheader()
+        first = entry(1, improvements=['Be concise'])
+        writer.writerow({**first, 'feedback': str(first['feedback'])})
+        # A feedback column that is not a dict literal is imported without feedback
+        writer.writerow({**entry(2, score=4), 'feedback': 'not a dict'})
+
+    assert store.import_csv(str(path)) == 2
+    history = store.history('imported', order='Oldest First')
+    assert [e['score'] for e in history] == [5, 4]
+    assert history[0]['feedback']['improvements'] == ['Be concise']
+    assert history[1]['feedback']['strengths'] == []
\ No newline at end of file
@@ -0,0 +1,77 @@
+import json
+import os
+
+import pytest
+
+from benchmarks.synthetic import register_stub_backend
+from src.ingest import ingest_directory
+from src.rag_engine import RAGEngine
+from utils.catalog import load_ingested_documents
+
+@pytest.fixture
+def paths(tmp_path):
+    directory = tmp_path / 'jds'
+    directory.mkdir()
+    (directory / 'data_engineer.txt').write_text(' '.join(f"pipeline{i}" for i in range(25)))
+    (directory / 'designer.txt').write_text('Design products with users.')
+    (directory / 'notes.md').write_text('Not a supported file type.')
+    return {'directory': str(directory), 'documents_path': str(tmp_path / 'ingested' / 'documents.jsonl'),
+            'manifest_path': str(tmp_path / 'ingested' / 'manifest.json')}
+
+@pytest.fixture
+def engine():
+    register_stub_backend()
+    return RAGEngine(backend='stub', cache_dir=None, knowledge_base=False)
+
+def ingest(engine, paths):
+    return ingest_directory(paths['directory'], engine, workers=1, max_words=10, overlap=2,
+                            documents_path=paths['documents_path'], manifest_path=paths['manifest_path'])
+
+def stored(paths):
+    with open(paths['documents_path'], encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+def test_ingests_new_files_and_skips_unchanged_ones(engine, paths):
+    stats = ingest(engine, paths)
+    assert (stats['ingested'], stats['chunks'], stats['unchanged']) == (2, 4, 0)
+    source = os.path.join(paths['directory'], 'data_engineer.txt')
+    chunks = [engine.documents[doc_id] for doc_id in engine.document_ids(filters={'source': source})]
+    assert [doc['metadata']['chunk'] for doc in chunks] == [0, 1, 2]
+    assert chunks[0]['type'] == 'job_description' and chunks[0]['metadata']['title'] == 'data_engineer'
+
+    # Untouched files are skipped on their size and mtime, touched ones on their hash
+    os.utime(source, ns=(0, 0))
+    stats = ingest(engine, paths)
+    assert (stats['ingested'], stats['replaced'], stats['unchanged'], stats['chunks']) == (0, 0, 2, 0)
+    assert len(stored(paths)) == 4 and len(engine.documents) == 4
+
+def test_changed_file_replaces_its_chunks(engine, paths):
+    ingest(engine, paths)
+    source = os.path.join(paths['directory'], 'data_engineer.txt')
+    with open(source, 'w') as f:
+        f.write('Kafka streaming and Spark batch jobs')
+    stats = ingest(engine, paths)
+    assert (stats['replaced'], stats['unchanged'], stats['chunks']) == (1, 1, 1)
+
+    contents = [engine.documents[doc_id]['content'] for doc_id in engine.document_ids(filters={'source': source})]
+    assert contents == ['Kafka streaming and Spark batch jobs']
+    # The documents file is compacted to the current chunks of each file
+    assert sorted(doc['content'] for doc in stored(paths)) == [
+        'Design products with users.', 'Kafka streaming and Spark batch jobs']
+    assert load_ingested_documents(paths['documents_path'], paths['manifest_path']) == stored(paths)
+
+def test_load_keeps_only_current_chunks(tmp_path):
+    def chunk(source, source_hash, number, content):
+        return {'type': 'resume', 'content': content,
+                'metadata': {'source': source, 'source_hash': source_hash, 'chunk': number}}
+
+    manifest_path, documents_path = tmp_path / 'manifest.json', tmp_path / 'documents.jsonl'
+    manifest_path.write_text(json.dumps({'/a.txt': {'sha256': 'new'}, '/b.txt': {'sha256': 'b'}}))
+    lines = [chunk('/a.txt', 'old', 0, 'stale'), chunk('/a.txt', 'new', 0, 'current'),
+             chunk('/a.txt', 'new', 0, 'current'), chunk('/c.txt', 'c', 0, 'unknown file'),
+             chunk('/b.txt', 'b', 0, 'other')]
+    documents_path.write_text(''.join(json.dumps(line) + "\n" for line in lines) + '{"type": "res')
+
+    documents = load_ingested_documents(str(documents_path), str(manifest_path))
+    assert [doc['content'] for doc in documents] == ['current', 'other']
+    assert load_ingested_documents(str(tmp_path / 'missing.jsonl'), str(manifest_path)) == []
\ No newline at end of file
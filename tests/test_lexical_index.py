@@ -0,0 +1,73 @@
+import math
+
+import pytest
+
+from benchmarks.synthetic import register_stub_backend
+from src.lexical_index import BM25Index
+from src.rag_engine import RAGEngine
+
+TEXTS = {
+    0: 'python decorators and generators',
+    1: 'kubernetes deployment rollout',
+    2: 'python kubernetes operator in python',
+    3: 'team conflict resolution',
+}
+
+@pytest.fixture
+def index():
+    index = BM25Index()
+    for doc_id, text in TEXTS.items():
+        index.add(doc_id, text)
+    return index
+
+def test_search_ranks_by_bm25(index):
+    results = index.search('python', k=5)
+    assert [doc_id for doc_id, _ in results] == [2, 0]
+    # Document 2 has tf=2 and length 5; the average length is 3.75
+    idf = math.log(1 + (4 - 2 + 0.5) / (2 + 0.5))
+    norm = index.k1 * (1 - index.b + index.b * 5 / 3.75)
+    assert results[0][1] == pytest.approx(idf * 2 * (index.k1 + 1) / (2 + norm))
+
+def test_search_limits_and_misses(index):
+    assert len(index.search('python kubernetes', k=1)) == 1
+    assert index.search('python', k=0) == []
+    assert index.search('haskell') == []
+    assert BM25Index().search('python') == []
+
+def test_add_replaces_previous_text(index):
+    index.add(3, 'python conflict')
+    assert len(index) == 4
+    assert {doc_id for doc_id, _ in index.search('python')} == {0, 2, 3}
+    assert index.search('team') == []
+
+def test_remove(index):
+    index.remove(2)
+    index.remove(42)
+    assert 2 not in index and len(index) == 3
+    assert [doc_id for doc_id, _ in index.search('python')] == [0]
+    for doc_id in list(TEXTS):
+        index.remove(doc_id)
+    assert index._postings == {} and index._total_length == 0
+
+@pytest.mark.parametrize('allowed', [{2}, {0, 1, 2, 3, 4, 5, 6}], ids=['small', 'large'])
+def test_search_with_allowed_ids(index, allowed):
+    # Small allowed sets are walked instead of the posting list; both give the same results
+    expected = [hit for hit in index.search('python kubernetes') if hit[0] in allowed]
+    assert index.search('python kubernetes', allowed=allowed) == expected
+
+def test_search_with_excluded_ids(index):
+    expected = [hit for hit in index.search('python kubernetes') if hit[0] != 2]
+    assert index.search('python kubernetes', excluded=[2]) == expected
+    assert {doc_id for doc_id, _ in expected} == {0, 1}
+    assert index.search('python', allowed={0, 2}, excluded={0, 2}) == []
+
+def test_blend_min_max_normalizes_each_side():
+    register_stub_backend()
+    engine = RAGEngine(backend='stub', cache_dir=None, knowledge_base=False, hybrid_alpha=0.7)
+    blended = dict(engine._blend([(1, 0.9), (2, 0.5)], [(2, 12.0), (3, 4.0)]))
+    assert blended == pytest.approx({1: 0.7, 2: 0.3, 3: 0.0})
+    assert [doc_id for doc_id, _ in engine._blend([(1, 0.9), (2, 0.5)], [(2, 12.0), (3, 4.0)])] == [1, 2, 3]
+    # A single hit, or equal scores, normalize to 1
+    assert engine._blend([(5, 0.2)], []) == [(5, pytest.approx(0.7))]
+    assert dict(engine._blend([], [(1, 3.0), (2, 3.0)])) == pytest.approx({1: 0.3, 2: 0.3})
+    assert engine._blend([], []) == []
\ No newline at end of file
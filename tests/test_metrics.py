@@ -0,0 +1,87 @@
+import json
+import os
+import threading
+
+import pytest
+
+from benchmarks.synthetic import register_stub_backend
+from src.rag_engine import RAGEngine
+from utils.metrics import Metrics, metrics
+
+def counter(snapshot, name):
+    return sum(c['value'] for c in snapshot['counters'] if c['name'] == name)
+
+def test_disabled_metrics_record_nothing():
+    registry = Metrics()
+    with registry.span('stage'):
+        registry.increment('calls')
+    assert registry.snapshot()['counters'] == [] and registry.snapshot()['histograms'] == []
+
+def test_spans_counters_and_traces():
+    registry = Metrics(enabled=True)
+    with registry.trace() as spans:
+        with registry.span('outer'):
+            with registry.span('inner', kind='a"b'):
+                pass
+        registry.increment('calls', 2, route='/x')
+    assert [name for name, _ in spans] == ['inner', 'outer']
+    snapshot = registry.snapshot()
+    assert snapshot['counters'] == [{'name': 'calls', 'labels': {'route': '/x'}, 'value': 2}]
+    assert {h['name']: h['count'] for h in snapshot['histograms']} == {'inner': 1, 'outer': 1}
+    text = registry.prometheus_text()
+    assert 'interview_calls_total{route="/x"} 2' in text
+    assert 'interview_inner_seconds_count{kind="a\\"b"} 1' in text
+
+def test_collectors_are_read_on_snapshot():
+    registry = Metrics(enabled=True)
+    values = {'external_hits': 1}
+    registry.add_collector(lambda: dict(values))
+    registry.increment('external_hits', 2)
+    values['external_hits'] = 5
+    assert counter(registry.snapshot(), 'external_hits') == 7
+    registry.reset()
+    assert counter(registry.snapshot(), 'external_hits') == 5
+
+def test_concurrent_exports(tmp_path):
+    registry = Metrics(enabled=True)
+    registry.increment('calls')
+    path = str(tmp_path / 'metrics.json')
+    errors = []
+
+    def export():
+        try:
+            for _ in range(100):
+                registry.export(path)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=export) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert os.listdir(tmp_path) == ['metrics.json']
+    with open(path) as f:
+        assert counter(json.load(f), 'calls') == 1
+
+@pytest.fixture
+def enabled():
+    previous = metrics.enabled
+    metrics.enable()
+    yield metrics
+    metrics.enable(previous)
+
+def test_query_cache_counters_come_from_the_cache(enabled):
+    register_stub_backend()
+    engine = RAGEngine(backend='stub', cache_dir=None, knowledge_base=False)
+    engine.load_documents([{'type': 'question', 'content': 'What is SQL?', 'metadata': {}}])
+    before = enabled.snapshot()
+    engine.retrieve('databases')
+    engine.retrieve_batch(['databases', 'indexes', 'indexes'])
+    after = enabled.snapshot()
+
+    stats = engine.query_cache.stats()
+    assert (stats['hits'], stats['misses']) == (1, 3)
+    assert counter(after, 'query_cache_hits') - counter(before, 'query_cache_hits') == stats['hits']
+    assert counter(after, 'query_cache_misses') - counter(before, 'query_cache_misses') == stats['misses']
\ No newline at end of file
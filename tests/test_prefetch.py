@@ -0,0 +1,95 @@
+from concurrent.futures import Executor, Future
+
+from src.prefetch import QuestionPrefetcher
+
+JOB = {'title': 'Data Engineer', 'description': 'Build pipelines.'}
+OTHER_JOB = {'title': 'Designer', 'description': 'Design products.'}
+
+class ManualExecutor(Executor):
+    """Runs submitted tasks when run() is called, or at once with immediate=True."""
+
+    def __init__(self, immediate=False):
+        self.immediate = immediate
+        self.pending = []
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        self.pending.append((future, lambda: fn(*args, **kwargs)))
+        if self.immediate:
+            self.run()
+        return future
+
+    def run(self):
+        while self.pending:
+            future, task = self.pending.pop(0)
+            try:
+                future.set_result(task())
+            except Exception as e:
+                future.set_exception(e)
+
+class Generator:
+    """Numbers questions per job title, skipping ones already in the history."""
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    def generate_question(self, job_context, history=None, category=None, difficulty=None):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError('retrieval failed')
+        asked = {h['question'] for h in history or []}
+        number = next(n for n in range(1000) if f"{job_context['title']} {n}" not in asked)
+        return {'question': f"{job_context['title']} {number}"}
+
+def asked(*questions):
+    return [{'question': question} for question in questions]
+
+def test_questions_come_from_the_prefetched_queue():
+    generator = Generator()
+    prefetcher = QuestionPrefetcher(generator, ManualExecutor(immediate=True), depth=3)
+    prefetcher.prefetch(JOB, [])
+    assert generator.calls == 3
+    assert prefetcher.next_question(JOB, [])['question'] == 'Data Engineer 0'
+    assert prefetcher.next_question(JOB, asked('Data Engineer 0'))['question'] == 'Data Engineer 1'
+    # The queue is topped up after every take, and each question is generated once
+    assert generator.calls == 5
+    assert prefetcher.next_question(JOB, asked('Data Engineer 0', 'Data Engineer 1'))['question'] == 'Data Engineer 2'
+    assert generator.calls == 6
+
+def test_switching_job_context_drops_prefetched_questions():
+    generator = Generator()
+    executor = ManualExecutor()
+    prefetcher = QuestionPrefetcher(generator, executor, depth=2)
+    prefetcher.prefetch(JOB, [])
+    assert prefetcher.next_question(OTHER_JOB, [])['question'] == 'Designer 0'
+    # The task for the old context finishes late and is ignored
+    executor.run()
+    questions = [prefetcher.next_question(OTHER_JOB, asked('Designer 0'))['question'] for _ in range(2)]
+    assert all(question.startswith('Designer') for question in questions)
+
+    # Changing only the filters also starts over
+    prefetcher.prefetch(OTHER_JOB, [], category='Technical')
+    assert prefetcher._key[1] == 'Technical' and not prefetcher._queue
+
+def test_questions_asked_elsewhere_are_skipped():
+    generator = Generator()
+    prefetcher = QuestionPrefetcher(generator, ManualExecutor(immediate=True), depth=3)
+    prefetcher.prefetch(JOB, [])
+    history = asked('Data Engineer 0', 'Data Engineer 1')
+    assert prefetcher.next_question(JOB, history)['question'] == 'Data Engineer 2'
+
+def test_failed_prefetch_falls_back_to_generating_now(capsys):
+    generator = Generator()
+    generator.fail = True
+    executor = ManualExecutor()
+    prefetcher = QuestionPrefetcher(generator, executor, depth=2)
+    prefetcher.prefetch(JOB, [])
+    executor.run()
+    generator.fail = False
+    assert prefetcher.next_question(JOB, [])['question'] == 'Data Engineer 0'
+    assert 'Question prefetch failed - retrieval failed' in capsys.readouterr().out
+    # A new prefetch was started after the failure and serves the next question
+    executor.run()
+    assert prefetcher.next_question(JOB, asked('Data Engineer 0'))['question'] == 'Data Engineer 1'
+    assert generator.calls == 4
\ No newline at end of file
@@ -0,0 +1,104 @@
+import pytest
+
+from benchmarks.synthetic import register_stub_backend, synthetic_questions
+from src import question_generator
+from src.question_generator import QuestionGenerator
+from src.rag_engine import RAGEngine
+
+JOB_CONTEXT = {'title': 'Platform Engineer', 'description': 'Run Kubernetes and Terraform on AWS with Python.'}
+
+@pytest.fixture(scope='module')
+def corpus():
+    return synthetic_questions(200)
+
+@pytest.fixture(scope='module')
+def engine(corpus):
+    register_stub_backend()
+    engine = RAGEngine(backend='stub', cache_dir=None, knowledge_base=False)
+    engine.load_documents(corpus)
+    return engine
+
+def test_questions_match_filters_and_are_never_repeated(corpus, engine):
+    generator = QuestionGenerator(engine)
+    matching = {doc['content'] for doc in corpus
+                if doc['metadata']['category'] == 'technical' and doc['metadata']['difficulty'] == 'Hard'}
+    history = []
+    for _ in range(len(matching)):
+        question = generator.generate_question(JOB_CONTEXT, history, 'Technical', 'Hard')
+        assert question['category'] == 'technical' and question['difficulty'] == 'Hard'
+        assert question['question'] not in {h['question'] for h in history}
+        history.append({'question': question['question']})
+    assert {h['question'] for h in history} == matching
+
+def test_search_continues_past_an_exhausted_pool(corpus, engine):
+    generator = QuestionGenerator(engine)
+    matching = {doc['content'] for doc in corpus if doc['metadata']['category'] == 'behavioral'}
+    assert len(matching) > question_generator.POOL_SIZE
+    history = []
+    for _ in range(len(matching)):
+        question = generator.generate_question(JOB_CONTEXT, history, 'Behavioral')
+        assert question['question'] in matching
+        assert question['question'] not in {h['question'] for h in history}
+        history.append({'question': question['question']})
+    # Every matching question was asked: the fallback no longer draws from the knowledge base
+    assert generator.generate_question(JOB_CONTEXT, history, 'Behavioral')['question'] not in matching
+class StubEngine:
+    """Returns numbered questions and records every retrieve call."""
+
+    def __init__(self, size):
+        self.size = size
+        self.version = 0
+        self.calls = []
+
+    def retrieve(self, query, k=5, doc_type=None, filters=None, exclude=None, mode='dense'):
+        self.calls.append({'k': k, 'filters': filters, 'exclude': set(exclude or ())})
+        contents = (f"Question {i}?" for i in range(self.size))
+        contents = [content for content in contents if content not in self.calls[-1]['exclude']][:k]
+        return [{'document': {'content': content, 'metadata': {'category': 'technical'}}, 'score': 1.0}
+                for content in contents]
+
+def test_pool_is_retrieved_once_per_job_context():
+    engine = StubEngine(100)
+    generator = QuestionGenerator(engine)
+    for _ in range(5):
+        generator.generate_question(JOB_CONTEXT, [], 'Technical')
+    assert len(engine.calls) == 1 and engine.calls[0]['k'] == question_generator.POOL_SIZE
+
+    generator.generate_question({**JOB_CONTEXT, 'description': 'Write Java services.'}, [], 'Technical')
+    generator.generate_question(JOB_CONTEXT, [], 'Behavioral')
+    assert len(engine.calls) == 3
+
+def test_knowledge_base_changes_invalidate_the_pool():
+    engine = StubEngine(100)
+    generator = QuestionGenerator(engine)
+    generator.generate_question(JOB_CONTEXT)
+    engine.version += 1
+    generator.generate_question(JOB_CONTEXT)
+    generator.generate_question(JOB_CONTEXT)
+    assert len(engine.calls) == 2
+
+def test_asked_questions_are_skipped_in_the_pool():
+    engine = StubEngine(100)
+    generator = QuestionGenerator(engine)
+    history = [{'question': f"Question {i}?"} for i in range(question_generator.POOL_SIZE - 2)]
+    for _ in range(10):
+        assert generator.generate_question(JOB_CONTEXT, history)['question'] in {'Question 48?', 'Question 49?'}
+    assert len(engine.calls) == 1
+
+def test_exhausted_pool_falls_back_to_an_excluding_search():
+    engine = StubEngine(100)
+    generator = QuestionGenerator(engine)
+    history = [{'question': f"Question {i}?"} for i in range(question_generator.POOL_SIZE)]
+    question = generator.generate_question(JOB_CONTEXT, history, 'Technical')
+    assert question['question'] in {f"Question {i}?" for i in range(50, 55)}
+    fallback = engine.calls[-1]
+    assert fallback['k'] == question_generator.POOL_CHOICES
+    assert fallback['exclude'] == {h['question'] for h in history} and fallback['filters'] == {'category': 'technical'}
+
+def test_small_exhausted_pool_does_not_search_again():
+    # A pool smaller than POOL_SIZE already holds every match
+    engine = StubEngine(10)
+    generator = QuestionGenerator(engine)
+    history = [{'question': f"Question {i}?"} for i in range(10)]
+    assert generator.generate_question(JOB_CONTEXT, history)['question'] not in {h['question'] for h in history}
+    assert len(engine.calls) == 1
\ No newline at end of file
@@ -0,0 +1,237 @@
+import faiss
+import pytest
+
+from benchmarks.synthetic import register_stub_backend, synthetic_questions
+from src.rag_engine import RAGEngine, fuse_rankings
+from src.vector_index import INDEX_TYPES
+from utils.chunking import chunk_text
+
+@pytest.fixture(scope='module')
+def corpus():
+    register_stub_backend()
+    # Enough documents to train IVF-PQ codebooks, so no index type falls back to flat
+    return synthetic_questions(300)
+
+def new_engine(documents, **options):
+    engine = RAGEngine(backend='stub', knowledge_base=False, **{'cache_dir': None, **options})
+    engine.load_documents(documents)
+    return engine
+
+def test_mmap_index_is_shared_until_mutated(corpus, tmp_path):
+    options = {'cache_dir': str(tmp_path), 'mmap_index': True}
+    first = new_engine(corpus, **options)
+    second = new_engine(corpus, **options)
+    assert first._index_mapped and second._index_mapped
+    content = corpus[42]['content']
+    assert top(second, content, k=1) == [content]
+
+    # Mapped storage is read-only: a mutation switches to a private copy
+    second.remove_document(42)
+    [doc_id] = second.add_documents([{'type': 'question', 'content': 'How do you shard a database?', 'metadata': {}}])
+    assert not second._index_mapped
+    assert top(second, 'shard a database', k=1) == ['How do you shard a database?']
+    assert content not in top(second, content, k=5)
+    assert top(first, content, k=1) == [content]
+
+def test_mmap_index_needs_faiss_support(corpus, tmp_path, monkeypatch):
+    # FAISS before 1.10 only maps IVF lists
+    monkeypatch.delattr(faiss, 'IO_FLAG_MMAP_IFC', raising=False)
+    options = {'cache_dir': str(tmp_path), 'mmap_index': True}
+    new_engine(corpus, **options)
+    assert not new_engine(corpus, **options)._index_mapped
+    ivf = new_engine(corpus, index_type='ivf_flat', nlist=4, **options)
+    assert ivf._index_mapped
+
+def top(engine, query, **kwargs):
+    return [result['document']['content'] for result in engine.retrieve(query, **kwargs)]
+
+@pytest.mark.parametrize('index_type', INDEX_TYPES)
+def test_retrieval_after_add_update_remove(corpus, index_type):
+    engine = new_engine(corpus[:280], index_type=index_type, nlist=4, nprobe=4)
+    ids = engine.add_documents(corpus[280:])
+    new_id = engine.update_document(5, {**corpus[5], 'content': 'How do you migrate a legacy billing monolith?'})
+    engine.remove_document(7)
+    engine.remove_document(ids[0])
+
+    # Every stored id still maps to its own document (PQ codes are lossy, so not always first)
+    for doc_id in [0, 100, 279] + ids[1:]:
+        content = engine.documents[doc_id]['content']
+        assert content in top(engine, content, k=5)
+    assert 'How do you migrate a legacy billing monolith?' in top(engine, 'migrate a legacy billing monolith', k=5)
+    for removed in (corpus[5]['content'], corpus[7]['content'], corpus[280]['content']):
+        assert removed not in top(engine, removed, k=10)
+    assert new_id in engine.documents
+DOCUMENTS = [
+    {'type': 'question', 'content': 'How do you design a data pipeline?',
+     'metadata': {'category': 'technical', 'difficulty': 'Medium', 'skills': ['python']}},
+    {'type': 'question', 'content': 'Tell me about a conflict on your team.',
+     'metadata': {'category': 'behavioral', 'difficulty': 'Easy', 'skills': []}},
+    {'type': 'question', 'content': 'How would you scale a web service?',
+     'metadata': {'category': 'technical', 'difficulty': 'Hard', 'skills': ['kubernetes']}},
+    {'type': 'job_description', 'content': 'Data engineer building pipelines in Python.', 'metadata': {}},
+]
+
+def question(content, category='technical', skills=()):
+    return {'type': 'question', 'content': content,
+            'metadata': {'category': category, 'difficulty': 'Medium', 'skills': list(skills)}}
+
+@pytest.mark.parametrize('index_type', ['flat', 'hnsw'])
+def test_add_update_remove_keep_every_index_in_sync(index_type):
+    register_stub_backend()
+    engine = new_engine(DOCUMENTS, index_type=index_type)
+    assert engine.version == 1
+
+    ids = engine.add_documents([question('How do you tune a slow SQL query?', skills=['postgresql']),
+                                question('Describe mentoring a junior colleague.', 'behavioral')])
+    assert ids == [4, 5] and engine.version == 2
+    assert top(engine, 'tune a slow SQL query', k=1) == ['How do you tune a slow SQL query?']
+    assert top(engine, 'postgresql', k=1, mode='lexical') == ['How do you tune a slow SQL query?']
+    assert engine.document_ids(filters={'category': 'behavioral'}) == [1, 5]
+
+    # Metadata only: same id, nothing re-embedded, posting lists and BM25 follow
+    assert engine.update_document(5, question('Describe mentoring a junior colleague.', 'situational')) == 5
+    assert engine.version == 3
+    assert engine.document_ids(filters={'category': 'behavioral'}) == [1]
+    assert engine.document_ids(filters={'category': 'situational'}) == [5]
+
+    # New content: HNSW cannot delete vectors, so the document moves to a new id
+    new_id = engine.update_document(4, question('How do you index a large table?', skills=['sql']))
+    assert engine.version > 3
+    version = engine.version
+    if index_type == 'hnsw':
+        assert new_id == 6 and 4 not in engine.documents and engine._tombstones == {4}
+    else:
+        assert new_id == 4
+    assert engine.documents[new_id]['content'] == 'How do you index a large table?'
+    assert top(engine, 'index a large table', k=1) == ['How do you index a large table?']
+    assert 'How do you tune a slow SQL query?' not in top(engine, 'tune a slow SQL query', k=10)
+    assert top(engine, 'postgresql', k=5, mode='lexical') == []
+
+    engine.remove_document(0)
+    assert engine.version == version + 1
+    assert 0 not in engine.documents
+    assert 'How do you design a data pipeline?' not in top(engine, 'design a data pipeline', k=10)
+    assert 'How do you design a data pipeline?' not in top(engine, 'pipeline python', k=10, mode='hybrid')
+    assert engine.document_ids(doc_type='question') == sorted([1, 2, 5, new_id])
+    # Every live document is still found, and removed ones never count towards k
+    assert len(engine.retrieve('how', k=10)) == len(engine.documents)
+    with pytest.raises(KeyError):
+        engine.remove_document(0)
+    with pytest.raises(KeyError):
+        engine.update_document(0, DOCUMENTS[0])
+
+    engine.load_documents(DOCUMENTS)
+    assert engine._tombstones == set() and engine.document_ids() == [0, 1, 2, 3]
+
+def test_add_documents_to_an_empty_engine():
+    register_stub_backend()
+    engine = RAGEngine(backend='stub', cache_dir=None, knowledge_base=False)
+    assert engine.retrieve('anything') == []
+    assert engine.add_documents([]) == [] and engine.version == 0
+    assert engine.add_documents(DOCUMENTS[:2]) == [0, 1]
+    assert top(engine, 'conflict on your team', k=1) == ['Tell me about a conflict on your team.']
+@pytest.mark.parametrize('mode', ['dense', 'hybrid'])
+@pytest.mark.parametrize('index_type', ['flat', 'ivf_flat', 'hnsw'])
+def test_filtered_search_returns_k_matching_results(corpus, index_type, mode):
+    engine = new_engine(corpus, index_type=index_type, nlist=4, nprobe=4)
+    filters = {'category': 'technical', 'difficulty': 'Hard'}
+    matching = [doc['content'] for doc in corpus if doc['metadata'].items() >= filters.items()]
+    excluded = matching[:5]
+
+    results = engine.retrieve('design a pipeline with python', k=10, filters=filters, exclude=excluded, mode=mode)
+    assert len(results) == 10
+    assert all(result['document']['metadata'].items() >= filters.items() for result in results)
+    assert not {result['document']['content'] for result in results} & set(excluded)
+
+    # Fewer matches than k: every one of them comes back, once (HNSW is approximate and may miss a few)
+    everything = engine.retrieve('python', k=len(corpus), filters=filters, exclude=excluded, mode=mode)
+    contents = sorted(result['document']['content'] for result in everything)
+    expected = sorted(content for content in matching if content not in excluded)
+    if index_type == 'hnsw':
+        assert set(contents) <= set(expected) and len(contents) == len(set(contents))
+    else:
+        assert contents == expected
+
+def test_lexical_search_applies_filters_and_exclusions(corpus):
+    engine = new_engine(corpus)
+    excluded = [doc['content'] for doc in corpus if 'python' in doc['metadata']['skills']][:3]
+    results = engine.retrieve('python', k=20, filters={'category': 'behavioral'}, exclude=excluded, mode='lexical')
+    assert results
+    assert all(result['document']['metadata']['category'] == 'behavioral' for result in results)
+    assert not {result['document']['content'] for result in results} & set(excluded)
+
+def test_exclusions_and_tombstones_never_fill_k(corpus):
+    engine = new_engine(corpus[:40], index_type='hnsw')
+    for doc_id in range(5):
+        engine.remove_document(doc_id)
+    excluded = [corpus[doc_id]['content'] for doc_id in range(5, 10)]
+    expected = {doc['content'] for doc in corpus[10:40]}
+
+    results = engine.retrieve('how', k=100, exclude=excluded)
+    assert {result['document']['content'] for result in results} == expected
+    assert len(results) == len(engine.documents) - len(excluded)
+
+def test_no_matching_documents(corpus):
+    engine = new_engine(corpus[:40])
+    assert engine.retrieve('python', filters={'category': 'unknown'}) == []
+    assert engine.retrieve('python', doc_type='job_description') == []
+    technical = [doc['content'] for doc in corpus[:40] if doc['metadata']['category'] == 'technical']
+    for mode in ('dense', 'lexical', 'hybrid'):
+        assert engine.retrieve('python', filters={'category': 'technical'}, exclude=technical, mode=mode) == []
+@pytest.mark.parametrize('mode', ['dense', 'lexical', 'hybrid'])
+def test_retrieve_batch_matches_retrieve(corpus, mode):
+    engine = new_engine(corpus)
+    queries = ['python pipeline', 'kubernetes deployment incident', 'mentoring a new team', 'python pipeline']
+    options = {'k': 7, 'filters': {'difficulty': 'Easy'}, 'exclude': [corpus[0]['content']], 'mode': mode}
+    batch = engine.retrieve_batch(queries, **options)
+    assert len(batch) == len(queries)
+    for query, results in zip(queries, batch):
+        assert results == engine.retrieve(query, **options)
+
+def test_retrieve_batch_encodes_once(corpus, monkeypatch):
+    engine = new_engine(corpus)
+    calls = []
+    encode = engine.embedder.encode
+    monkeypatch.setattr(engine.embedder, 'encode', lambda texts: calls.append(list(texts)) or encode(texts))
+
+    engine.retrieve_batch(['aws security review', 'graphql schema release', 'aws security review'])
+    # One call, with repeated queries encoded once
+    assert calls == [['aws security review', 'graphql schema release']]
+    engine.retrieve_batch(['graphql schema release', 'terraform migration'])
+    assert calls[1:] == [['terraform migration']]
+    engine.retrieve_batch(['terraform migration'], mode='lexical')
+    assert len(calls) == 2
+def test_fuse_rankings():
+    a, b, c = ({'content': name} for name in 'abc')
+    fused = fuse_rankings([[{'document': a}, {'document': b}], [{'document': b}, {'document': c}]], rrf_k=1)
+    assert [result['document']['content'] for result in fused] == ['b', 'a', 'c']
+    assert [result['score'] for result in fused] == pytest.approx([1 / 3 + 1 / 2, 1 / 2, 1 / 3])
+
+def test_relevant_context_retrieves_every_chunk(monkeypatch):
+    register_stub_backend()
+    engine = new_engine(DOCUMENTS)
+    job_description = ' '.join(['We design data pipelines in Python.'] * 40 + ['Tell us about team conflict.'] * 5)
+    batches = []
+    retrieve_batch = engine.retrieve_batch
+    monkeypatch.setattr(engine, 'retrieve_batch', lambda queries, **kwargs: batches.append(queries)
+                        or retrieve_batch(queries, **kwargs))
+
+    context = engine.get_relevant_context(job_description, query='conflict', k=2, max_tokens=1000)
+    chunks = chunk_text(job_description)
+    assert len(chunks) > 1 and batches == [chunks + ['conflict']]
+    assert context.startswith("Job Description:\n" + job_description)
+    assert context.endswith("Similar Interview Questions:\n- How do you design a data pipeline?\n"
+                            "- Tell me about a conflict on your team.\n")
+
+def test_relevant_context_fits_the_token_budget():
+    register_stub_backend()
+    engine = new_engine(DOCUMENTS)
+    job_description = 'We design data pipelines in Python. ' * 100
+    context = engine.get_relevant_context(job_description, k=2, max_tokens=40)
+    assert len(context.split()) <= 40
+    # Questions are kept whole; the description is cut to what is left
+    assert "- How do you design a data pipeline?\n" in context and " ...\n" in context
+
+    # Too small for any question: only the (cut) description remains
+    context = engine.get_relevant_context(job_description, k=2, max_tokens=8)
+    assert len(context.split()) <= 8 and '- ' not in context
\ No newline at end of file
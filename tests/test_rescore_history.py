@@ -0,0 +1,67 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src import rescore_history as rescore
+from src.evaluator import ResponseEvaluator
+from utils.history_store import HistoryStore
+
+QUESTION = 'Describe a project you led.'
+RESPONSE = 'I led a team of 4 to migrate our reporting pipeline to Python, cutting runtime by 40%.'
+
+def write_history(path, count):
+    store = HistoryStore(str(path))
+    store.add_many([{
+        'timestamp': f"2024-01-01 10:{i:02d}:00",
+        'question': QUESTION,
+        'category': 'behavioral',
+        'response': RESPONSE,
+        'score': 50,
+        'feedback': {},
+    } for i in range(count)], 'session')
+    store.close()
+
+def test_rescores_into_parquet_parts_and_resumes(tmp_path):
+    history = tmp_path / 'history.db'
+    output = tmp_path / 'rescored'
+    write_history(history, 7)
+
+    assert rescore.rescore_history(str(history), str(output), chunk_size=3, workers=1) == 7
+    assert sorted(os.listdir(output)) == ['part-00000.parquet', 'part-00001.parquet', 'part-00002.parquet']
+    parts = pd.read_parquet(output)
+    assert len(parts) == 7
+    assert parts['previous_score'].eq(50).all()
+    # Parquet keeps the feedback lists as lists
+    expected = ResponseEvaluator().evaluate_response(QUESTION, RESPONSE)
+    assert list(parts['improvements'].iloc[0]) == expected['improvements']
+
+    # A rerun skips finished parts and rewrites only the missing one
+    os.remove(output / 'part-00001.parquet')
+    assert rescore.rescore_history(str(history), str(output), chunk_size=3, workers=1) == 3
+    assert len(os.listdir(output)) == 3
+
+def test_rescores_into_csv_parts(tmp_path):
+    history = tmp_path / 'history.db'
+    output = tmp_path / 'rescored'
+    write_history(history, 4)
+
+    assert rescore.rescore_history(str(history), str(output), chunk_size=3, workers=1, output_format='csv') == 4
+    assert sorted(os.listdir(output)) == ['part-00000.csv', 'part-00001.csv']
+    parts = pd.concat(pd.read_csv(output / name) for name in sorted(os.listdir(output)))
+    assert parts['previous_score'].eq(50).all()
+
+def test_failed_part_write_leaves_nothing_behind(tmp_path, monkeypatch):
+    frame = pd.DataFrame({'score': [1], 'strengths': [['a']], 'improvements': [['b', 'c']]})
+
+    def fail(self, *args, **kwargs):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(pd.DataFrame, 'to_csv', fail)
+    with pytest.raises(OSError):
+        rescore._write_part(frame, str(tmp_path / 'part-00000.csv'), 'csv')
+    assert os.listdir(tmp_path) == []
+
+    monkeypatch.undo()
+    rescore._write_part(frame, str(tmp_path / 'part-00000.csv'), 'csv')
+    assert pd.read_csv(tmp_path / 'part-00000.csv')['improvements'].tolist() == ['b; c']
\ No newline at end of file
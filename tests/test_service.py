@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.synthetic import register_stub_backend
+from src.rag_engine import RAGEngine
+from src.service import InterviewService
+
+JOB_CONTEXT = {'title': 'Data Engineer', 'description': 'Build data pipelines with Python and SQL.'}
+
+@pytest.fixture(scope='module')
+def service():
+    register_stub_backend()
+    engine = RAGEngine(backend='stub', cache_dir=None, knowledge_base=False)
+    engine.load_documents([
+        {'type': 'question', 'content': 'How do you design a data pipeline?',
+         'metadata': {'category': 'technical', 'difficulty': 'Medium', 'skills': ['python']}},
+        {'type': 'question', 'content': 'Tell me about a conflict on your team.',
+         'metadata': {'category': 'behavioral', 'difficulty': 'Easy', 'skills': []}},
+    ])
+    service = InterviewService(rag_engine=engine, evaluation_workers=1)
+    yield service
+    service.shutdown()
+
+def request(service, method, path, body=None):
+    """Send one request through the ASGI interface and return (status, decoded body)."""
+    messages = [{'type': 'http.request', 'body': json.dumps(body).encode('utf-8') if body is not None else b''}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(service({'type': 'http', 'method': method, 'path': path}, receive, send))
+    return sent[0]['status'], json.loads(sent[1]['body'])
+
+def test_retrieve(service):
+    status, body = request(service, 'POST', '/retrieve',
+                           {'query': 'data pipeline', 'k': 1, 'filters': {'category': 'technical'},
+                            'exclude': ['Tell me about a conflict on your team.'], 'mode': 'hybrid'})
+    assert status == 200
+    assert [r['document']['content'] for r in body['results']] == ['How do you design a data pipeline?']
+
+@pytest.mark.parametrize('body', [
+    {'query': 'data', 'k': 'five'},
+    {'query': 'data', 'k': 2.5},
+    {'query': 'data', 'k': True},
+    {'query': 'data', 'k': 0},
+    {'query': 'data', 'filters': ['category']},
+    {'query': 'data', 'filters': {'category': ['technical']}},
+    {'query': 'data', 'exclude': 'How do you design a data pipeline?'},
+    {'query': 'data', 'exclude': [1, 2]},
+    {'query': 'data', 'doc_type': 3},
+    {'query': 'data', 'mode': 'semantic'},
+    {'k': 3},
+])
+def test_retrieve_rejects_malformed_input(service, body):
+    status, payload = request(service, 'POST', '/retrieve', body)
+    assert status == 400
+    assert payload['error']
+
+def test_generate_question(service):
+    status, body = request(service, 'POST', '/generate-question',
+                           {'job_context': JOB_CONTEXT, 'history': [{'question': 'Something else?'}],
+                            'category': 'Technical'})
+    assert status == 200
+    assert body['question']
+
+@pytest.mark.parametrize('body', [
+    {},
+    {'job_context': 'Data Engineer'},
+    {'job_context': {'title': 'Data Engineer'}},
+    {'job_context': {'title': 'Data Engineer', 'description': ['Python']}},
+    {'job_context': JOB_CONTEXT, 'history': ['What is SQL?']},
+    {'job_context': JOB_CONTEXT, 'history': {'question': 'What is SQL?'}},
+    {'job_context': JOB_CONTEXT, 'category': ['technical']},
+])
+def test_generate_question_rejects_malformed_input(service, body):
+    status, _ = request(service, 'POST', '/generate-question', body)
+    assert status == 400
+
+def test_evaluate_rejects_malformed_input(service):
+    assert request(service, 'POST', '/evaluate', {'question': 'Why?'})[0] == 400
+    assert request(service, 'POST', '/evaluate', {'question': 'Why?', 'response': 'Because.',
+                                                  'job_context': 'Data Engineer'})[0] == 400
+
+def test_unknown_routes(service):
+    assert request(service, 'GET', '/missing')[0] == 404
+    assert request(service, 'GET', '/retrieve')[0] == 405
\ No newline at end of file
@@ -0,0 +1,66 @@
+import hashlib
+
+import pytest
+
+from utils.skill_matcher import SkillMatcher
+
+TAXONOMY = {
+    'java': [],
+    'javascript': ['js'],
+    'machine learning': ['ml'],
+    'machine learning operations': ['mlops'],
+    'learning': [],
+    'ruby': ['ruby on rails', 'rails'],
+    'on call': [],
+}
+
+@pytest.fixture
+def matcher():
+    return SkillMatcher(TAXONOMY)
+
+def test_matches_on_word_boundaries(matcher):
+    assert matcher.extract('JavaScript and Java') == ['javascript', 'java']
+    assert matcher.extract('javas javascripts') == []
+
+def test_aliases_map_to_canonical_names(matcher):
+    assert matcher.extract('Rails, JS and ML') == ['ruby', 'javascript', 'machine learning']
+
+def test_longest_match_wins(matcher):
+    assert matcher.extract('machine learning operations team') == ['machine learning operations']
+    assert matcher.extract('machine learning team') == ['machine learning']
+    # A longer phrase that does not complete falls back to the longest complete one
+    assert matcher.extract('machine learning operating') == ['machine learning']
+
+def test_overlapping_phrases_do_not_match_twice(matcher):
+    # "ruby on rails" is consumed whole, so the overlapping "on call" and "rails" do not match
+    assert matcher.extract('ruby on call rotation') == ['ruby', 'on call']
+    assert matcher.extract('ruby on rails on call') == ['ruby', 'on call']
+    # Matching restarts after a match, so "learning" inside "machine learning" is not reported
+    assert matcher.extract('machine learning and learning') == ['machine learning', 'learning']
+
+def test_skills_are_listed_once_in_order_of_first_mention(matcher):
+    assert matcher.extract('ml, java, machine learning, js, java') == ['machine learning', 'java', 'javascript']
+
+def test_results_are_cached_by_text_hash(matcher, monkeypatch):
+    text = 'Java and ML'
+    assert matcher.extract(text) == ['java', 'machine learning']
+    assert list(matcher._cache) == [hashlib.sha1(text.encode('utf-8')).hexdigest()]
+
+    def fail(tokens):
+        raise AssertionError('cached text matched again')
+
+    monkeypatch.setattr(matcher, '_match', fail)
+    skills = matcher.extract(text)
+    assert skills == ['java', 'machine learning']
+    # Callers get copies, so changing a result does not change the cache
+    skills.append('rust')
+    assert matcher.extract(text) == ['java', 'machine learning']
+
+def test_cache_evicts_least_recently_used():
+    matcher = SkillMatcher(TAXONOMY, cache_size=2)
+    key = lambda text: hashlib.sha1(text.encode('utf-8')).hexdigest()
+    matcher.extract('java')
+    matcher.extract('js')
+    matcher.extract('java')
+    matcher.extract('ml')
+    assert list(matcher._cache) == [key('java'), key('ml')]
\ No newline at end of file
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from src.index_benchmark import recall_latency_report, synthetic_embeddings
+from src.vector_index import build_index, describe_index
+
+@pytest.fixture(scope='module')
+def embeddings():
+    return synthetic_embeddings(2000, dimension=40, clusters=32)
+
+@pytest.mark.parametrize('index_type, options, expected', [
+    ('flat', {}, {'index_type': 'flat'}),
+    ('flat_fp16', {}, {'index_type': 'flat_fp16'}),
+    ('flat_int8', {}, {'index_type': 'flat_int8'}),
+    ('hnsw', {'hnsw_m': 16}, {'index_type': 'hnsw', 'hnsw_m': 16}),
+    ('ivf_flat', {'nlist': 20}, {'index_type': 'ivf_flat', 'nlist': 20}),
+    # nlist is lowered to 2000 // 39 lists; pq_m to a divisor of the dimension
+    ('ivf_flat', {'nlist': 1024}, {'index_type': 'ivf_flat', 'nlist': 51}),
+    ('ivf_pq', {'nlist': 1024, 'pq_m': 16}, {'index_type': 'ivf_pq', 'nlist': 51, 'pq_m': 10}),
+])
+def test_describe_index_reports_what_was_built(embeddings, index_type, options, expected):
+    assert describe_index(build_index(embeddings, index_type, **options)) == expected
+
+def test_too_few_vectors_fall_back_to_flat(embeddings):
+    assert describe_index(build_index(embeddings[:30], 'ivf_pq')) == {'index_type': 'flat'}
+
+def test_report_labels_use_built_parameters(embeddings):
+    configs = [{'index_type': 'ivf_flat', 'nlist': 1024, 'nprobe': 64}, {'index_type': 'ivf_pq', 'nprobe': 4}]
+    rows = recall_latency_report(embeddings[:100], embeddings[:5], configs, k=5)
+    assert [row['config'] for row in rows] == ['flat', 'ivf_flat nlist=2 nprobe=2', 'flat']
+    assert rows[2]['requested'] == configs[1]
+    assert np.isclose(rows[1]['recall'], 1.0)
\ No newline at end of file
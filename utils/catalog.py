@@ -0,0 +1,112 @@
+import json
+import os
+import threading
+from typing import Callable, Dict, Iterator, List
+
+from utils.skill_matcher import SkillMatcher
+
+JOB_DESCRIPTIONS_PATH = 'data/job_descriptions.json'
+QUESTION_BANK_PATH = 'data/question_bank.json'
+SKILLS_TAXONOMY_PATH = 'data/skills_taxonomy.json'
+# Written by src.ingest
+INGESTED_DOCUMENTS_PATH = 'data/ingested/documents.jsonl'
+INGEST_MANIFEST_PATH = 'data/ingested/manifest.json'
+
+# (path, builder name) -> (file stamp, built value)
+_cache: Dict[tuple, tuple] = {}
+_cache_lock = threading.Lock()
+
+def _memoized(path: str, build: Callable):
+    """Parse a JSON file and build a value from it, once per change of the file.
+
+    The file is identified by its modification time and size, so edits are
+    picked up on the next call. Returned values are shared: treat them as read-only.
+    """
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    key = (path, build.__name__)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+    with open(path, 'r') as f:
+        value = build(json.load(f))
+    with _cache_lock:
+        _cache[key] = (stamp, value)
+    return value
+
+class JobCatalog:
+    """Job description library with lookups by id and title."""
+
+    def __init__(self, jobs: List[Dict]):
+        self.jobs = jobs
+        self.titles = [jd['title'] for jd in jobs]
+        self.by_id = {jd['id']: jd for jd in jobs if 'id' in jd}
+        self.by_title = {}
+        for jd in jobs:
+            # Keep the first entry for duplicate titles, as a linear search would
+            self.by_title.setdefault(jd['title'], jd)
+
+def _build_job_catalog(data: List[Dict]) -> JobCatalog:
+    return JobCatalog(data)
+
+def _build_question_bank(data: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+    return data
+
+def load_job_catalog(path: str = JOB_DESCRIPTIONS_PATH) -> JobCatalog:
+    """Shared job description catalog, re-parsed only when the file changes."""
+    return _memoized(path, _build_job_catalog)
+
+def load_question_bank(path: str = QUESTION_BANK_PATH) -> Dict[str, List[Dict]]:
+    """Shared question bank by category, re-parsed only when the file changes."""
+    return _memoized(path, _build_question_bank)
+
+def _build_skill_matcher(data: Dict[str, List[str]]) -> SkillMatcher:
+    return SkillMatcher(data)
+
+def load_skill_matcher(path: str = SKILLS_TAXONOMY_PATH) -> SkillMatcher:
+    """Shared matcher for the skill taxonomy (canonical name -> aliases), recompiled when the file changes."""
+    return _memoized(path, _build_skill_matcher)
+
+def load_ingest_manifest(path: str = INGEST_MANIFEST_PATH) -> Dict[str, Dict]:
+    """Ingested files by absolute path: {'sha256', 'size', 'mtime_ns', 'chunks'}."""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def iter_ingested_documents(path: str = INGESTED_DOCUMENTS_PATH,
+                            manifest: Dict[str, Dict] = None) -> Iterator[Dict]:
+    """Stream ingested chunks, keeping only those of each file's current version.
+
+    Chunks of files that changed since they were ingested, and duplicates left by
+    an interrupted run, are skipped.
+    """
+    if manifest is None:
+        manifest = load_ingest_manifest()
+    seen = set()
+    try:
+        f = open(path, 'r', encoding='utf-8')
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            try:
+                doc = json.loads(line)
+            except ValueError:
+                # A line cut short by a crash mid-write
+                continue
+            metadata = doc['metadata']
+            entry = manifest.get(metadata['source'])
+            key = (metadata['source'], metadata['chunk'])
+            if entry is None or entry['sha256'] != metadata['source_hash'] or key in seen:
+                continue
+            seen.add(key)
+            yield doc
+
+def load_ingested_documents(path: str = INGESTED_DOCUMENTS_PATH,
+                            manifest_path: str = INGEST_MANIFEST_PATH) -> List[Dict]:
+    """Documents added with src.ingest, in the knowledge base document shape."""
+    return list(iter_ingested_documents(path, load_ingest_manifest(manifest_path)))
\ No newline at end of file
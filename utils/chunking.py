@@ -0,0 +1,34 @@
+import re
+from typing import List
+
+# Lowercased words, keeping symbols that belong to skill names (c++, c#, node.js)
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[+#]+|\.[a-z0-9]+)*")
+# MiniLM reads 256 word pieces. English averages about 1.3 pieces per word and
+# technical text (skill names, acronyms, versions) more, so 150 words leaves room
+CHUNK_WORDS = 150
+CHUNK_OVERLAP = 30
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+def chunk_text(text: str, max_words: int = CHUNK_WORDS, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """Split text into overlapping windows of at most max_words words.
+    
+    Word counts stand in for model tokens; the default keeps each chunk within
+    MiniLM's input, so no chunk is silently truncated when embedded.
+    Text of at most max_words words is returned as a single chunk.
+    """
+    if not 0 <= overlap < max_words:
+        raise ValueError("overlap must be at least 0 and smaller than max_words")
+    
+    words = text.split()
+    if len(words) <= max_words:
+        return [' '.join(words)] if words else []
+    
+    chunks = []
+    step = max_words - overlap
+    for start in range(0, len(words), step):
+        chunks.append(' '.join(words[start:start + max_words]))
+        if start + max_words >= len(words):
+            break
+    return chunks
\ No newline at end of file
@@ -0,0 +1,307 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager, suppress
+from typing import Callable, Dict, List, Optional
+
+import faiss
+import numpy as np
+
+from utils.metrics import metrics
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+def document_hash(text: str) -> str:
+    """Content address of a document's text."""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def _atomic_write(path: str, write: Callable) -> None:
+    """Write a file through a uniquely named temporary sibling so readers never see partial data."""
+    directory, name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory or '.', prefix=f".{name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+def _write_version(directory: str, prefix: str, suffix: str, write: Callable) -> str:
+    """Write a new, uniquely named file in directory and return its name.
+
+    Cache files are never rewritten in place: a manifest written afterwards
+    names the current version, so a reader always sees a matching set.
+    """
+    fd, path = tempfile.mkstemp(dir=directory, prefix=prefix, suffix=suffix)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+    except BaseException:
+        with suppress(OSError):
+            os.remove(path)
+        raise
+    return os.path.basename(path)
+
+@contextmanager
+def _exclusive_lock(path: str):
+    """Hold an exclusive lock on path, shared by all processes on the host, for the block."""
+    with open(path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            # Retries for about 10 seconds, then raises OSError
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _read_manifest(path: str) -> Dict:
+    try:
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError, OSError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+def read_index(path: str, mmap: bool = False):
+    """Read a serialized index, optionally memory-mapping its vectors instead of copying them.
+
+    A mapped index is backed by the page cache, so every process mapping the
+    same file shares one copy. It is read-only: take a writable_copy() (see
+    src.vector_index) before adding or removing vectors.
+    """
+    if not mmap:
+        return faiss.read_index(path)
+    # IO_FLAG_MMAP_IFC (FAISS 1.10+) also maps flat and HNSW storage; IO_FLAG_MMAP only maps IVF lists
+    return faiss.read_index(path, getattr(faiss, 'IO_FLAG_MMAP_IFC', faiss.IO_FLAG_MMAP))
+
+def supports_mmap(index) -> bool:
+    """Whether read_index(mmap=True) maps this index's vectors rather than copying them.
+
+    Before FAISS 1.10 only the inverted lists of IVF indexes can be mapped.
+    """
+    return hasattr(faiss, 'IO_FLAG_MMAP_IFC') or isinstance(faiss.downcast_index(index), faiss.IndexIVF)
+
+class EmbeddingCache:
+    """Content-addressed on-disk cache of normalized embeddings and FAISS indexes.
+
+    Rows are keyed by document hash inside a per-model directory, so only new or
+    changed documents need to be encoded after a restart. The matrix is read
+    on first use, so a process that starts from the cached index never holds it.
+
+    Each save writes new uniquely named data files and then replaces a small
+    manifest naming them (embeddings.json for the matrix and its hashes,
+    index.json for the index), so a crash or a concurrent writer never leaves
+    a matrix paired with the wrong hashes or an index with the wrong digest.
+    Saves from all processes sharing the directory are serialized by a lock
+    file, and an index already saved by another process is not written again.
+    Processes that mapped an older index keep reading its file; it is only
+    unlinked, which leaves existing mappings intact.
+    """
+
+    def __init__(self, model_name: str, cache_dir: str = 'data/.cache'):
+        self.model_name = model_name
+        self.directory = os.path.join(cache_dir, re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name))
+        self._manifest_path = os.path.join(self.directory, 'embeddings.json')
+        self._index_manifest_path = os.path.join(self.directory, 'index.json')
+        self._lock_path = os.path.join(self.directory, '.lock')
+        self._rows: Dict[str, np.ndarray] = {}
+        self._loaded = False
+        self._dirty = False
+
+    def _load(self):
+        """Read the cached embedding matrix, ignoring a missing or corrupt cache."""
+        if self._loaded:
+            return
+        self._loaded = True
+        manifest = _read_manifest(self._manifest_path)
+        try:
+            with open(os.path.join(self.directory, manifest['hashes']), 'r') as f:
+                hashes = json.load(f)
+            embeddings = np.load(os.path.join(self.directory, manifest['embeddings']))
+        except (KeyError, TypeError, ValueError, OSError):
+            return
+
+        if len(hashes) != len(embeddings):
+            print("Warning: Embedding cache is inconsistent, ignoring it")
+            return
+        self._rows = dict(zip(hashes, embeddings))
+
+    def __len__(self) -> int:
+        self._load()
+        return len(self._rows)
+
+    def embed(self, texts: List[str], hashes: List[str],
+              encode: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """Return normalized embeddings for texts, encoding only uncached ones."""
+        self._load()
+        missing = [i for i, h in enumerate(hashes) if h not in self._rows]
+        if missing:
+            # Deduplicate so identical documents are encoded once
+            unique = list(dict.fromkeys(hashes[i] for i in missing))
+            text_by_hash = {hashes[i]: texts[i] for i in missing}
+            new_embeddings = np.asarray(encode([text_by_hash[h] for h in unique]), dtype='float32')
+            faiss.normalize_L2(new_embeddings)
+            self._rows.update(zip(unique, new_embeddings))
+            self._dirty = True
+
+        if not hashes:
+            return np.zeros((0, 0), dtype='float32')
+        return np.vstack([self._rows[h] for h in hashes]).astype('float32')
+
+    def save(self, keep: Optional[List[str]] = None):
+        """Persist the embedding matrix, optionally pruning rows not in keep."""
+        self._load()
+        if keep is not None:
+            keep_set = set(keep)
+            stale = [h for h in self._rows if h not in keep_set]
+            for h in stale:
+                del self._rows[h]
+            self._dirty = self._dirty or bool(stale)
+
+        if not self._dirty or not self._rows:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        hashes = list(self._rows)
+        embeddings = np.vstack([self._rows[h] for h in hashes]).astype('float32')
+        with _exclusive_lock(self._lock_path):
+            previous = _read_manifest(self._manifest_path)
+            manifest = {
+                'embeddings': _write_version(self.directory, 'embeddings-', '.npy', lambda f: np.save(f, embeddings)),
+                'hashes': _write_version(self.directory, 'hashes-', '.json',
+                                         lambda f: f.write(json.dumps(hashes).encode('utf-8'))),
+            }
+            _atomic_write(self._manifest_path, lambda f: f.write(json.dumps(manifest).encode('utf-8')))
+            self._dirty = False
+            self._remove_superseded(('embeddings-', 'hashes-'), [manifest, previous])
+
+    def _remove_superseded(self, prefixes: tuple, manifests: List[Dict]):
+        """Delete data files starting with prefixes and named by none of manifests (the current and previous).
+
+        The previous version is kept for readers that read its manifest just
+        before it was replaced. Must be called with the lock file held, so no
+        other writer's unfinished file is taken for a stale one.
+        """
+        keep = {name for manifest in manifests for name in manifest.values() if isinstance(name, str)}
+        for name in os.listdir(self.directory):
+            if name.startswith(prefixes) and name not in keep:
+                # A file still open or mapped elsewhere cannot be deleted on Windows; a later save retries
+                with suppress(OSError):
+                    os.remove(os.path.join(self.directory, name))
+
+    @staticmethod
+    def _digest(hashes: List[str], signature: str) -> str:
+        return hashlib.sha1('\n'.join([signature] + list(hashes)).encode('utf-8')).hexdigest()
+
+    def load_index(self, hashes: List[str], signature: str = 'flat', mmap: bool = False):
+        """Return the serialized index if it was built from exactly these documents.
+
+        With mmap the index's vectors stay in the file, shared by every process on the host.
+        """
+        manifest = _read_manifest(self._index_manifest_path)
+        if manifest.get('digest') != self._digest(hashes, signature) or not manifest.get('index'):
+            return None
+        try:
+            return read_index(os.path.join(self.directory, manifest['index']), mmap=mmap)
+        except (ValueError, RuntimeError):
+            return None
+
+    def save_index(self, index, hashes: List[str], signature: str = 'flat'):
+        """Serialize an index together with the digest of the documents it holds."""
+        os.makedirs(self.directory, exist_ok=True)
+        digest = self._digest(hashes, signature)
+        try:
+            with _exclusive_lock(self._lock_path):
+                previous = _read_manifest(self._index_manifest_path)
+                if previous.get('digest') == digest and os.path.exists(
+                        os.path.join(self.directory, str(previous.get('index')))):
+                    # Another process built the same index first; keep its file, which others may have mapped
+                    return
+                # A new file, so processes mapping the previous index keep reading it undisturbed
+                name = _write_version(self.directory, 'index-', '.faiss',
+                                      lambda f: f.write(faiss.serialize_index(index).tobytes()))
+                manifest = {'digest': digest, 'count': len(hashes), 'index': name}
+                _atomic_write(self._index_manifest_path,
+                              lambda f: f.write(json.dumps(manifest).encode('utf-8')))
+                self._remove_superseded(('index-',), [manifest, previous])
+        except OSError as e:
+            print(f"Warning: Could not save index cache - {e}")
+
+class QueryEmbeddingCache:
+    """Bounded, thread-safe LRU cache of normalized query embeddings.
+
+    Entries are keyed by (model name, text) so engines with different models
+    can share one cache. The hits and misses of all live caches are exported
+    as the query_cache_hits/query_cache_misses metrics.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        _query_caches.add(self)
+
+    def get(self, model_name: str, text: str) -> Optional[np.ndarray]:
+        key = (model_name, text)
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, model_name: str, text: str, embedding: np.ndarray):
+        # Cached vectors are shared between callers, so make them read-only
+        embedding = np.array(embedding, dtype='float32')
+        embedding.setflags(write=False)
+        with self._lock:
+            self._entries[(model_name, text)] = embedding
+            self._entries.move_to_end((model_name, text))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+# Query caches that are still in use, read by the metrics registry on export
+_query_caches = weakref.WeakSet()
+
+def _query_cache_counters() -> Dict[str, int]:
+    hits = misses = 0
+    for cache in list(_query_caches):
+        stats = cache.stats()
+        hits += stats['hits']
+        misses += stats['misses']
+    return {'query_cache_hits': hits, 'query_cache_misses': misses}
+
+metrics.add_collector(_query_cache_counters)
\ No newline at end of file
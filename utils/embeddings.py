@@ -1,18 +1,236 @@
-from sentence_transformers import SentenceTransformer
 import numpy as np
-from typing import List
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Union
 
-class EmbeddingManager:
-    """Manage text embeddings for RAG system."""
+from utils.metrics import metrics
+
+# Heavy libraries (torch, sentence_transformers, scikit-learn, onnxruntime) are
+# imported by each backend on first use so importing this module stays cheap.
+
+class BaseEmbedder:
+    """Interface for text embedding backends."""
+    
+    # Identifies the backend and model in caches; embeddings from different names are not comparable
+    name = 'base'
+    
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Return a (len(texts), dimension) embedding matrix."""
+        raise NotImplementedError
+
+class SentenceTransformerEmbedder(BaseEmbedder):
+    """Sentence Transformers model, loaded on first encode."""
     
     def __init__(self, model_name='all-MiniLM-L6-v2'):
-        self.model = SentenceTransformer(model_name)
+        self.name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+    
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.name)
+        return np.asarray(self._model.encode(texts))
+
+class HashingEmbedder(BaseEmbedder):
+    """Hashed character n-gram vectors built with scikit-learn.
+    
+    Needs no model download, so it works offline and starts in milliseconds.
+    Term frequencies are log-scaled instead of IDF-weighted so that a
+    document's vector does not change when the corpus does.
+    """
+    
+    def __init__(self, n_features: int = 1024, ngram_min: int = 3, ngram_max: int = 5):
+        self.name = f"hashing-char{ngram_min}-{ngram_max}-{n_features}"
+        self.n_features = n_features
+        self.ngram_range = (ngram_min, ngram_max)
+        self._vectorizer = None
+    
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import HashingVectorizer
+            self._vectorizer = HashingVectorizer(
+                analyzer='char_wb', ngram_range=self.ngram_range, n_features=self.n_features,
+                alternate_sign=False, norm=None
+            )
+        counts = self._vectorizer.transform(texts)
+        counts.data = np.log1p(counts.data)
+        return counts.toarray().astype('float32')
+
+class OnnxEmbedder(BaseEmbedder):
+    """Sentence embeddings from an exported (optionally quantized) ONNX model.
+    
+    model_dir holds the ONNX file and the tokenizer.json produced by exporting
+    a Sentence Transformers model, e.g. with Hugging Face Optimum.
+    """
+    
+    def __init__(self, model_dir: str, file_name: str = 'model.onnx', max_length: int = 256):
+        self.name = f"onnx-{os.path.basename(os.path.normpath(model_dir))}-{os.path.splitext(file_name)[0]}"
+        self.model_path = os.path.join(model_dir, file_name)
+        self.tokenizer_path = os.path.join(model_dir, 'tokenizer.json')
+        self.max_length = max_length
+        self._session = None
+        self._tokenizer = None
+        self._lock = threading.Lock()
+    
+    def _load(self):
+        import onnxruntime
+        from tokenizers import Tokenizer
+        
+        tokenizer = Tokenizer.from_file(self.tokenizer_path)
+        tokenizer.enable_truncation(max_length=self.max_length)
+        tokenizer.enable_padding()
+        self._session = onnxruntime.InferenceSession(self.model_path, providers=['CPUExecutionProvider'])
+        self._tokenizer = tokenizer
+    
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._load()
+        
+        encodings = self._tokenizer.encode_batch(texts)
+        features = {
+            'input_ids': np.array([e.ids for e in encodings], dtype='int64'),
+            'attention_mask': np.array([e.attention_mask for e in encodings], dtype='int64'),
+            'token_type_ids': np.array([e.type_ids for e in encodings], dtype='int64'),
+        }
+        input_names = {i.name for i in self._session.get_inputs()}
+        token_embeddings = self._session.run(None, {k: v for k, v in features.items() if k in input_names})[0]
+        
+        # Mean pooling over non-padding tokens, as Sentence Transformers does
+        mask = features['attention_mask'][:, :, None].astype('float32')
+        return (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+EMBEDDER_BACKENDS = {
+    'sentence-transformers': lambda model_name, **options: SentenceTransformerEmbedder(model_name, **options),
+    'hashing': lambda model_name, **options: HashingEmbedder(**options),
+    'onnx': lambda model_name, **options: OnnxEmbedder(model_name, **options),
+}
+
+def create_embedder(backend='sentence-transformers', model_name='all-MiniLM-L6-v2', **options) -> BaseEmbedder:
+    """Instantiate an embedding backend by name. For 'onnx', model_name is the model directory."""
+    if backend not in EMBEDDER_BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend} (expected one of {', '.join(EMBEDDER_BACKENDS)})")
+    return EMBEDDER_BACKENDS[backend](model_name, **options)
+
+class _EncodeRequest:
+    """A pending encode call waiting to be coalesced into a batch."""
+    
+    __slots__ = ('texts', 'result', 'error', 'done')
+    
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+class EmbeddingProvider:
+    """Process-wide embedding backend shared by every component using it.
+    
+    With a batch window, encode calls arriving from different threads within
+    that window are coalesced into a single forward pass.
+    """
+    
+    def __init__(self, embedder: BaseEmbedder, batch_window_ms: float = 0, max_batch_size: int = 64):
+        self.embedder = embedder
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._worker_lock = threading.Lock()
+        self._requests = queue.Queue()
+        self._worker = None
+    
+    @property
+    def name(self) -> str:
+        return self.embedder.name
     
     def encode(self, texts: Union[str, List[str]]) -> np.ndarray:
         """Generate embeddings for text(s)."""
         if isinstance(texts, str):
             texts = [texts]
-        return self.model.encode(texts)
+        if self.batch_window <= 0 or not texts:
+            with metrics.span('embedding_encode'):
+                return np.asarray(self.embedder.encode(texts))
+        
+        request = _EncodeRequest(list(texts))
+        self._ensure_worker()
+        # Includes the wait for the batch window and for other callers' texts
+        with metrics.span('embedding_encode'):
+            self._requests.put(request)
+            request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+    
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._worker_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run_batches, name='embedding-batcher', daemon=True)
+                    self._worker.start()
+    
+    def _run_batches(self):
+        """Collect requests for up to one batch window and encode them together."""
+        while True:
+            batch = [self._requests.get()]
+            size = len(batch[0].texts)
+            deadline = time.monotonic() + self.batch_window
+            while size < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._requests.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                size += len(request.texts)
+            
+            try:
+                embeddings = np.asarray(self.embedder.encode([text for r in batch for text in r.texts]))
+                offset = 0
+                for request in batch:
+                    request.result = embeddings[offset:offset + len(request.texts)]
+                    offset += len(request.texts)
+            except Exception as e:
+                for request in batch:
+                    request.error = e
+            
+            for request in batch:
+                request.done.set()
+
+_providers: Dict[tuple, EmbeddingProvider] = {}
+_providers_lock = threading.Lock()
+
+def get_embedding_provider(model_name='all-MiniLM-L6-v2', backend='sentence-transformers',
+                           batch_window_ms: float = None, **options) -> EmbeddingProvider:
+    """Return the shared provider for a backend and model, creating it on first request.
+    
+    Passing batch_window_ms enables (or retunes) micro-batching on the provider.
+    Extra options are passed to the backend constructor.
+    """
+    key = (backend, model_name, tuple(sorted(options.items())))
+    with _providers_lock:
+        provider = _providers.get(key)
+        if provider is None:
+            provider = _providers[key] = EmbeddingProvider(create_embedder(backend, model_name, **options))
+        if batch_window_ms is not None:
+            provider.batch_window = batch_window_ms / 1000
+        return provider
+
+class EmbeddingManager:
+    """Manage text embeddings for RAG system."""
+    
+    def __init__(self, model_name='all-MiniLM-L6-v2', backend='sentence-transformers'):
+        self.provider = get_embedding_provider(model_name, backend)
+    
+    def encode(self, texts: Union[str, List[str]]) -> np.ndarray:
+        """Generate embeddings for text(s)."""
+        return self.provider.encode(texts)
     
     def cosine_similarity(self, emb1: np.ndarray, emb2: np.ndarray) -> float:
         """Calculate cosine similarity between two embeddings."""
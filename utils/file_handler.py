@@ -1,40 +1,144 @@
 import PyPDF2
 import docx
-from typing import Union
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator, List, Union
+import hashlib
 import io
+import os
+import tempfile
+import threading
+
+# PDFs with at least this many pages are extracted in a process pool
+PARALLEL_PAGE_THRESHOLD = 32
+PAGES_PER_TASK = 8
+# Extracted texts kept in memory, keyed by content hash
+TEXT_CACHE_SIZE = 32
+
+_text_cache = OrderedDict()
+_text_cache_lock = threading.Lock()
+
+# One pool for all large PDFs, shared by every caller and thread; created on first use
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+# (content hash, reader) of the last PDF opened in a pool worker, so each worker reads a file once
+_worker_pdf = None
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        return _pdf_pool
+
+def _discard_pdf_pool(pool: ProcessPoolExecutor):
+    """Drop a pool whose worker died, so the next call starts a fresh one."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is pool:
+            _pdf_pool = None
+    pool.shutdown(wait=False)
+
+def _extract_page_range(key: str, path: str, start: int, stop: int) -> List[str]:
+    global _worker_pdf
+    if _worker_pdf is None or _worker_pdf[0] != key:
+        with open(path, 'rb') as f:
+            _worker_pdf = (key, PyPDF2.PdfReader(io.BytesIO(f.read())))
+    pages = _worker_pdf[1].pages
+    return [pages[i].extract_text() for i in range(start, stop)]
 
 class FileHandler:
     """Handle file uploads and text extraction."""
     
+    @staticmethod
+    def _file_type(file) -> str:
+        return file.name.split('.')[-1].lower()
+    
+    @staticmethod
+    def _read_bytes(file) -> bytes:
+        # Streamlit uploads are BytesIO objects; getvalue() works regardless of read position
+        return file.getvalue() if hasattr(file, 'getvalue') else file.read()
+    
     @staticmethod
     def extract_text(file) -> str:
-        """Extract text from uploaded file (PDF, TXT, DOCX)."""
-        file_type = file.name.split('.')[-1].lower()
+        """Extract text from uploaded file (PDF, TXT, DOCX).
+        
+        Results are cached by content hash, so extracting the same upload again
+        (e.g. on a Streamlit rerun) is only a hash of its bytes.
+        """
+        file_type = FileHandler._file_type(file)
         
         try:
-            if file_type == 'pdf':
-                return FileHandler._extract_from_pdf(file)
-            elif file_type == 'txt':
-                return file.read().decode('utf-8')
-            elif file_type == 'docx':
-                return FileHandler._extract_from_docx(file)
-            else:
-                raise ValueError(f"Unsupported file type: {file_type}")
+            data = FileHandler._read_bytes(file)
+            key = hashlib.sha256(file_type.encode('utf-8') + b'\0' + data).hexdigest()
+            with _text_cache_lock:
+                if key in _text_cache:
+                    _text_cache.move_to_end(key)
+                    return _text_cache[key]
+            
+            separator = "\n" if file_type == 'docx' else ""
+            text = separator.join(FileHandler._iter_bytes(data, file_type))
+            
+            with _text_cache_lock:
+                _text_cache[key] = text
+                while len(_text_cache) > TEXT_CACHE_SIZE:
+                    _text_cache.popitem(last=False)
+            return text
         except Exception as e:
             raise Exception(f"Error extracting text: {str(e)}")
     
     @staticmethod
-    def _extract_from_pdf(file) -> str:
-        """Extract text from PDF file."""
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(file.read()))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-        return text
+    def iter_text(file, parallel: bool = True) -> Iterator[str]:
+        """Yield text incrementally: one item per PDF page or DOCX paragraph.
+        
+        parallel=False keeps large PDFs in the calling process, e.g. inside a worker.
+        """
+        return FileHandler._iter_bytes(FileHandler._read_bytes(file), FileHandler._file_type(file), parallel)
+    
+    @staticmethod
+    def _iter_bytes(data: bytes, file_type: str, parallel: bool = True) -> Iterator[str]:
+        if file_type == 'pdf':
+            return FileHandler._iter_pdf_pages(data, parallel)
+        elif file_type == 'txt':
+            return iter([data.decode('utf-8')])
+        elif file_type == 'docx':
+            return FileHandler._iter_docx_paragraphs(data)
+        else:
+            raise ValueError(f"Unsupported file type: {file_type}")
+    
+    @staticmethod
+    def _iter_pdf_pages(data: bytes, parallel: bool = True) -> Iterator[str]:
+        """Yield the text of each PDF page in order, in parallel for large PDFs."""
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+        page_count = len(pdf_reader.pages)
+        
+        if not parallel or page_count < PARALLEL_PAGE_THRESHOLD:
+            for page in pdf_reader.pages:
+                yield page.extract_text()
+            return
+        
+        # Workers read the PDF from a temporary file, so its bytes are not sent with every task
+        key = hashlib.sha256(data).hexdigest()
+        fd, path = tempfile.mkstemp(suffix='.pdf')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            starts = range(0, page_count, PAGES_PER_TASK)
+            stops = [min(start + PAGES_PER_TASK, page_count) for start in starts]
+            pool = _get_pdf_pool()
+            try:
+                for pages in pool.map(_extract_page_range, [key] * len(starts), [path] * len(starts), starts, stops):
+                    yield from pages
+            except BrokenProcessPool:
+                _discard_pdf_pool(pool)
+                raise
+        finally:
+            os.remove(path)
     
     @staticmethod
-    def _extract_from_docx(file) -> str:
-        """Extract text from DOCX file."""
-        doc = docx.Document(io.BytesIO(file.read()))
-        text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        return text
\ No newline at end of file
+    def _iter_docx_paragraphs(data: bytes) -> Iterator[str]:
+        doc = docx.Document(io.BytesIO(data))
+        for paragraph in doc.paragraphs:
+            yield paragraph.text
\ No newline at end of file
@@ -0,0 +1,199 @@
+import ast
+import csv
+import sqlite3
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    question TEXT NOT NULL,
+    category TEXT NOT NULL,
+    response TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    overall_assessment TEXT,
+    reasoning TEXT,
+    follow_up TEXT
+);
+CREATE TABLE IF NOT EXISTS feedback_items (
+    answer_id INTEGER NOT NULL REFERENCES answers(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL CHECK (kind IN ('strength', 'improvement')),
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_answers_session_timestamp ON answers(session_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_answers_timestamp ON answers(timestamp);
+CREATE INDEX IF NOT EXISTS idx_answers_category_score ON answers(category, score);
+CREATE INDEX IF NOT EXISTS idx_answers_score ON answers(score);
+CREATE INDEX IF NOT EXISTS idx_feedback_answer ON feedback_items(answer_id);
+CREATE INDEX IF NOT EXISTS idx_feedback_kind_text ON feedback_items(kind, text);
+"""
+
+ORDERINGS = {
+    'Most Recent': 'timestamp DESC, id DESC',
+    'Oldest First': 'timestamp ASC, id ASC',
+    'Highest Score': 'score DESC, id DESC',
+    'Lowest Score': 'score ASC, id ASC',
+}
+
+# SQLite's default limit on bound parameters per statement
+_MAX_PARAMS = 999
+
+class HistoryStore:
+    """Interview history in a local SQLite database (WAL mode).
+
+    Entries have the same shape as the app's session history:
+    {'timestamp', 'question', 'category', 'response', 'score', 'feedback'}, where
+    feedback is the evaluator output. Strengths and improvements are stored
+    as rows so they can be aggregated with indexed queries.
+    """
+
+    def __init__(self, path: str = 'data/user_history.db', batch_size: int = 1):
+        self.path = path
+        # Entries are buffered and written in one transaction once batch_size is reached
+        self.batch_size = batch_size
+        self._pending: List[Tuple[str, Dict]] = []
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+
+    def add(self, entry: Dict, session_id: str):
+        """Record an answered question, flushing once the batch is full."""
+        self.add_many([entry], session_id)
+
+    def add_many(self, entries: List[Dict], session_id: str):
+        with self._lock:
+            self._pending.extend((session_id, entry) for entry in entries)
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self):
+        """Write all buffered entries in a single transaction."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        with self._conn:
+            for session_id, entry in self._pending:
+                feedback = entry.get('feedback') or {}
+                cursor = self._conn.execute(
+                    "INSERT INTO answers (session_id, timestamp, question, category, response, score, "
+                    "overall_assessment, reasoning, follow_up) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (session_id, entry['timestamp'], entry['question'], entry.get('category', 'General'),
+                     entry['response'], int(entry['score']), feedback.get('overall_assessment'),
+                     feedback.get('reasoning'), feedback.get('follow_up'))
+                )
+                items = [(cursor.lastrowid, 'strength', i, text)
+                         for i, text in enumerate(feedback.get('strengths', []))]
+                items += [(cursor.lastrowid, 'improvement', i, text)
+                          for i, text in enumerate(feedback.get('improvements', []))]
+                self._conn.executemany(
+                    "INSERT INTO feedback_items (answer_id, kind, position, text) VALUES (?, ?, ?, ?)", items
+                )
+        self._pending = []
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+    @staticmethod
+    def _where(session_id: Optional[str], category: Optional[str] = None) -> Tuple[str, list]:
+        clauses, params = [], []
+        if session_id is not None:
+            clauses.append("session_id = ?")
+            params.append(session_id)
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _query(self, sql: str, params=()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def history(self, session_id: str = None, category: str = None,
+                order: str = 'Most Recent', limit: int = None) -> List[Dict]:
+        """Return entries in the session history shape, filtered and sorted in SQL."""
+        where, params = self._where(session_id, category)
+        sql = f"SELECT * FROM answers{where} ORDER BY {ORDERINGS[order]}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        rows = self._query(sql, params)
+
+        # Attach strengths and improvements with one indexed lookup per chunk of answers
+        items: Dict[int, Dict[str, List[str]]] = {row['id']: {'strength': [], 'improvement': []} for row in rows}
+        ids = list(items)
+        for start in range(0, len(ids), _MAX_PARAMS):
+            chunk = ids[start:start + _MAX_PARAMS]
+            for item in self._query(
+                f"SELECT answer_id, kind, text FROM feedback_items WHERE answer_id IN "
+                f"({','.join('?' * len(chunk))}) ORDER BY answer_id, kind, position", chunk
+            ):
+                items[item['answer_id']][item['kind']].append(item['text'])
+
+        entries = []
+        for row in rows:
+            feedback = {
+                'score': row['score'],
+                'strengths': items[row['id']]['strength'],
+                'improvements': items[row['id']]['improvement'],
+                'reasoning': row['reasoning'],
+                'overall_assessment': row['overall_assessment'],
+            }
+            if row['follow_up'] is not None:
+                feedback['follow_up'] = row['follow_up']
+            entries.append({
+                'timestamp': row['timestamp'],
+                'question': row['question'],
+                'category': row['category'],
+                'response': row['response'],
+                'score': row['score'],
+                'feedback': feedback,
+            })
+        return entries
+
+    def categories(self, session_id: str = None) -> List[str]:
+        where, params = self._where(session_id)
+        return [row[0] for row in self._query(f"SELECT DISTINCT category FROM answers{where} ORDER BY category", params)]
+
+    def iter_answers(self, chunk_size: int = 5000) -> Iterator[List[Dict]]:
+        """Yield all answers in id order, chunk_size rows at a time (keyset pagination)."""
+        last_id = 0
+        while True:
+            rows = self._query(
+                "SELECT id, timestamp, question, category, response, score FROM answers "
+                "WHERE id > ? ORDER BY id LIMIT ?", (last_id, chunk_size)
+            )
+            if not rows:
+                return
+            last_id = rows[-1]['id']
+            yield [dict(row) for row in rows]
+
+    def import_csv(self, csv_path: str, session_id: str = 'imported') -> int:
+        """Import a legacy user_history.csv, whose feedback column is a stringified dict."""
+        count = 0
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            batch = []
+            for row in csv.DictReader(f):
+                try:
+                    row['feedback'] = ast.literal_eval(row.get('feedback') or '{}')
+                except (ValueError, SyntaxError):
+                    row['feedback'] = {}
+                batch.append(row)
+                if len(batch) >= 1000:
+                    count += len(batch)
+                    self.add_many(batch, session_id)
+                    batch = []
+            count += len(batch)
+            self.add_many(batch, session_id)
+        self.flush()
+        return count
\ No newline at end of file
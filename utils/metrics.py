@@ -0,0 +1,267 @@
+"""Timing spans, counters and histograms for the interview pipeline.
+
+Disabled unless INTERVIEW_METRICS=1 (or metrics.enable() is called); while
+disabled every hook returns immediately, so instrumented code pays only a
+function call. Set INTERVIEW_METRICS_FILE to a .json or .prom path to have
+export() write a JSON snapshot or Prometheus text there.
+
+    with metrics.span('index_search'):
+        ...
+    metrics.increment('question_pool_misses')
+
+    with metrics.trace() as spans:      # this thread's spans, e.g. one turn
+        ...
+"""
+
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, suppress
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Prefix of every exported metric name
+NAMESPACE = 'interview'
+# Histogram bucket upper bounds in seconds (Prometheus default buckets plus sub-millisecond ones)
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+class _Histogram:
+    __slots__ = ('counts', 'count', 'sum')
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * buckets
+        self.count = 0
+        self.sum = 0.0
+
+class _NullSpan:
+    """Returned by span() while metrics are disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ('metrics', 'name', 'labels', 'start')
+
+    def __init__(self, metrics: 'Metrics', name: str, labels: tuple):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics._record(self.name, self.labels, time.perf_counter() - self.start, True)
+        return False
+
+class Metrics:
+    """Thread-safe in-process metrics registry.
+
+    Spans record their duration into a histogram named after the span and,
+    when the calling thread is inside trace(), into that trace as well.
+    """
+
+    def __init__(self, enabled: bool = False, path: Optional[str] = None, buckets: tuple = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.path = path
+        self.buckets = tuple(buckets)
+        self._counters: Dict[tuple, float] = defaultdict(float)
+        self._histograms: Dict[tuple, _Histogram] = {}
+        self._collectors: List[Callable[[], Dict[str, float]]] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def enable(self, enabled: bool = True, path: Optional[str] = None):
+        self.enabled = enabled
+        if path is not None:
+            self.path = path
+
+    def span(self, name: str, **labels):
+        """Context manager timing its block into the histogram name."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, tuple(sorted(labels.items())))
+
+    def timed(self, name: str):
+        """Decorator timing every call of a function as a span."""
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with _Span(self, name, ()):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def increment(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += value
+
+    def add_collector(self, collect: Callable[[], Dict[str, float]]):
+        """Report counters a component already keeps, instead of counting them twice.
+
+        collect() returns {name: value} and is called on every snapshot; its
+        values are not cleared by reset().
+        """
+        with self._lock:
+            self._collectors.append(collect)
+
+    def observe(self, name: str, value: float, **labels):
+        """Record a value (in seconds, for the default buckets) into a histogram."""
+        if not self.enabled:
+            return
+        self._record(name, tuple(sorted(labels.items())), value, False)
+
+    def _record(self, name: str, labels: tuple, value: float, is_span: bool):
+        key = (name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(len(self.buckets))
+            histogram.count += 1
+            histogram.sum += value
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram.counts[i] += 1
+                    break
+        spans = getattr(self._local, 'spans', None)
+        if is_span and spans is not None:
+            spans.append((name, value))
+
+    @contextmanager
+    def trace(self):
+        """Collect (name, seconds) for the spans this thread finishes inside the block.
+
+        Nested spans are all listed, inner ones first. Yields an empty list
+        while metrics are disabled.
+        """
+        outer = getattr(self._local, 'spans', None)
+        spans: List[Tuple[str, float]] = []
+        self._local.spans = spans
+        try:
+            yield spans
+        finally:
+            self._local.spans = outer
+            if outer is not None:
+                outer.extend(spans)
+
+    def call_traced(self, function, *args, **kwargs) -> tuple:
+        """Run function and return (result, spans), e.g. as an executor task."""
+        with self.trace() as spans:
+            result = function(*args, **kwargs)
+        return result, spans
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict:
+        """Counters and histograms (cumulative bucket counts) as plain JSON data."""
+        with self._lock:
+            counted = dict(self._counters)
+            collectors = list(self._collectors)
+        # Collectors take their own locks, so they are called outside this one
+        for collect in collectors:
+            for name, value in collect().items():
+                counted[(name, ())] = counted.get((name, ()), 0) + value
+        counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(counted.items())]
+        with self._lock:
+            histograms = []
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                cumulative, total = [], 0
+                for count in histogram.counts:
+                    total += count
+                    cumulative.append(total)
+                histograms.append({'name': name, 'labels': dict(labels), 'count': histogram.count,
+                                   'sum': histogram.sum, 'buckets': dict(zip(map(str, self.buckets), cumulative))})
+        return {'timestamp': time.time(), 'counters': counters, 'histograms': histograms}
+
+    def prometheus_text(self) -> str:
+        """The snapshot in the Prometheus text exposition format."""
+        def label_text(labels: Dict, extra: str = '') -> str:
+            parts = []
+            for key, value in labels.items():
+                value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+                parts.append(f'{key}="{value}"')
+            if extra:
+                parts.append(extra)
+            return '{' + ','.join(parts) + '}' if parts else ''
+
+        snapshot = self.snapshot()
+        lines = []
+        typed = set()
+        for counter in snapshot['counters']:
+            name = f"{NAMESPACE}_{counter['name']}_total"
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{label_text(counter['labels'])} {counter['value']:g}")
+        for histogram in snapshot['histograms']:
+            name = f"{NAMESPACE}_{histogram['name']}_seconds"
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} histogram")
+            bounds = list(histogram['buckets'].items()) + [('+Inf', histogram['count'])]
+            for bound, count in bounds:
+                le = 'le="%s"' % bound
+                lines.append(f"{name}_bucket{label_text(histogram['labels'], le)} {count}")
+            lines.append(f"{name}_sum{label_text(histogram['labels'])} {histogram['sum']:.9g}")
+            lines.append(f"{name}_count{label_text(histogram['labels'])} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: Optional[str] = None):
+        """Write the metrics to path (default: the configured file); .prom/.txt for Prometheus text, else JSON."""
+        path = path or self.path
+        if not self.enabled or not path:
+            return
+        if path.endswith(('.prom', '.txt')):
+            content = self.prometheus_text()
+        else:
+            content = json.dumps(self.snapshot(), indent=2)
+        directory, name = os.path.split(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Written to a uniquely named temporary file and renamed, so scrapers never read
+        # a partial file and concurrent exports (one per Streamlit session) do not collide
+        fd, temporary = tempfile.mkstemp(dir=directory or '.', prefix=f".{name}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(content)
+            # mkstemp files are private; scrapers may run as another user
+            os.chmod(temporary, 0o644)
+            os.replace(temporary, path)
+        except BaseException:
+            with suppress(OSError):
+                os.remove(temporary)
+            raise
+
+def summarize_spans(spans: List[Tuple[str, float]]) -> List[Dict]:
+    """Per-stage call counts and total milliseconds, in order of first completion."""
+    stages: Dict[str, Dict] = {}
+    for name, seconds in spans:
+        stage = stages.setdefault(name, {'stage': name, 'calls': 0, 'ms': 0.0})
+        stage['calls'] += 1
+        stage['ms'] += seconds * 1000
+    return list(stages.values())
+
+# Process-wide registry used by all instrumented components
+metrics = Metrics(enabled=_env_flag('INTERVIEW_METRICS'), path=os.environ.get('INTERVIEW_METRICS_FILE') or None)
\ No newline at end of file
@@ -0,0 +1,76 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List
+
+from utils.chunking import tokenize
+
+# Trie key marking the end of a phrase; tokens never contain spaces
+_END = ' '
+
+class SkillMatcher:
+    """Extract canonical skills from text with a token trie compiled from a taxonomy.
+
+    The taxonomy maps canonical skill names to aliases. Every name and alias is
+    tokenized and inserted into one trie, so matches always fall on word
+    boundaries ("java" never matches inside "javascript"). Aliases normalize to
+    their canonical name. Extraction walks the text once and takes the longest
+    match at each position, so its cost grows with the text, not the taxonomy.
+    """
+
+    def __init__(self, taxonomy: Dict[str, List[str]], cache_size: int = 256):
+        self.taxonomy = taxonomy
+        self._trie: Dict = {}
+        self._max_phrase_length = 0
+        for canonical, aliases in taxonomy.items():
+            for phrase in [canonical] + list(aliases):
+                self._insert(tokenize(phrase), canonical)
+
+        # Extracted skills per document hash, so repeated calls for a JD are free
+        self.cache_size = cache_size
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _insert(self, tokens: List[str], canonical: str):
+        if not tokens:
+            return
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[_END] = canonical
+        self._max_phrase_length = max(self._max_phrase_length, len(tokens))
+
+    def extract(self, text: str) -> List[str]:
+        """Canonical skills mentioned in text, in order of first mention."""
+        key = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return list(self._cache[key])
+
+        skills = list(dict.fromkeys(self._match(tokenize(text))))
+
+        with self._lock:
+            self._cache[key] = skills
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return list(skills)
+
+    def _match(self, tokens: List[str]) -> List[str]:
+        matches = []
+        i = 0
+        while i < len(tokens):
+            node = self._trie
+            longest, longest_end = None, i
+            for j in range(i, min(i + self._max_phrase_length, len(tokens))):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                if _END in node:
+                    longest, longest_end = node[_END], j + 1
+            if longest is None:
+                i += 1
+            else:
+                matches.append(longest)
+                i = longest_end
+        return matches
\ No newline at end of file